@@ -3,4 +3,5 @@ from .models import UserProfile
 
 @admin.register(UserProfile)
 class UserProfileAdmin(admin.ModelAdmin):
-    list_display = ('user', 'monthly_income')
+    list_display = ('user', 'monthly_income', 'phone_number', 'daily_digest')
+    list_filter = ('daily_digest',)
@@ -22,10 +22,11 @@ from django.contrib.auth.models import User
 class CustomUserCreationForm(UserCreationForm):
     email = forms.EmailField(required=True, help_text="Required. Inform a valid email address.")
     phone_number = forms.CharField(max_length=15, required=False, help_text="Optional. Enter your mobile number.")
+    daily_digest = forms.BooleanField(required=False, label="Send me a daily WhatsApp report")
 
     class Meta:
         model = User
-        fields = ('username', 'email', 'phone_number')
+        fields = ('username', 'email', 'phone_number', 'daily_digest')
 
     def save(self, commit=True):
         user = super().save(commit=False)
@@ -35,5 +36,6 @@ class CustomUserCreationForm(UserCreationForm):
             # Profile is automatically created by signal, so we just update it
             if hasattr(user, 'profile'):
                 user.profile.phone_number = self.cleaned_data.get('phone_number', '')
+                user.profile.daily_digest = self.cleaned_data.get('daily_digest', False)
                 user.profile.save()
         return user
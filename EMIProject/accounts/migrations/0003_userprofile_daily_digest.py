@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-18 02:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_userprofile_phone_number'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='daily_digest',
+            field=models.BooleanField(default=False, help_text='Send the daily report to phone_number (manage.py send_digest)'),
+        ),
+    ]
@@ -7,6 +7,7 @@ class UserProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='profile')
     monthly_income = models.DecimalField(max_digits=12, decimal_places=2, default=0.00)
     phone_number = models.CharField(max_length=15, blank=True, null=True)
+    daily_digest = models.BooleanField(default=False, help_text="Send the daily report to phone_number (manage.py send_digest)")
 
     def __str__(self):
         return f"{self.user.username}'s Profile"
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -45,6 +46,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.QueryInstrumentationMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -77,13 +79,95 @@ WSGI_APPLICATION = 'config.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
 
+# Every new SQLite connection runs SQLITE_PRAGMAS: WAL lets dashboard reads
+# carry on while a request writes, and IMMEDIATE transactions take the write
+# lock when they begin instead of failing when a read upgrades to a write.
+# `replica` is a query-only connection to the same file; reads inside
+# core.db_routers.read_replica() (dashboard, analytics, trends) go there.
+
+SQLITE_PRAGMAS = (
+    'PRAGMA journal_mode=WAL;'
+    'PRAGMA synchronous=NORMAL;'
+    'PRAGMA mmap_size=268435456;' # 256 MB
+    'PRAGMA cache_size=-65536;' # KB, i.e. 64 MB per connection
+    'PRAGMA temp_store=MEMORY;'
+)
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            'init_command': SQLITE_PRAGMAS,
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20, # seconds to wait on a locked database
+        },
+    },
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            'init_command': SQLITE_PRAGMAS + 'PRAGMA query_only=ON;',
+            'timeout': 20,
+        },
+        'TEST': {'MIRROR': 'default'},
+    },
+}
+
+DATABASE_ROUTERS = ['core.db_routers.ReadReplicaRouter']
+
+
+# Cache
+# Dashboard, analytics and chat snapshots, the data versions that invalidate
+# them, and their hit/miss counters live here. It must be shared by every web
+# worker and by the management commands that change data (sync_external,
+# process_recurring, import_statement, ...), so it is kept on disk; a
+# per-process cache would never see their invalidations. Redis/Memcached
+# work too when the workers span hosts.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('FINTRACK_CACHE_DIR', BASE_DIR / '.cache'),
+        'OPTIONS': {'MAX_ENTRIES': 10000},
     }
 }
 
+DASHBOARD_CACHE_TIMEOUT = 6 * 60 * 60 # seconds; entries are also invalidated on any data change
+
+
+# Request instrumentation
+# core.middleware.QueryInstrumentationMiddleware logs one line per request on
+# the `core.perf` logger at INFO (set PERF_LOG_LEVEL=INFO to see them). Views
+# over their `query_budget` are logged as warnings, or raise when
+# QUERY_BUDGET_STRICT is on.
+
+QUERY_BUDGET_STRICT = False
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'perf': {
+            'format': '{asctime} {levelname} {name} {message}',
+            'style': '{',
+        },
+    },
+    'handlers': {
+        'perf_console': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'perf',
+        },
+    },
+    'loggers': {
+        'core.perf': {
+            'handlers': ['perf_console'],
+            'level': os.environ.get('PERF_LOG_LEVEL', 'WARNING'),
+            'propagate': False,
+        },
+    },
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -136,3 +220,28 @@ EXPERIAN_API_KEY = "mock-key" # Replace with os.environ.get('EXPERIAN_API_KEY')
 EXPERIAN_BASE_URL = "https://sandbox.experianapis.com"
 
 
+
+
+# Chatbot
+# The LLM providers are hedged: the second provider is asked after
+# CHATBOT_HEDGE_DELAY seconds without an answer, and the local rules answer
+# once CHATBOT_DEADLINE seconds have passed. Serve over ASGI (config.asgi)
+# so waiting on the providers does not hold a worker.
+
+CHATBOT_DEADLINE = 6.0 # seconds
+CHATBOT_HEDGE_DELAY = 1.5 # seconds
+
+
+# Notifications
+# Alerts are queued in core.NotificationOutbox and sent by
+# `manage.py dispatch_notifications` (cron every minute, or --loop).
+
+NOTIFICATION_MAX_ATTEMPTS = 5
+NOTIFICATION_RETRY_DELAY = 60 # seconds, doubled after each failed attempt
+NOTIFICATION_RATE_LIMIT = 5 # sends per recipient ...
+NOTIFICATION_RATE_WINDOW = 60 * 60 # ... per this many seconds
+
+# Daily digest (`manage.py send_digest`): 'outbox' (WhatsApp via the
+# dispatcher), 'whatsapp', or the local stand-ins 'console' and 'file'.
+DIGEST_CHANNEL = 'outbox'
+DIGEST_FILE_PATH = BASE_DIR / 'digests.txt'
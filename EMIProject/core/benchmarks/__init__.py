@@ -0,0 +1,8 @@
+"""
+Benchmark suite for the hot views and services.
+
+seed.py fills a database with configurable volumes, cases.py defines what is
+measured and runner.py times each case, counts its queries and compares runs.
+Run it with ``manage.py bench``, which does all of this in a throwaway test
+database with upstream HTTP calls disabled.
+"""
@@ -0,0 +1,64 @@
+from datetime import date
+
+import numpy as np
+
+from django.core.cache import cache
+from django.test import Client
+from django.urls import reverse
+
+from expenses.models import Expense
+from core.models import Saving, Investment, Loan
+from core.chatbot import ChatBotService
+from core.services.dashboard import NEEDS_CATEGORIES, WANTS_CATEGORIES
+from core.utils import amortization
+from core.utils.budget_calculator import calculate_actual_spending, calculate_ideal_budget, get_budget_alerts
+
+
+class Case:
+    """
+    One measured operation. setup() runs before every repetition and is not
+    timed (e.g. clearing caches so a view is measured on its cold path).
+    """
+
+    def __init__(self, name, func, setup=None):
+        self.name = name
+        self.func = func
+        self.setup = setup
+
+
+def build_cases(user):
+    client = Client()
+    client.force_login(user)
+
+    def get(url_name, **params):
+        def request():
+            response = client.get(reverse(url_name), params)
+            if response.status_code != 200:
+                raise RuntimeError(f"{url_name} returned {response.status_code}")
+        return request
+
+    def budget():
+        start = date.today().replace(day=1)
+        actual = calculate_actual_spending(
+            Expense.objects.all(), Saving.objects.all(), Investment.objects.all(),
+            NEEDS_CATEGORIES, WANTS_CATEGORIES, start,
+        )
+        get_budget_alerts(actual, calculate_ideal_budget(100000))
+
+    loans = list(Loan.objects.all())
+    # 500 thirty-year loans: 180k instalments in one vectorized pass
+    rng = np.random.default_rng(7)
+    portfolio = (rng.uniform(1e5, 1e7, 500), rng.uniform(6, 14, 500), np.full(500, 360))
+
+    return [
+        Case('home', get('home'), setup=cache.clear),
+        Case('home_cached', get('home')),
+        Case('analytics', get('analytics'), setup=cache.clear),
+        Case('expense_list', get('expense_list')),
+        Case('search', get('search', q='uber')),
+        Case('chatbot_context', lambda: ChatBotService().get_context_data()),
+        Case('budget_calculator', budget),
+        Case('loan_calculate_emi', lambda: [loan.calculate_emi() for loan in loans]),
+        Case('portfolio_emis', lambda: amortization.emis(*amortization.loan_arrays(loans))),
+        Case('portfolio_schedules', lambda: amortization.schedules(*portfolio)),
+    ]
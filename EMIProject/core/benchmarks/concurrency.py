@@ -0,0 +1,103 @@
+"""
+Concurrent dashboard load.
+
+Several worker threads, each with its own database connections, load the
+dashboard views at once while a writer thread keeps adding expenses (as
+form posts and the recurring engine do). Every request runs on a cold
+cache, so each one reads the ledger. Reports throughput, latency
+percentiles and requests that failed on a locked database.
+"""
+import threading
+import time
+from datetime import date
+
+from django.core.cache import cache
+from django.db import OperationalError, connections
+from django.test import Client
+from django.urls import reverse
+
+from expenses.models import Expense
+
+VIEWS = ('home', 'analytics', 'net_worth_trend')
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def run(user, workers=8, duration=10.0, write_interval=0.05):
+    """
+    Load the dashboard from `workers` threads for `duration` seconds.
+
+    Returns:
+        Dictionary with requests, throughput (requests/s), p50/p95 latency
+        in ms, failed requests, and the writer's writes and failed writes.
+    """
+    latencies, failures = [], []
+    writes = {'ok': 0, 'failed': 0}
+    lock = threading.Lock()
+    window = {}
+
+    def open_window():
+        window['start'] = time.perf_counter()
+        window['deadline'] = window['start'] + duration
+
+    # Logins happen before the clock starts
+    start = threading.Barrier(workers + 1, action=open_window)
+
+    def worker(index):
+        client = Client()
+        client.force_login(user)
+        urls = [reverse(name) for name in VIEWS]
+        start.wait()
+        try:
+            n = index
+            while time.perf_counter() < window['deadline']:
+                cache.clear()
+                began = time.perf_counter()
+                try:
+                    response = client.get(urls[n % len(urls)])
+                    ok = response.status_code == 200
+                except OperationalError:
+                    ok = False
+                elapsed = time.perf_counter() - began
+                with lock:
+                    (latencies if ok else failures).append(elapsed)
+                n += 1
+        finally:
+            connections.close_all()
+
+    def writer():
+        start.wait()
+        try:
+            while time.perf_counter() < window['deadline']:
+                try:
+                    Expense.objects.create(title='Load test', amount=100, category='OTH', date=date.today())
+                    writes['ok'] += 1
+                except OperationalError:
+                    writes['failed'] += 1
+                time.sleep(write_interval)
+        finally:
+            connections.close_all()
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(workers)]
+    threads.append(threading.Thread(target=writer))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - window['start']
+
+    return {
+        'workers': workers,
+        'requests': len(latencies),
+        'throughput': round(len(latencies) / wall, 1),
+        'p50_ms': round(_percentile(latencies, 50) * 1000, 1),
+        'p95_ms': round(_percentile(latencies, 95) * 1000, 1),
+        'failed': len(failures),
+        'writes': writes['ok'],
+        'failed_writes': writes['failed'],
+    }
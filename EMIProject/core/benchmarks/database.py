@@ -0,0 +1,67 @@
+"""
+Throwaway test database for the benchmark and plan-check commands.
+
+Outside the test runner the `replica` alias's TEST MIRROR setting is not
+applied, so reads routed to it (read_replica()) would hit the real database.
+throwaway_database() creates the test database on `default` and points `replica`
+at it, then puts both back. capture_queries() records the queries of both
+connections, so measurements include the reads that went to the replica.
+"""
+from contextlib import contextmanager
+
+from django.core.signals import request_started
+from django.db import DEFAULT_DB_ALIAS, connections, reset_queries
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from core.db_routers import REPLICA
+
+
+@contextmanager
+def throwaway_database(name=None):
+    """
+    Run the block against a fresh, migrated test database.
+
+    Args:
+        name: Test database NAME (e.g. a file, so other threads can open it);
+            the backend's default otherwise
+    """
+    default = connections[DEFAULT_DB_ALIAS]
+    replica = connections[REPLICA] if REPLICA in connections.settings else None
+    saved_test = default.settings_dict.get('TEST', {})
+    if name:
+        default.settings_dict['TEST'] = {**saved_test, 'NAME': name}
+
+    setup_test_environment()
+    old_name = default.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    if replica is not None:
+        replica_settings = replica.settings_dict
+        replica.close()
+        replica.creation.set_as_test_mirror(default.settings_dict)
+    try:
+        yield
+    finally:
+        if replica is not None:
+            replica.close()
+            replica.settings_dict = replica_settings
+        default.creation.destroy_test_db(old_name, verbosity=0)
+        default.settings_dict['TEST'] = saved_test
+        teardown_test_environment()
+
+
+@contextmanager
+def capture_queries():
+    """Yields a list that, after the block, holds the queries run on every connection."""
+    # Like CaptureQueriesContext, but without opening connections the block never uses
+    captured = []
+    states = []
+    for connection in connections.all():
+        states.append((connection, connection.force_debug_cursor, len(connection.queries_log)))
+        connection.force_debug_cursor = True
+    request_started.disconnect(reset_queries)
+    try:
+        yield captured
+    finally:
+        request_started.connect(reset_queries)
+        for connection, force_debug_cursor, start in states:
+            connection.force_debug_cursor = force_debug_cursor
+            captured.extend(list(connection.queries_log)[start:])
@@ -0,0 +1,121 @@
+"""
+Query plan checks.
+
+Renders the hot views against a seeded database, captures every SELECT they
+issue and asks SQLite how it would run each one (EXPLAIN QUERY PLAN). A full
+scan of a ledger table in a filtered or limited query is reported, so a
+dropped index or a new unindexed filter shows up before the table has grown.
+"""
+import json
+import re
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+
+from core.benchmarks.database import capture_queries
+from core.models import UserProfile
+
+# (url name, query params) of the views whose queries are checked
+VIEWS = [
+    ('home', {}),
+    ('analytics', {}),
+    ('expense_list', {}),
+    ('expense_list', {'after': '2000-01-01.1'}),
+    ('expense_title_suggest', {'q': 'ub'}),
+    ('recurring_list', {}),
+    ('saving_list', {}),
+    ('investment_list', {}),
+    ('loan_list', {}),
+    ('policy_list', {}),
+    ('document_list', {}),
+    ('net_worth_trend', {'range': '1y'}),
+    ('search', {'q': 'uber'}),
+]
+
+# Chatbot questions answered from the database (the period and category lookups)
+QUESTIONS = [
+    'How much did I spend on food last month?',
+    'Transport spending this month vs last month',
+]
+
+# Tables that grow with use; scanning one to filter or to pick the first rows is a regression
+LEDGER_TABLES = {
+    'expenses_expense', 'expenses_recurringexpense', 'core_saving', 'core_investment', 'core_loan',
+    'core_recurringwealth', 'core_document', 'core_notificationoutbox',
+}
+
+# (view, table) full scans that are expected, with the reason
+ALLOWED_SCANS = {}
+
+SCAN = re.compile(r'^SCAN (\w+)(?: AS \w+)?$')
+
+
+def requests(client):
+    """(view name, request) pairs for VIEWS and QUESTIONS; each request returns a response."""
+    for name, params in VIEWS:
+        yield name, lambda name=name, params=params: client.get(reverse(name), params)
+    for question in QUESTIONS:
+        body = json.dumps({'message': question})
+        yield 'chatbot_ask', lambda body=body: client.post(reverse('chatbot_ask'), body, content_type='application/json')
+
+
+def capture(client):
+    """SQL of every SELECT issued by each request, in order, without duplicates."""
+    captured = []
+    for name, request in requests(client):
+        with capture_queries() as queries:
+            response = request()
+        if response.status_code != 200:
+            raise RuntimeError(f"{name} returned {response.status_code}")
+        seen = set()
+        for query in queries:
+            sql = query['sql']
+            if sql.lstrip().upper().startswith('SELECT') and sql not in seen:
+                seen.add(sql)
+                captured.append((name, sql))
+    return captured
+
+
+def explain(sql):
+    """The detail lines of SQLite's plan for one statement."""
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def full_scans(plan):
+    """Tables the plan reads in full (a bare SCAN, not through an index)."""
+    return [match.group(1) for match in map(SCAN.match, plan) if match]
+
+
+def check(user):
+    """
+    Explain the queries of every view as the given user.
+
+    Returns:
+        Tuple of (results, problems): results are (view, sql, plan) for every
+        captured query; problems are readable lines, one per unexpected scan.
+    """
+    client = Client()
+    client.force_login(user)
+    # Open the document vault for this session
+    UserProfile.objects.update_or_create(user=user, defaults={'vault_pin': '0000'})
+    session = client.session
+    session['vault_unlocked'] = True
+    session.save()
+
+    # Cold caches, so the views run their queries rather than serve snapshots
+    cache.clear()
+    results, problems = [], []
+    for view, sql in capture(client):
+        plan = explain(sql)
+        results.append((view, sql, plan))
+        if ' WHERE ' not in sql and ' LIMIT ' not in sql:
+            # Unfiltered reads (totals, full listings) touch every row by design
+            continue
+        for table in full_scans(plan):
+            if table in LEDGER_TABLES and (view, table) not in ALLOWED_SCANS:
+                problems.append(f"{view}: full scan of {table} in {sql[:200]}")
+    return results, problems
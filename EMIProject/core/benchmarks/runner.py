@@ -0,0 +1,80 @@
+import platform
+import statistics
+import time
+from contextlib import contextmanager
+from unittest import mock
+
+import django
+import requests
+from django.db import connection
+
+from core.benchmarks.database import capture_queries
+
+
+@contextmanager
+def stub_upstream():
+    """Fails every outgoing HTTP request fast, so no case waits on a real API."""
+    def offline(*args, **kwargs):
+        raise requests.ConnectionError("Upstream calls are disabled during benchmarks.")
+
+    with mock.patch('requests.sessions.Session.request', side_effect=offline):
+        yield
+
+
+def measure(case, repeat):
+    """Runs one case `repeat` times; returns wall-time stats (ms) and its query count."""
+    timings = []
+    queries = 0
+    for _ in range(repeat):
+        if case.setup:
+            case.setup()
+        with capture_queries() as captured:
+            started = time.perf_counter()
+            case.func()
+            timings.append((time.perf_counter() - started) * 1000)
+        queries = max(queries, len(captured))
+
+    return {
+        'wall_ms': {
+            'min': round(min(timings), 3),
+            'median': round(statistics.median(timings), 3),
+            'mean': round(statistics.fmean(timings), 3),
+        },
+        'queries': queries,
+    }
+
+
+def run(cases, repeat=5, volumes=None):
+    """Measures every case and returns the JSON-serialisable report."""
+    with stub_upstream():
+        results = {case.name: measure(case, repeat) for case in cases}
+    return {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'repeat': repeat,
+            'volumes': volumes or {},
+        },
+        'results': results,
+    }
+
+
+def compare(baseline, current, threshold=0.25, noise_ms=1.0):
+    """
+    Lists regressions of `current` against `baseline` (both run() reports):
+    a median slower by more than `threshold` (and by more than noise_ms),
+    or any increase in query count.
+    """
+    regressions = []
+    for name, result in current['results'].items():
+        before = baseline['results'].get(name)
+        if before is None:
+            continue
+        old, new = before['wall_ms']['median'], result['wall_ms']['median']
+        if new > old * (1 + threshold) and new - old > noise_ms:
+            regressions.append(f"{name}: median {old:.1f} ms -> {new:.1f} ms")
+        if result['queries'] > before['queries']:
+            regressions.append(f"{name}: queries {before['queries']} -> {result['queries']}")
+    return regressions
@@ -0,0 +1,116 @@
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+
+from expenses.models import Expense
+from core.models import Saving, Investment, Loan, Policy, Document
+from core.services import rollups, search
+from core.services.net_worth import NetWorthService
+from core.services.snapshots import bump_data_version
+
+DEFAULT_VOLUMES = {
+    'expenses': 10_000,
+    'savings': 500,
+    'loans': 200,
+    'holdings': 300,
+    'policies': 20,
+    'documents': 50,
+}
+
+EXPENSE_TITLES = {
+    'FOO': ['Swiggy order', 'Zomato dinner', 'Groceries', 'Cafe', 'Office lunch'],
+    'TRA': ['Uber ride', 'Ola auto', 'Petrol', 'Metro card', 'Train ticket'],
+    'ENT': ['Netflix', 'Movie tickets', 'Concert', 'Spotify', 'Gaming'],
+    'BIL': ['Electricity bill', 'Rent', 'Broadband', 'Mobile recharge', 'Water bill'],
+    'EMI': ['Car EMI', 'Home loan EMI', 'Phone EMI'],
+    'OTH': ['Amazon', 'Gift', 'Pharmacy', 'Haircut', 'Donation'],
+}
+
+CHUNK = 10_000 # rows built in memory at a time, so 1M expenses stay cheap
+
+
+def seed(volumes=None, seed=42, today=None):
+    """
+    Bulk-inserts benchmark data and returns the user to log in as.
+    Dates are spread over the three years before today.
+    """
+    volumes = {**DEFAULT_VOLUMES, **(volumes or {})}
+    rng = random.Random(seed)
+    today = today or date.today()
+    span = 3 * 365
+
+    def day():
+        return today - timedelta(days=rng.randrange(span))
+
+    def money(low, high):
+        return Decimal(rng.randrange(low * 100, high * 100)) / 100
+
+    categories = list(EXPENSE_TITLES)
+    remaining = volumes['expenses']
+    while remaining > 0:
+        size = min(CHUNK, remaining)
+        rows = []
+        for _ in range(size):
+            category = rng.choice(categories)
+            rows.append(Expense(
+                title=rng.choice(EXPENSE_TITLES[category]),
+                amount=money(50, 5000),
+                category=category,
+                date=day(),
+            ))
+        Expense.objects.bulk_create(rows, batch_size=500)
+        remaining -= size
+
+    Saving.objects.bulk_create([
+        Saving(name=f'Deposit {i}', amount=money(500, 50000), date=day())
+        for i in range(volumes['savings'])
+    ], batch_size=500)
+
+    holding_categories = [code for code, _ in Investment.CATEGORY_CHOICES]
+    holdings = []
+    for i in range(volumes['holdings']):
+        amount = money(1000, 200000)
+        holdings.append(Investment(
+            name=f'Holding {i}',
+            amount=amount,
+            current_value=amount * Decimal(rng.uniform(0.7, 1.6)).quantize(Decimal('0.01')),
+            quantity=rng.randrange(1, 500),
+            category=rng.choice(holding_categories),
+            date=day(),
+            external_id=f'BENCH{i:06d}',
+            source='BROKER',
+        ))
+    Investment.objects.bulk_create(holdings, batch_size=500)
+
+    Loan.objects.bulk_create([
+        Loan(
+            name=f'Loan {i}',
+            principal=money(50000, 10000000),
+            rate=Decimal(rng.randrange(650, 1600)) / 100,
+            tenure_months=rng.choice([12, 36, 60, 120, 240, 360]),
+            start_date=day(),
+        )
+        for i in range(volumes['loans'])
+    ], batch_size=500)
+
+    Policy.objects.bulk_create([
+        Policy(name=f'Policy {i}', sum_assured=money(100000, 10000000), premium=money(1000, 50000), premium_date=today + timedelta(days=rng.randrange(365)))
+        for i in range(volumes['policies'])
+    ], batch_size=500)
+
+    Document.objects.bulk_create([
+        Document(title=f'Statement {i}', file=f'documents/statement_{i}.pdf', expiry_date=today + timedelta(days=rng.randrange(-30, 365)))
+        for i in range(volumes['documents'])
+    ], batch_size=500)
+
+    # bulk_create skips the signals that maintain these
+    rollups.rebuild()
+    search.rebuild()
+    bump_data_version()
+    # What the scheduled snapshot run would have stored by now
+    NetWorthService().fill_snapshots()
+
+    user, _ = User.objects.get_or_create(username='bench', defaults={'is_staff': True})
+    return user
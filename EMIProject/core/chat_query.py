@@ -0,0 +1,317 @@
+"""
+Structured query engine for scoped chat questions.
+
+Parses a question such as "how much did I spend on transport in March" or
+"top 3 categories this quarter" into a ChatQuery (ledger, time range,
+categories, operation) and answers it with one parameterized aggregate over
+Expense, Saving, Investment or Loan. Only the compact result is ever handed to
+an LLM provider, never the ledger itself.
+"""
+import calendar
+import re
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+from dateutil.relativedelta import relativedelta
+from django.db.models import Avg, Count, Q, Sum
+from expenses.models import Expense
+from .models import Saving, Investment, Loan
+
+# ledger -> (model, date field, amount field, noun used in answers)
+SOURCES = {
+    'expenses': (Expense, 'date', 'amount', 'expense'),
+    'savings': (Saving, 'date', 'amount', 'saving'),
+    'investments': (Investment, 'date', 'amount', 'investment'),
+    'loans': (Loan, 'start_date', 'principal', 'loan'),
+}
+
+SOURCE_WORDS = (
+    ('expenses', r'\b(spend|spent|spending|expenses?|paid|pay)\b'),
+    ('savings', r'\b(save|saved|saving|savings)\b'),
+    ('investments', r'\b(invest|invested|investing|investments?)\b'),
+    ('loans', r'\b(loans?|borrow|borrowed)\b'),
+)
+SOURCE_WORDS_BY_NAME = dict(SOURCE_WORDS)
+
+SUBJECTS = {
+    'expenses': 'Your spending',
+    'savings': 'Your savings',
+    'investments': 'Your new investments',
+    'loans': 'Loans you took',
+}
+
+# word -> (ledger, category code)
+CATEGORY_WORDS = {
+    'food': ('expenses', 'FOO'), 'groceries': ('expenses', 'FOO'), 'dining': ('expenses', 'FOO'),
+    'restaurants': ('expenses', 'FOO'), 'restaurant': ('expenses', 'FOO'),
+    'transport': ('expenses', 'TRA'), 'travel': ('expenses', 'TRA'), 'fuel': ('expenses', 'TRA'),
+    'cab': ('expenses', 'TRA'), 'cabs': ('expenses', 'TRA'), 'commute': ('expenses', 'TRA'),
+    'entertainment': ('expenses', 'ENT'), 'movies': ('expenses', 'ENT'),
+    'bills': ('expenses', 'BIL'), 'utilities': ('expenses', 'BIL'), 'electricity': ('expenses', 'BIL'),
+    'emi': ('expenses', 'EMI'), 'emis': ('expenses', 'EMI'),
+    'stocks': ('investments', 'STK'), 'shares': ('investments', 'STK'),
+    'mutual funds': ('investments', 'MF'), 'mutual fund': ('investments', 'MF'), 'mf': ('investments', 'MF'),
+    'sip': ('investments', 'MF'), 'sips': ('investments', 'MF'),
+    'gold': ('investments', 'GLD'), 'fd': ('investments', 'FD'), 'fixed deposit': ('investments', 'FD'),
+    'real estate': ('investments', 'RE'), 'crypto': ('investments', 'CRY'),
+}
+CATEGORY_PATTERN = re.compile(
+    r'\b(' + '|'.join(sorted(map(re.escape, CATEGORY_WORDS), key=len, reverse=True)) + r')\b'
+)
+
+MONTHS = {
+    name: number
+    for number in range(1, 13)
+    for name in (calendar.month_name[number].lower(), calendar.month_abbr[number].lower(), 'sept' if number == 9 else None)
+    if name
+}
+# A bare "may" is usually the verb, so it only counts after a preposition or before a year
+MONTH_PATTERN = re.compile(
+    r'\b(?:(in|for|during|of|since|from|on|vs|versus|and|to)\s+)?(' + '|'.join(sorted(MONTHS, key=len, reverse=True)) + r')\b(?:\s+(\d{4}))?'
+)
+RELATIVE = re.compile(r'\b(this|last|previous|past) (week|month|quarter|year)\b')
+LAST_N = re.compile(r'\b(?:last|past) (\d+) (days?|weeks?|months?)\b')
+YEAR = re.compile(r'\b(?:in|for|during)\s+(20\d\d)\b') # a bare 2000 is more likely an amount
+TOP = re.compile(r'\b(?:top|biggest|largest)\s*(\d+)?\b|\bwhere\b.*\bmost\b')
+COMPARE = re.compile(r'\b(compare|compared|comparison|vs|versus|than)\b')
+COUNT = re.compile(r'\bhow many\b|\bnumber of\b')
+AVERAGE = re.compile(r'\b(average|avg|mean)\b')
+DAYS = re.compile(r'\b(today|yesterday)\b')
+# "more than 2000": amount filters are not supported, so these are not comparisons either
+THRESHOLD = re.compile(r'\b(?:more|less|over|under|above|below|at least|at most)\s+(?:than\s+)?(?:rs\.?|inr|₹)?\s*\d')
+YEARS = range(1900, 2100) # a "march 0000" is not a date
+
+# Everything the planner understands in a question; any other word (other than
+# a number or FILLER) is a topic it cannot scope, e.g. "tax" or "rent"
+UNDERSTOOD = [re.compile(pattern) for _, pattern in SOURCE_WORDS] + [
+    CATEGORY_PATTERN, MONTH_PATTERN, RELATIVE, LAST_N, YEAR, TOP, COMPARE, COUNT, AVERAGE, DAYS,
+]
+FILLER = set('''
+    a an the i me my we our us you your it is are was were be been do does did have has had
+    how much many what which when why s t so far all total overall money amount amounts
+    on in for during of since from to at by with and or up until till per
+    categories category entries transactions higher lower bigger smaller more less
+    can could please tell show give
+'''.split())
+
+
+@dataclass(frozen=True)
+class Period:
+    start: date
+    end: date      # exclusive
+    label: str
+    months: int = 0  # calendar-aligned length in months, 0 for day ranges
+
+    def previous(self):
+        if self.months:
+            start = self.start - relativedelta(months=self.months)
+            return period_of_months(start, self.months)
+        days = (self.end - self.start).days
+        return Period(self.start - timedelta(days=days), self.start, f'the {days} days before')
+
+    def as_dict(self):
+        return {'from': self.start.isoformat(), 'to': (self.end - timedelta(days=1)).isoformat(), 'label': self.label}
+
+
+def period_of_months(start, months):
+    end = start + relativedelta(months=months)
+    if months == 1:
+        label = f'in {start:%B %Y}'
+    elif months == 3 and start.month % 3 == 1:
+        label = f'in Q{(start.month - 1) // 3 + 1} {start.year}'
+    elif months == 12 and start.month == 1:
+        label = f'in {start.year}'
+    else:
+        label = f'from {start:%B %Y} to {(end - timedelta(days=1)):%B %Y}'
+    return Period(start, end, label, months)
+
+
+@dataclass(frozen=True)
+class ChatQuery:
+    source: str
+    operation: str = 'total'   # total | top | compare | count | average
+    period: Period = None
+    previous: Period = None    # for compare
+    categories: tuple = ()
+    limit: int = 3
+
+    def as_dict(self):
+        return {
+            'ledger': self.source,
+            'operation': self.operation,
+            'period': self.period.as_dict() if self.period else 'all time',
+            'categories': [category_label(self.source, code) for code in self.categories],
+        }
+
+
+def category_label(source, code):
+    return dict(SOURCES[source][0].CATEGORY_CHOICES).get(code, code)
+
+
+def parse_periods(text, today):
+    """Every time range mentioned in the question, in order of appearance."""
+    found = []
+    for match in RELATIVE.finditer(text):
+        which, unit = match.groups()
+        back = 0 if which == 'this' else 1
+        if unit == 'week':
+            start = today - timedelta(days=today.weekday()) - timedelta(weeks=back)
+            found.append((match.start(), Period(start, start + timedelta(days=7), f'in the week of {start:%d %b %Y}')))
+        elif unit == 'month':
+            found.append((match.start(), period_of_months(today.replace(day=1) - relativedelta(months=back), 1)))
+        elif unit == 'quarter':
+            start = date(today.year, 3 * ((today.month - 1) // 3) + 1, 1) - relativedelta(months=3 * back)
+            found.append((match.start(), period_of_months(start, 3)))
+        else:
+            found.append((match.start(), period_of_months(date(today.year - back, 1, 1), 12)))
+
+    for match in LAST_N.finditer(text):
+        count, unit = int(match.group(1)), match.group(2).rstrip('s')
+        days = {'day': 1, 'week': 7}.get(unit)
+        start = today - timedelta(days=count * days) if days else today - relativedelta(months=count)
+        found.append((match.start(), Period(start + timedelta(days=1), today + timedelta(days=1), f'in the last {count} {match.group(2)}')))
+
+    if re.search(r'\btoday\b', text):
+        found.append((text.index('today'), Period(today, today + timedelta(days=1), 'today')))
+    if re.search(r'\byesterday\b', text):
+        found.append((text.index('yesterday'), Period(today - timedelta(days=1), today, 'yesterday')))
+
+    for match in MONTH_PATTERN.finditer(text):
+        preposition, name, year = match.groups()
+        if name == 'may' and not (preposition or year):
+            continue
+        month = MONTHS[name]
+        # "in March" means the latest March that has started
+        year = int(year) if year else (today.year if month <= today.month else today.year - 1)
+        found.append((match.start(2), period_of_months(date(year, month, 1), 1)))
+
+    if not found:
+        for match in YEAR.finditer(text):
+            found.append((match.start(1), period_of_months(date(int(match.group(1)), 1, 1), 12)))
+
+    return [period for _, period in sorted(found, key=lambda pair: pair[0])]
+
+
+def unmapped_words(text):
+    """Words of the (lowercased) question that the planner does not understand."""
+    for pattern in UNDERSTOOD:
+        text = pattern.sub(' ', text)
+    return [word for word in re.findall(r'\w+', text) if word not in FILLER and not word.isdigit()]
+
+
+def parse(message, today=None):
+    """
+    ChatQuery for a scoped question, or None when the question has no time
+    range, comparison or ranking, names no ledger, or has parts the planner
+    cannot scope (an unknown topic, an amount filter, an impossible year):
+    those are left to the intents and the providers.
+    """
+    today = today or date.today()
+    text = message.lower()
+    if THRESHOLD.search(text) or unmapped_words(text):
+        return None
+    if any(year and int(year) not in YEARS for _, _, year in MONTH_PATTERN.findall(text)):
+        return None
+
+    source = next((name for name, pattern in SOURCE_WORDS if re.search(pattern, text)), None)
+    categories = []
+    for match in CATEGORY_PATTERN.finditer(text):
+        ledger, code = CATEGORY_WORDS[match.group(1)]
+        if (source or ledger) == ledger and code not in categories:
+            source = source or ledger
+            categories.append(code)
+    periods = parse_periods(text, today)
+    top = TOP.search(text)
+    compare = COMPARE.search(text)
+
+    if not (periods or top or compare or (categories and source)):
+        return None
+    source = source or ('expenses' if top or periods else None)
+    if source is None:
+        return None
+    # "what is my EMI" is a loan question, not the EMI expense category
+    if categories and not re.search(SOURCE_WORDS_BY_NAME[source], text) and not periods:
+        return None
+
+    period = periods[0] if periods else None
+    if compare:
+        period = period or period_of_months(today.replace(day=1), 1)
+        previous = periods[1] if len(periods) > 1 else period.previous()
+        return ChatQuery(source, 'compare', period, previous, tuple(categories))
+    if top and hasattr(SOURCES[source][0], 'CATEGORY_CHOICES') and not categories:
+        return ChatQuery(source, 'top', period, limit=max(1, int(top.group(1) or 3)))
+    if COUNT.search(text):
+        return ChatQuery(source, 'count', period, categories=tuple(categories))
+    if AVERAGE.search(text):
+        return ChatQuery(source, 'average', period, categories=tuple(categories))
+    return ChatQuery(source, 'total', period, categories=tuple(categories))
+
+
+def _in(date_field, period):
+    return Q(**{f'{date_field}__gte': period.start, f'{date_field}__lt': period.end})
+
+
+def run(query):
+    """Answer the query with a single aggregate; returns plain JSON-ready values."""
+    model, date_field, amount_field, _ = SOURCES[query.source]
+    rows = model.objects.all()
+    if query.categories:
+        rows = rows.filter(category__in=query.categories)
+
+    if query.operation == 'compare':
+        current, previous = _in(date_field, query.period), _in(date_field, query.previous)
+        totals = rows.filter(current | previous).aggregate(
+            current=Sum(amount_field, filter=current), previous=Sum(amount_field, filter=previous),
+        )
+        return {'current': float(totals['current'] or 0), 'previous': float(totals['previous'] or 0)}
+
+    if query.period:
+        rows = rows.filter(_in(date_field, query.period))
+
+    if query.operation == 'top':
+        ranked = rows.values('category').annotate(total=Sum(amount_field)).order_by('-total')[:query.limit]
+        return {'categories': [
+            {'category': category_label(query.source, row['category']), 'total': float(row['total'])}
+            for row in ranked
+        ]}
+
+    totals = rows.aggregate(total=Sum(amount_field), count=Count('pk'), average=Avg(amount_field))
+    return {
+        'total': float(totals['total'] or 0),
+        'count': totals['count'],
+        'average': round(float(totals['average'] or 0), 2),
+    }
+
+
+def describe(query, result):
+    """Plain-language answer for a query result."""
+    noun = SOURCES[query.source][3]
+    scope = ''
+    if query.categories:
+        scope = ' on ' + ', '.join(category_label(query.source, code) for code in query.categories)
+    when = f' {query.period.label}' if query.period else ''
+
+    if query.operation == 'top':
+        if not result['categories']:
+            return f'No {noun}s recorded{when}.'
+        ranked = ', '.join(f"{row['category']} ₹{row['total']:,.2f}" for row in result['categories'])
+        return f'Your top {len(result["categories"])} {noun} categories{when}: {ranked}.'
+
+    if query.operation == 'compare':
+        current, previous = result['current'], result['previous']
+        if previous:
+            change = (current - previous) / previous * 100
+            trend = f'{"up" if change >= 0 else "down"} {abs(change):.0f}% from'
+        else:
+            trend = 'compared with'
+        return (
+            f'{SUBJECTS[query.source]}{scope} came to ₹{current:,.2f}{when}, '
+            f'{trend} ₹{previous:,.2f} {query.previous.label}.'
+        )
+
+    if query.operation == 'count':
+        return f"You recorded {result['count']} {noun}{'' if result['count'] == 1 else 's'}{scope}{when}."
+    if query.operation == 'average':
+        return f"Your average {noun}{scope}{when} was ₹{result['average']:,.2f} across {result['count']} entries."
+    entries = '1 entry' if result['count'] == 1 else f"{result['count']} entries"
+    return f"{SUBJECTS[query.source]}{scope} came to ₹{result['total']:,.2f}{when} ({entries})."
@@ -2,9 +2,14 @@ import re
 import requests
 import os
 import json
-from django.db.models import Sum
-from expenses.models import Expense
-from .models import Saving, Investment, Loan, Policy
+import asyncio
+from functools import partial
+
+import httpx
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from . import chat_query, intents
+from .services.snapshots import chat_responses
 
 class ChatBotService:
     def __init__(self):
@@ -13,36 +18,14 @@ class ChatBotService:
         self.openai_key = os.environ.get("OPENAI_API_KEY", "")
         
         self.gemini_url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash-exp:generateContent?key={self.gemini_key}"
+        self.gemini_stream_url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash-exp:streamGenerateContent?alt=sse&key={self.gemini_key}"
         self.openai_url = "https://api.openai.com/v1/chat/completions"
 
     def get_context_data(self):
         """Gather financial context for the AI"""
-        total_expenses = Expense.objects.aggregate(Sum('amount'))['amount__sum'] or 0
-        total_savings = Saving.objects.aggregate(Sum('amount'))['amount__sum'] or 0
-        total_investments = Investment.get_total_invested()
-        total_insurance = Policy.get_total_sum_assured()
-        
-        loans = Loan.objects.all()
-        active_loans = loans.count()
-        total_loan_principal = sum(l.principal for l in loans)
-        total_monthly_emi = Loan.get_total_emi()
-
-        return {
-            "expenses": float(total_expenses),
-            "savings": float(total_savings),
-            "investments": float(total_investments),
-            "insurance_coverage": float(total_insurance),
-            "active_loans_count": active_loans,
-            "total_debt_principal": float(total_loan_principal),
-            "monthly_emi_outflow": float(total_monthly_emi),
-            "currency": "INR",
-            "net_worth": float(total_savings + total_investments)
-        }
+        return intents.Facts().all()
 
-    def call_openai_api(self, user_message, context_data):
-        if not self.openai_key:
-            return None
-            
+    def _openai_request(self, user_message, context_data):
         system_prompt = (
             f"You are FinBot, a helpful financial assistant. "
             f"Here is the user's current financial snapshot: {json.dumps(context_data)}. "
@@ -62,19 +45,9 @@ class ChatBotService:
             ],
             "max_tokens": 150
         }
-        
-        try:
-            response = requests.post(self.openai_url, headers=headers, json=payload, timeout=8)
-            response.raise_for_status()
-            return response.json()['choices'][0]['message']['content']
-        except Exception as e:
-            print(f"OpenAI API Error: {e}")
-            return None
+        return headers, payload
 
-    def call_gemini_api(self, user_message, context_data):
-        if not self.gemini_key:
-            return None
-        
+    def _gemini_payload(self, user_message, context_data):
         system_prompt = (
             f"You are FinBot, a helpful financial assistant for a FinTech dashboard. "
             f"Here is the user's current financial snapshot: {json.dumps(context_data)}. "
@@ -82,12 +55,30 @@ class ChatBotService:
             f"If the question is not about finances, politely steer them back."
         )
 
-        payload = {
+        return {
             "contents": [{
                 "parts": [{"text": system_prompt + "\n\nUser: " + user_message}]
             }]
         }
 
+    def call_openai_api(self, user_message, context_data):
+        if not self.openai_key:
+            return None
+        
+        headers, payload = self._openai_request(user_message, context_data)
+        try:
+            response = requests.post(self.openai_url, headers=headers, json=payload, timeout=8)
+            response.raise_for_status()
+            return response.json()['choices'][0]['message']['content']
+        except Exception as e:
+            print(f"OpenAI API Error: {e}")
+            return None
+
+    def call_gemini_api(self, user_message, context_data):
+        if not self.gemini_key:
+            return None
+
+        payload = self._gemini_payload(user_message, context_data)
         try:
             response = requests.post(self.gemini_url, json=payload, timeout=5)
             response.raise_for_status()
@@ -97,56 +88,255 @@ class ChatBotService:
             print(f"Gemini API Error: {e}")
             return None
 
-    def process_message(self, user, message):
+    # --- Async path (used by ChatBotView) ---
+
+    async def acall_openai_api(self, client, user_message, context_data):
+        headers, payload = self._openai_request(user_message, context_data)
+        try:
+            response = await client.post(self.openai_url, headers=headers, json=payload)
+            response.raise_for_status()
+            return response.json()['choices'][0]['message']['content']
+        except Exception as e:
+            print(f"OpenAI API Error: {e}")
+            return None
+
+    async def acall_gemini_api(self, client, user_message, context_data):
+        payload = self._gemini_payload(user_message, context_data)
+        try:
+            response = await client.post(self.gemini_url, json=payload)
+            response.raise_for_status()
+            data = response.json()
+            return data['candidates'][0]['content']['parts'][0]['text']
+        except Exception as e:
+            print(f"Gemini API Error: {e}")
+            return None
+
+    # --- Streaming (used by ChatStreamView) ---
+
+    @staticmethod
+    async def _sse_events(response):
+        """JSON payloads of a provider's Server-Sent Events stream."""
+        async for line in response.aiter_lines():
+            if not line.startswith('data:'):
+                continue
+            data = line[5:].strip()
+            if data == '[DONE]':
+                return
+            yield json.loads(data)
+
+    async def astream_openai_api(self, client, user_message, context_data):
+        headers, payload = self._openai_request(user_message, context_data)
+        async with client.stream('POST', self.openai_url, headers=headers, json={**payload, 'stream': True}) as response:
+            response.raise_for_status()
+            async for event in self._sse_events(response):
+                text = event['choices'][0]['delta'].get('content')
+                if text:
+                    yield text
+
+    async def astream_gemini_api(self, client, user_message, context_data):
+        payload = self._gemini_payload(user_message, context_data)
+        async with client.stream('POST', self.gemini_stream_url, json=payload) as response:
+            response.raise_for_status()
+            async for event in self._sse_events(response):
+                text = ''.join(part.get('text', '') for part in event['candidates'][0]['content']['parts'])
+                if text:
+                    yield text
+
+    def providers(self):
+        """Configured LLM providers in preference order."""
+        providers = []
+        if self.openai_key:
+            providers.append(self.acall_openai_api)
+        if self.gemini_key:
+            providers.append(self.acall_gemini_api)
+        return providers
+
+    def streaming_providers(self):
+        """Configured LLM providers in preference order, as token streams."""
+        providers = []
+        if self.openai_key:
+            providers.append(self.astream_openai_api)
+        if self.gemini_key:
+            providers.append(self.astream_gemini_api)
+        return providers
+
+    async def _hedge(self, attempts, discard=None):
         """
-        Process the user's message. Tries OpenAI, then Gemini, then Rule-Based.
+        Runs the attempts (coroutine functions) hedged: the first starts at
+        once, the next one joins after CHATBOT_HEDGE_DELAY (or as soon as an
+        earlier one fails). The first truthy result wins and the losers are
+        cancelled; a loser that finished in the same moment is passed to
+        discard. Returns None once CHATBOT_DEADLINE passes without a result.
         """
-        message_lower = message.lower().strip()
-        context = self.get_context_data()
+        deadline = getattr(settings, 'CHATBOT_DEADLINE', 6.0)
+        hedge_delay = getattr(settings, 'CHATBOT_HEDGE_DELAY', 1.5)
+        queue = list(attempts)
 
-        # 1. Try OpenAI
-        openai_response = self.call_openai_api(message, context)
-        if openai_response:
-            return openai_response
+        loop = asyncio.get_running_loop()
+        ends_at = loop.time() + deadline
+        pending = set()
+        try:
+            while queue or pending:
+                if queue:
+                    pending.add(asyncio.create_task(queue.pop(0)()))
+                remaining = ends_at - loop.time()
+                if remaining <= 0:
+                    break
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=min(hedge_delay, remaining) if queue else remaining,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                results = [task.result() for task in done if task.result()]
+                if results:
+                    for loser in results[1:]:
+                        if discard:
+                            await discard(loser)
+                    return results[0]
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        return None
 
-        # 2. Try Gemini
-        gemini_response = self.call_gemini_api(message, context)
-        if gemini_response:
-            return gemini_response
+    async def ask_providers(self, user_message, context_data):
+        """Hedged provider calls (see _hedge); the first complete answer wins."""
+        queue = self.providers()
+        if not queue:
+            return None
+        async with httpx.AsyncClient(timeout=getattr(settings, 'CHATBOT_DEADLINE', 6.0)) as client:
+            return await self._hedge([partial(call, client, user_message, context_data) for call in queue])
 
-        # 3. Fallback: Rule-Based Logic
-        
-        # Greetings
-        if any(word in message_lower for word in ['hello', 'hi', 'hey', 'greetings']):
-            return f"Hello {user.username.title()}! I am FinBot (Running in Local Mode). I can track your expenses, savings, and net worth."
+    async def stream_providers(self, user_message, context_data):
+        """
+        Hedged provider streams: the first provider to produce a token wins
+        (CHATBOT_DEADLINE applies to that first token) and its remaining
+        tokens are relayed as they arrive. Yields nothing if no provider
+        answers in time.
+        """
+        queue = self.streaming_providers()
+        if not queue:
+            return
 
-        # Help
-        if 'help' in message_lower or 'what can you do' in message_lower:
-            return "I can track your finances. Try asking:\n- 'Total expenses'\n- 'How much have I saved?'\n- 'Show my investments'\n- 'What is my net worth?'"
+        async def first_token(client, stream_call):
+            stream = stream_call(client, user_message, context_data)
+            try:
+                return await anext(stream), stream
+            except StopAsyncIteration:
+                return None
+            except Exception as e:
+                print(f"Provider stream error: {e}")
+                await stream.aclose()
+                return None
 
-        # Expenses
-        if 'expense' in message_lower or 'spent' in message_lower or 'spending' in message_lower:
-            return f"Your total recorded expenses amount to ₹{context['expenses']:,.2f}."
+        async def discard(result):
+            await result[1].aclose()
 
-        # Savings
-        if 'save' in message_lower or 'saving' in message_lower:
-            return f"You have currently saved a total of ₹{context['savings']:,.2f}. Great job!"
+        async with httpx.AsyncClient(timeout=getattr(settings, 'CHATBOT_DEADLINE', 6.0)) as client:
+            winner = await self._hedge([partial(first_token, client, call) for call in queue], discard)
+            if winner is None:
+                return
+            token, stream = winner
+            try:
+                yield token
+                async for token in stream:
+                    yield token
+            finally:
+                await stream.aclose()
 
-        # Investments
-        if 'invest' in message_lower:
-            return f"Your total investment portfolio is valued at ₹{context['investments']:,.2f}."
+    async def aprocess_message(self, user, message):
+        """
+        Process the user's message: repeated questions come from the response
+        cache until the financial data changes; otherwise see _answer.
+        """
+        cached, version = await chat_responses.aget(user, message)
+        if cached is not None:
+            return cached
+        answer, cacheable = await self._answer(user, message)
+        if cacheable:
+            await chat_responses.aset(user, message, answer, version)
+        return answer
 
-        # Policies / Insurance
-        if 'policy' in message_lower or 'insurance' in message_lower:
-            return f"Your total insurance sum assured is ₹{context['insurance_coverage']:,.2f}."
+    async def _plan(self, user, message):
+        """
+        A scoped question (time range, category, ranking) is answered with one
+        aggregate query and a confident local intent straight from the
+        database; anything else needs the LLM providers.
 
-        # Loans / EMI
-        if 'loan' in message_lower or 'emi' in message_lower or 'debt' in message_lower:
-            return f"You have {context['active_loans_count']} active loans. Your total monthly EMI obligation is ₹{context['monthly_emi_outflow']:,.2f}."
+        Returns (local answer or None, provider context, fallback answer for
+        when no provider replies in time).
+        """
+        query = chat_query.parse(message)
+        if query:
+            result = await sync_to_async(chat_query.run)(query)
+            local = chat_query.describe(query, result)
+            if intents.OPEN_ENDED.search(message.lower()) is None:
+                return local, None, None
+            # The provider sees the scoped result, not the ledger
+            return None, {'query': query.as_dict(), 'result': result, 'currency': 'INR'}, local
+
+        match = intents.classify(message)
+        if match and match.confident:
+            return await sync_to_async(intents.answer)(match, user), None, None
+
+        context = await sync_to_async(self.get_context_data)()
+        return None, context, self.local_answer(user, message, context)
+
+    async def _answer(self, user, message):
+        """
+        Local answer, else the hedged providers under one deadline, else the
+        rule-based answer. Returns (answer, cacheable): a rule-based stand-in
+        for a provider that missed the deadline is not cached, so the
+        question is asked again.
+        """
+        local, context, fallback = await self._plan(user, message)
+        if local is not None:
+            return local, True
+        answer = await self.ask_providers(message, context)
+        return (answer, True) if answer else (fallback, False)
+
+    async def astream_message(self, user, message):
+        """
+        Streaming variant of aprocess_message: yields cached and local answers
+        whole and relays provider tokens as they arrive. A stream that ends
+        early (client gone, provider error) is not cached.
+        """
+        cached, version = await chat_responses.aget(user, message)
+        if cached is not None:
+            yield cached
+            return
+
+        local, context, fallback = await self._plan(user, message)
+        if local is not None:
+            await chat_responses.aset(user, message, local, version)
+            yield local
+            return
+
+        tokens = []
+        try:
+            async for token in self.stream_providers(message, context):
+                tokens.append(token)
+                yield token
+        except (httpx.HTTPError, ValueError, KeyError) as e:
+            print(f"Provider stream error: {e}")
+            return
+        if tokens:
+            await chat_responses.aset(user, message, ''.join(tokens), version)
+        else:
+            yield fallback
+
+    def process_message(self, user, message):
+        """
+        Process the user's message. Tries the local intents, the LLM providers
+        (hedged, under one deadline), then Rule-Based.
+        """
+        return async_to_sync(self.aprocess_message)(user, message)
 
-        # Net Worth
-        if 'net worth' in message_lower or 'wealth' in message_lower:
-            return f"Your approximate liquid net worth (Savings + Investments) is ₹{context['net_worth']:,.2f}."
+    def local_answer(self, user, message, context):
+        """Rule-Based Logic: the closest local intent, however unsure, answered from the context."""
+        match = intents.classify(message)
+        if match:
+            return intents.answer(match, user, context)
 
         # Default fallback
         return "I'm running in local mode. Please configure OPENAI_API_KEY or GOOGLE_API_KEY for full AI capabilities."
@@ -0,0 +1,46 @@
+"""
+Read/write routing.
+
+Writes, and every read by default, use the `default` connection. Code that
+only reads and may run alongside writes (dashboard, analytics, trends)
+wraps itself in read_replica(), and its reads go to the query-only `replica`
+connection. Inside a transaction on `default` they stay there, so a request
+always sees its own uncommitted writes.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+REPLICA = 'replica'
+
+_reading = ContextVar('read_replica', default=False)
+
+
+@contextmanager
+def read_replica():
+    """Send the reads made inside the block to the replica connection."""
+    token = _reading.set(True)
+    try:
+        yield
+    finally:
+        _reading.reset(token)
+
+
+class ReadReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if not _reading.get() or REPLICA not in connections.settings:
+            return None
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return REPLICA
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases are the same database
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != REPLICA
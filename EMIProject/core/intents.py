@@ -0,0 +1,147 @@
+"""
+Local intent engine for FinBot.
+
+Classifies a chat message into one of the financial intents below (token
+patterns and phrases, with fuzzy matching for typos) and answers it straight
+from the database. Confident matches never reach the LLM providers; open-ended
+or ambiguous questions ("should I prepay my loan?") are left to them.
+"""
+import re
+from dataclasses import dataclass
+from difflib import get_close_matches
+
+from django.db.models import Sum
+from expenses.models import Expense
+from .models import Saving, Investment, Loan, Policy
+
+# Scores: a phrase or token pattern hit, a fuzzy (typo) hit, and the cut-off
+# above which the local answer is used without asking a provider.
+EXACT = 0.9
+FUZZY = 0.75
+CONFIDENT = 0.7
+
+# Advice / reasoning questions need a model, not a lookup
+OPEN_ENDED = re.compile(
+    r"\b(should|why|advice|advise|recommend|suggest|plan|planning|compare|better|best|"
+    r"reduce|improve|afford|what if|how (can|do|should|to))\b"
+)
+WORD = re.compile(r"[a-z]+")
+
+
+# --- Facts: each one is a single aggregate, computed only when an answer needs it ---
+
+def _total_expenses():
+    return float(Expense.objects.aggregate(Sum('amount'))['amount__sum'] or 0)
+
+def _total_savings():
+    return float(Saving.objects.aggregate(Sum('amount'))['amount__sum'] or 0)
+
+FACTS = {
+    'expenses': _total_expenses,
+    'savings': _total_savings,
+    'investments': lambda: float(Investment.get_total_invested()),
+    'insurance_coverage': lambda: float(Policy.get_total_sum_assured()),
+    'active_loans_count': lambda: Loan.objects.count(),
+    'total_debt_principal': lambda: float(Loan.objects.aggregate(Sum('principal'))['principal__sum'] or 0),
+    'monthly_emi_outflow': lambda: float(Loan.get_total_emi()),
+    'currency': lambda: 'INR',
+}
+
+
+class Facts(dict):
+    """The user's financial snapshot, filled in lazily one fact at a time."""
+
+    def __missing__(self, key):
+        if key == 'net_worth':
+            value = self['savings'] + self['investments']
+        else:
+            value = FACTS[key]()
+        self[key] = value
+        return value
+
+    def all(self):
+        for key in list(FACTS) + ['net_worth']:
+            self[key]
+        return dict(self)
+
+
+# --- Intents ---
+
+@dataclass(frozen=True)
+class Intent:
+    name: str
+    patterns: tuple          # regexes matched against single tokens
+    phrases: tuple = ()      # regexes matched against the whole message
+    vocabulary: tuple = ()   # words a misspelt token is fuzzily matched to
+    financial: bool = True
+
+    def score(self, text, tokens):
+        if any(re.search(phrase, text) for phrase in self.phrases):
+            return EXACT
+        if any(re.fullmatch(pattern, token) for pattern in self.patterns for token in tokens):
+            return EXACT
+        for token in tokens:
+            if len(token) >= 5 and get_close_matches(token, self.vocabulary, n=1, cutoff=0.8):
+                return FUZZY
+        return 0.0
+
+
+INTENTS = (
+    Intent('greeting', (r'hello', r'hi', r'hey', r'greetings'), financial=False),
+    Intent('help', (r'help',), phrases=(r'what can you do',), financial=False),
+    Intent('expenses', (r'expens\w*', r'spen[dt]\w*'), vocabulary=('expense', 'expenses', 'spending', 'spent')),
+    Intent('net_worth', (r'wealth',), phrases=(r'\bnet\s*worth\b',), vocabulary=('wealth', 'networth')),
+    Intent('savings', (r'sav(e|ed|es|ing|ings)',), vocabulary=('saved', 'saving', 'savings')),
+    Intent('investments', (r'invest\w*', r'portfolio'), vocabulary=('invest', 'investment', 'investments', 'portfolio')),
+    Intent('insurance', (r'polic(y|ies)', r'insur\w*'), vocabulary=('policy', 'policies', 'insurance')),
+    Intent('loans', (r'loans?', r'emis?', r'debts?'), vocabulary=('loans',)),
+)
+
+ANSWERS = {
+    'greeting': lambda user, facts: f"Hello {user.username.title()}! I am FinBot. I can track your expenses, savings, and net worth.",
+    'help': lambda user, facts: "I can track your finances. Try asking:\n- 'Total expenses'\n- 'How much have I saved?'\n- 'Show my investments'\n- 'What is my net worth?'",
+    'expenses': lambda user, facts: f"Your total recorded expenses amount to ₹{facts['expenses']:,.2f}.",
+    'savings': lambda user, facts: f"You have currently saved a total of ₹{facts['savings']:,.2f}. Great job!",
+    'investments': lambda user, facts: f"Your total investment portfolio is valued at ₹{facts['investments']:,.2f}.",
+    'insurance': lambda user, facts: f"Your total insurance sum assured is ₹{facts['insurance_coverage']:,.2f}.",
+    'loans': lambda user, facts: f"You have {facts['active_loans_count']} active loans. Your total monthly EMI obligation is ₹{facts['monthly_emi_outflow']:,.2f}.",
+    'net_worth': lambda user, facts: f"Your approximate liquid net worth (Savings + Investments) is ₹{facts['net_worth']:,.2f}.",
+}
+
+
+@dataclass(frozen=True)
+class Match:
+    intent: str
+    confidence: float
+
+    @property
+    def confident(self):
+        return self.confidence >= CONFIDENT
+
+
+def classify(message):
+    """Best-scoring intent for the message, or None when nothing matches."""
+    text = message.lower().strip()
+    tokens = WORD.findall(text)
+    scored = [(intent.score(text, tokens), intent) for intent in INTENTS]
+    scored = [(score, intent) for score, intent in scored if score]
+    if not scored:
+        return None
+
+    financial = [(score, intent) for score, intent in scored if intent.financial]
+    # "Hi, what are my expenses?" is an expenses question
+    candidates = financial or scored
+    # Stable sort keeps the table order on ties
+    score, intent = sorted(candidates, key=lambda pair: -pair[0])[0]
+
+    if len(financial) > 1:
+        # Several topics at once ("savings vs investments") is a conversation
+        score *= 0.6
+    if OPEN_ENDED.search(text):
+        score *= 0.5
+    return Match(intent.name, round(score, 2))
+
+
+def answer(match, user, facts=None):
+    """Answer a classified message from the database (or the given facts)."""
+    return ANSWERS[match.intent](user, facts if facts is not None else Facts())
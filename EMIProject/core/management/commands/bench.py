@@ -0,0 +1,61 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmarks import runner
+from core.benchmarks.cases import build_cases
+from core.benchmarks.database import throwaway_database
+from core.benchmarks.seed import DEFAULT_VOLUMES, seed
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds a throwaway test database and measures wall time and query counts of the hot "
+        "views and services. Writes a JSON report; with --compare, fails on regressions."
+    )
+
+    def add_arguments(self, parser):
+        for name, default in DEFAULT_VOLUMES.items():
+            parser.add_argument(f'--{name}', type=int, default=default, help=f"Rows to seed (default {default}).")
+        parser.add_argument('--repeat', type=int, default=5, help="Repetitions per case (default 5).")
+        parser.add_argument('--only', action='append', help="Only run this case (may be repeated).")
+        parser.add_argument('--output', help="Write the JSON report to this file instead of stdout.")
+        parser.add_argument('--compare', help="Baseline JSON report to check this run against.")
+        parser.add_argument(
+            '--threshold', type=float, default=0.25,
+            help="Allowed slowdown of a case's median before it counts as a regression (default 0.25)."
+        )
+
+    def handle(self, *args, **options):
+        volumes = {name: options[name] for name in DEFAULT_VOLUMES}
+        baseline = None
+        if options['compare']:
+            with open(options['compare']) as f:
+                baseline = json.load(f)
+
+        with throwaway_database():
+            self.stderr.write(f"Seeding {', '.join(f'{count} {name}' for name, count in volumes.items())}...")
+            user = seed(volumes)
+
+            cases = build_cases(user)
+            if options['only']:
+                unknown = set(options['only']) - {case.name for case in cases}
+                if unknown:
+                    raise CommandError(f"Unknown case(s): {', '.join(sorted(unknown))}")
+                cases = [case for case in cases if case.name in options['only']]
+
+            report = runner.run(cases, repeat=options['repeat'], volumes=volumes)
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output + '\n')
+            self.stderr.write(f"Report written to {options['output']}")
+        else:
+            self.stdout.write(output)
+
+        if baseline:
+            regressions = runner.compare(baseline, report, threshold=options['threshold'])
+            if regressions:
+                raise CommandError("Performance regressions:\n  " + "\n  ".join(regressions))
+            self.stderr.write(self.style.SUCCESS("No regressions against the baseline."))
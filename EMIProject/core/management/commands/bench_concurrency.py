@@ -0,0 +1,57 @@
+import json
+import os
+import tempfile
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from core.benchmarks import concurrency
+from core.benchmarks.database import throwaway_database
+from core.benchmarks.seed import seed
+
+# SQLite's defaults: rollback journal, deferred transactions, 5 s busy timeout
+UNTUNED = {'init_command': 'PRAGMA journal_mode=DELETE;'}
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds a throwaway SQLite file and loads the dashboard from several threads at once while "
+        "expenses are being added. Runs with the configured pragmas and, for comparison, with "
+        "SQLite's defaults; prints throughput, latency and lock failures of each as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=8, help="Concurrent dashboard clients (default 8).")
+        parser.add_argument('--duration', type=float, default=10.0, help="Seconds per run (default 10).")
+        parser.add_argument('--expenses', type=int, default=10_000, help="Expenses to seed (default 10000).")
+        parser.add_argument('--tuned-only', action='store_true', help="Skip the run with SQLite's defaults.")
+
+    def handle(self, *args, **options):
+        default = connections['default']
+        if default.vendor != 'sqlite':
+            raise CommandError("bench_concurrency compares SQLite settings; run it on SQLite.")
+
+        runs = {'tuned': None} if options['tuned_only'] else {'untuned': UNTUNED, 'tuned': None}
+        report = {}
+        for name, untuned_options in runs.items():
+            self.stderr.write(f"{name}: {options['workers']} workers for {options['duration']}s...")
+            report[name] = self.measure(options, untuned_options)
+
+        self.stdout.write(json.dumps(report, indent=2))
+
+    def measure(self, options, replacement_options):
+        aliases = [alias for alias in ('default', 'replica') if alias in connections.settings]
+        saved = {alias: dict(connections[alias].settings_dict['OPTIONS']) for alias in aliases}
+        if replacement_options is not None:
+            for alias in aliases:
+                connections[alias].settings_dict['OPTIONS'] = dict(replacement_options)
+
+        default = connections['default']
+        try:
+            with tempfile.TemporaryDirectory() as directory, throwaway_database(os.path.join(directory, 'bench.sqlite3')):
+                user = seed({'expenses': options['expenses']})
+                default.close() # reconnect with the OPTIONS under test
+                return concurrency.run(user, workers=options['workers'], duration=options['duration'])
+        finally:
+            for alias in aliases:
+                connections[alias].settings_dict['OPTIONS'] = saved[alias]
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from core.benchmarks import plans
+from core.benchmarks.database import throwaway_database
+from core.benchmarks.seed import seed
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds a throwaway test database, renders the hot views and runs EXPLAIN QUERY PLAN on "
+        "every SELECT they issue. Fails when a filtered query scans a whole ledger table."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--expenses', type=int, default=2000, help="Expenses to seed (default 2000).")
+        parser.add_argument('--show', action='store_true', help="Print every query with its plan.")
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError("check_query_plans reads SQLite's EXPLAIN QUERY PLAN output; run it on SQLite.")
+
+        with throwaway_database():
+            user = seed({'expenses': options['expenses']})
+            results, problems = plans.check(user)
+
+        if options['show']:
+            for view, sql, plan in results:
+                self.stdout.write(f"[{view}] {sql}")
+                for line in plan:
+                    self.stdout.write(f"    {line}")
+
+        if problems:
+            raise CommandError("Unexpected full table scans:\n  " + "\n  ".join(problems))
+        self.stderr.write(self.style.SUCCESS(f"{len(results)} queries checked, no unexpected full scans."))
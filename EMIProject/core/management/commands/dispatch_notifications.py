@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.services.outbox import OutboxDispatcher
+
+
+class Command(BaseCommand):
+    help = (
+        "Sends due notifications from the outbox (coalescing bursts, rate limited, retried with backoff). "
+        "Run it every minute from cron, or as a worker with --loop."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=100, help="Most notifications to claim per pass.")
+        parser.add_argument('--loop', action='store_true', help="Keep running, polling the outbox.")
+        parser.add_argument('--interval', type=float, default=5.0, help="Seconds between polls with --loop.")
+
+    def handle(self, *args, **options):
+        while True:
+            result = OutboxDispatcher().dispatch(limit=options['limit'])
+            if any(result.values()) or not options['loop']:
+                summary = ", ".join(f"{count} {name}" for name, count in result.items())
+                self.stdout.write(self.style.SUCCESS(f"Notifications: {summary}."))
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from expenses.importers import BATCH_SIZE, StatementError, import_statement
+
+
+class Command(BaseCommand):
+    help = (
+        "Imports a bank statement (CSV or OFX) into the expense ledger. Money-out lines become "
+        "expenses; lines already imported (by content hash) are skipped, so re-running is safe."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Statement file.")
+        parser.add_argument('--format', choices=['csv', 'ofx'], help="Defaults to detecting it from the file.")
+        parser.add_argument('--encoding', default='utf-8-sig', help="File encoding (default utf-8-sig).")
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help=f"Rows per transaction (default {BATCH_SIZE}).")
+
+    def handle(self, *args, **options):
+        def progress(result):
+            self.stderr.write(f"  {result.read} read, {result.imported} imported, {result.duplicates} duplicates...")
+
+        try:
+            with open(options['path'], encoding=options['encoding'], newline='') as stream:
+                result = import_statement(
+                    stream, fmt=options['format'], filename=options['path'],
+                    batch_size=options['batch_size'], progress=progress,
+                )
+        except OSError as e:
+            raise CommandError(str(e))
+        except StatementError as e:
+            if e.result and e.result.imported:
+                raise CommandError(f"{e} {e.result.imported} expenses from the lines before it were imported.")
+            raise CommandError(str(e))
+
+        for error in result.errors:
+            self.stderr.write(self.style.WARNING(error))
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {result.imported} expenses from {result.read} lines "
+            f"({result.duplicates} already imported, {result.credits} credits skipped, {result.invalid} invalid)."
+        ))
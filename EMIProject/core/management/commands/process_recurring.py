@@ -0,0 +1,23 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from core.services.recurrence import RecurrenceEngine
+
+
+class Command(BaseCommand):
+    help = (
+        "Books every recurring expense, saving and SIP occurrence missed since it was last processed. "
+        "Safe to rerun; schedule it daily (e.g. cron: `0 1 * * * manage.py process_recurring`)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--until', type=date.fromisoformat,
+            help="Book occurrences up to this day (YYYY-MM-DD). Defaults to today."
+        )
+
+    def handle(self, *args, **options):
+        created = RecurrenceEngine(today=options['until']).run()
+        summary = ", ".join(f"{count} {name}" for name, count in created.items())
+        self.stdout.write(self.style.SUCCESS(f"Booked {summary}."))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from core.models import MonthlyRollup
+from core.services import rollups
+
+
+class Command(BaseCommand):
+    help = "Recomputes the month x category rollup table from the raw ledger."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--kind', action='append', choices=[kind for kind, _ in MonthlyRollup.KIND_CHOICES],
+            help="Only rebuild this kind (may be repeated). Defaults to all kinds."
+        )
+
+    def handle(self, *args, **options):
+        kinds = options['kind']
+        models = [
+            model for model, (kind, _) in rollups.ROLLUP_SOURCES.items()
+            if not kinds or kind in kinds
+        ]
+        rollups.rebuild(models)
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {MonthlyRollup.objects.count()} rollup rows."
+        ))
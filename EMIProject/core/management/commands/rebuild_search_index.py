@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.services import search
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuilds the full-text search index from expenses, documents, loans, investments, savings and policies. "
+        "Signals keep it current; run this after raw SQL imports or restoring a backup."
+    )
+
+    def handle(self, *args, **options):
+        if not search.available():
+            raise CommandError("The search index needs SQLite with FTS5 (created by migration core 0020).")
+        indexed = search.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} rows."))
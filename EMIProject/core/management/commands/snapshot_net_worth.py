@@ -0,0 +1,22 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from core.services.net_worth import NetWorthService
+
+
+class Command(BaseCommand):
+    help = (
+        "Appends daily net worth snapshots for every day missing since the last run. "
+        "Schedule it daily (e.g. cron: `5 0 * * * manage.py snapshot_net_worth`)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--until', type=date.fromisoformat,
+            help="Last day to snapshot (YYYY-MM-DD). Defaults to yesterday, the last completed day."
+        )
+
+    def handle(self, *args, **options):
+        created = NetWorthService().fill_snapshots(until=options['until'])
+        self.stdout.write(self.style.SUCCESS(f"Stored {created} net worth snapshots."))
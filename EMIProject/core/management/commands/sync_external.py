@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.services.sync import ExternalSyncService
+
+
+class Command(BaseCommand):
+    help = "Syncs loans (Experian) and holdings (broker) outside the request cycle."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--source', action='append', choices=ExternalSyncService.SOURCES,
+            help="Only sync this source (may be repeated). Defaults to all sources."
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help="Keep running and sync every --interval seconds."
+        )
+        parser.add_argument(
+            '--interval', type=int, default=900,
+            help="Seconds between syncs when running with --loop (default: 900)."
+        )
+
+    def handle(self, *args, **options):
+        service = ExternalSyncService()
+
+        while True:
+            results = service.run(options['source'])
+            for source, status in results.items():
+                if status.last_error:
+                    self.stderr.write(f"{source}: sync failed ({status.last_error})")
+                else:
+                    self.stdout.write(self.style.SUCCESS(f"{source}: {status.items_synced} items synced"))
+
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
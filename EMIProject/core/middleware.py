@@ -0,0 +1,215 @@
+import logging
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger('core.perf')
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class QueryRecorder:
+    """connection.execute_wrapper that times every query and keeps its SQL for duplicate detection."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        # Params are kept as a hash: a bulk import runs thousands of statements
+        # and their values would otherwise stay in memory for the whole request
+        self.statements = Counter()  # (sql, hash of params) -> executions
+        self.templates = Counter()   # sql -> executions, whatever the params
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            self.templates[sql] += 1
+            self.statements[(sql, hash(repr(params)))] += 1
+
+    @staticmethod
+    def _repeats(counter):
+        return sum(n - 1 for n in counter.values() if n > 1)
+
+    @property
+    def duplicates(self):
+        """Identical queries (same SQL and params) run more than once."""
+        return self._repeats(self.statements)
+
+    @property
+    def similar(self):
+        """Repeats of the same SQL with different params: the N+1 signature."""
+        return self._repeats(self.templates) - self.duplicates
+
+
+# The recorder of the request being served. Connections are per thread, but
+# context variables follow a request into the worker threads that run its
+# ORM calls under ASGI, so every connection carries one wrapper that reports
+# to whichever recorder is current.
+_recorder = ContextVar('query_recorder', default=None)
+
+
+def record_query(execute, sql, params, many, context):
+    recorder = _recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    return recorder(execute, sql, params, many, context)
+
+
+def install_recorder(connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+connection_created.connect(install_recorder, dispatch_uid='query_instrumentation')
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Records per request: SQL query count, SQL time, duplicate/similar query
+    counts and total view time.
+
+    The figures are sent as a Server-Timing header, logged as one key=value
+    line on the ``core.perf`` logger and attached to the response as
+    ``response.query_stats`` so tests can assert on them.
+
+    Views may declare ``query_budget = <max queries>``. A request over budget
+    is logged as a warning, or raises QueryBudgetExceeded when the
+    QUERY_BUDGET_STRICT setting is on (e.g. via override_settings in tests).
+
+    The same figures are recorded under ASGI, for sync views run in a worker
+    thread and for async views using the a*() query methods alike.
+
+    A streaming response (ledger export, chat stream) runs most of its queries
+    while its body is sent, after the headers have gone out, so it gets no
+    Server-Timing header. Its figures are logged, checked against the budget
+    and set as ``query_stats`` once the body has been sent in full.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        # Connections opened before this module was imported
+        for connection in connections.all(initialized_only=True):
+            install_recorder(connection)
+        recorder = QueryRecorder()
+        token = _recorder.set(recorder)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _recorder.reset(token)
+        return self.report(request, response, recorder, started)
+
+    async def __acall__(self, request):
+        recorder = QueryRecorder()
+        token = _recorder.set(recorder)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _recorder.reset(token)
+        return self.report(request, response, recorder, started)
+
+    def report(self, request, response, recorder, started):
+        if response.streaming:
+            def finish():
+                self.log(request, response, self.stats(request, recorder, started))
+
+            if response.is_async:
+                response.streaming_content = self._record_async(response.streaming_content, recorder, finish)
+            else:
+                response.streaming_content = self._record_sync(response.streaming_content, recorder, finish)
+            return response
+
+        stats = self.stats(request, recorder, started)
+        timing = (
+            f'db;dur={stats["db_ms"]};desc="{stats["queries"]} queries", '
+            f'view;dur={stats["view_ms"]}'
+        )
+        if response.has_header('Server-Timing'):
+            timing = f"{response['Server-Timing']}, {timing}"
+        response['Server-Timing'] = timing
+        return self.log(request, response, stats)
+
+    @staticmethod
+    def _record_sync(content, recorder, finish):
+        iterator = iter(content)
+        while True:
+            token = _recorder.set(recorder)
+            try:
+                chunk = next(iterator)
+            except StopIteration:
+                break
+            finally:
+                _recorder.reset(token)
+            yield chunk
+        finish()
+
+    @staticmethod
+    async def _record_async(content, recorder, finish):
+        iterator = aiter(content)
+        while True:
+            token = _recorder.set(recorder)
+            try:
+                chunk = await anext(iterator)
+            except StopAsyncIteration:
+                break
+            finally:
+                _recorder.reset(token)
+            yield chunk
+        finish()
+
+    @staticmethod
+    def stats(request, recorder, started):
+        view_ms = (time.perf_counter() - started) * 1000
+        return {
+            'queries': recorder.count,
+            'db_ms': round(recorder.duration * 1000, 2),
+            'duplicates': recorder.duplicates,
+            'similar': recorder.similar,
+            'view_ms': round(view_ms, 2),
+            'budget': getattr(request, 'query_budget', None),
+        }
+
+    def log(self, request, response, stats):
+        response.query_stats = stats
+        budget = stats['budget']
+        view_name = request.resolver_match.view_name if request.resolver_match else ''
+        line = ' '.join(
+            [f'method={request.method}', f'path={request.path}', f'view={view_name or "-"}', f'status={response.status_code}']
+            + [f'{key}={value}' for key, value in stats.items() if value is not None]
+        )
+        over_budget = budget is not None and stats['queries'] > budget
+        if over_budget:
+            logger.warning(f'{line} over_budget=1', extra={'perf': stats})
+            if getattr(settings, 'QUERY_BUDGET_STRICT', False):
+                raise QueryBudgetExceeded(
+                    f"{view_name or request.path} ran {stats['queries']} queries (budget {budget})."
+                )
+        else:
+            logger.info(line, extra={'perf': stats})
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view = getattr(view_func, 'view_class', view_func)
+        request.query_budget = getattr(view, 'query_budget', None)
+        return None
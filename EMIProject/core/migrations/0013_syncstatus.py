@@ -0,0 +1,24 @@
+# Generated by Django 6.0.1 on 2026-10-18 01:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_userprofile_vault_pin'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncStatus',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(choices=[('EXPERIAN', 'Experian Credit Report'), ('BROKER', 'Broker Portfolio')], max_length=10, unique=True)),
+                ('last_attempt_at', models.DateTimeField(blank=True, null=True)),
+                ('last_success_at', models.DateTimeField(blank=True, help_text='Last time the sync completed without errors', null=True)),
+                ('last_error', models.TextField(blank=True, default='')),
+                ('items_synced', models.IntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 6.0.1 on 2026-10-18 01:49
+
+from django.db import migrations, models
+from django.db.models import Sum, Count, F, Value, CharField
+from django.db.models.functions import TruncMonth
+
+
+def backfill_rollups(apps, schema_editor):
+    MonthlyRollup = apps.get_model('core', 'MonthlyRollup')
+    sources = [
+        (apps.get_model('expenses', 'Expense'), 'EXP', 'category'),
+        (apps.get_model('core', 'Saving'), 'SAV', None),
+        (apps.get_model('core', 'Investment'), 'INV', 'category'),
+    ]
+    for model, kind, category_field in sources:
+        category = F(category_field) if category_field else Value('', output_field=CharField())
+        rows = (
+            model.objects.annotate(rollup_month=TruncMonth('date'), rollup_category=category)
+            .values('rollup_month', 'rollup_category')
+            .annotate(total=Sum('amount'), count=Count('id'))
+            .order_by()
+        )
+        MonthlyRollup.objects.bulk_create([
+            MonthlyRollup(
+                month=row['rollup_month'],
+                kind=kind,
+                category=row['rollup_category'] or '',
+                total=row['total'] or 0,
+                count=row['count'],
+            )
+            for row in rows
+        ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_syncstatus'),
+        ('expenses', '0003_recurringexpense_payment_date_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='First day of the month')),
+                ('kind', models.CharField(choices=[('EXP', 'Expense'), ('SAV', 'Saving'), ('INV', 'Investment')], max_length=3)),
+                ('category', models.CharField(blank=True, default='', max_length=3)),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('month', 'kind', 'category'), name='unique_monthly_rollup')],
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
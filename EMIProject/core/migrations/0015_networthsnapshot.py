@@ -0,0 +1,25 @@
+# Generated by Django 6.0.1 on 2026-10-18 01:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_monthlyrollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NetWorthSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('savings', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('investments', models.DecimalField(decimal_places=2, default=0, help_text='Holdings at current value', max_digits=14)),
+                ('loans_outstanding', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('policies', models.DecimalField(decimal_places=2, default=0, help_text='Total sum assured', max_digits=14)),
+                ('net_worth', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+            ],
+        ),
+    ]
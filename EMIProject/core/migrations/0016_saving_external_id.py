@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-18 01:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_networthsnapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='saving',
+            name='external_id',
+            field=models.CharField(blank=True, help_text='Idempotency key for generated entries (e.g. recurring savings)', max_length=50, null=True, unique=True),
+        ),
+    ]
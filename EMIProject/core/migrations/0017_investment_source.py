@@ -0,0 +1,32 @@
+# Generated by Django 6.0.1 on 2026-10-18 01:59
+
+from django.db import migrations, models
+from django.db.models import Q
+
+
+def classify_existing(apps, schema_editor):
+    Investment = apps.get_model('core', 'Investment')
+    recurring = Q(external_id__startswith='RECUR-') | Q(external_id__startswith='SIP-')
+    Investment.objects.filter(recurring).update(source='RECURRING')
+    Investment.objects.filter(external_id__isnull=False).exclude(recurring).update(source='BROKER')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_saving_external_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='investment',
+            name='source',
+            field=models.CharField(choices=[('MANUAL', 'Manual'), ('BROKER', 'Broker Sync'), ('RECURRING', 'Recurring SIP')], default='MANUAL', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='investment',
+            name='user_edited',
+            field=models.BooleanField(default=False, help_text="Edited by hand; broker syncs keep the user's values"),
+        ),
+        migrations.RunPython(classify_existing, migrations.RunPython.noop),
+    ]
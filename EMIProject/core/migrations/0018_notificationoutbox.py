@@ -0,0 +1,35 @@
+# Generated by Django 6.0.1 on 2026-10-18 02:19
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_investment_source'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationOutbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('channel', models.CharField(choices=[('WHATSAPP', 'WhatsApp')], default='WHATSAPP', max_length=10)),
+                ('kind', models.CharField(help_text='Message type, e.g. HIGH_VALUE_EXPENSE', max_length=30)),
+                ('recipient', models.CharField(max_length=20)),
+                ('payload', models.JSONField(default=dict)),
+                ('dedupe_key', models.CharField(help_text='One notification per event', max_length=100, unique=True)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('SENDING', 'Sending'), ('SENT', 'Sent'), ('COALESCED', 'Sent with others'), ('FAILED', 'Failed')], default='PENDING', max_length=10)),
+                ('attempts', models.IntegerField(default=0)),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now, help_text="Due time; while SENDING, the end of the dispatcher's lease")),
+                ('claim', models.CharField(blank=True, default='', help_text='Dispatcher run that holds the row', max_length=32)),
+                ('last_error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='outbox_due')],
+            },
+        ),
+    ]
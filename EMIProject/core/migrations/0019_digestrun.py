@@ -0,0 +1,31 @@
+# Generated by Django 6.0.1 on 2026-10-18 02:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0018_notificationoutbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DigestRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('channel', models.CharField(max_length=20)),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('subscribers', models.IntegerField(default=0)),
+                ('delivered', models.IntegerField(default=0)),
+                ('query_ms', models.FloatField(default=0, help_text='Shared ledger figures and subscriber list')),
+                ('render_ms', models.FloatField(default=0)),
+                ('send_ms', models.FloatField(default=0)),
+                ('total_ms', models.FloatField(default=0)),
+            ],
+            options={
+                'ordering': ['-started_at'],
+            },
+        ),
+    ]
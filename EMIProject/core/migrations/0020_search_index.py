@@ -0,0 +1,58 @@
+# Generated by Django 6.0.1 on 2026-10-18 02:40
+
+from django.db import migrations
+
+# Same layout as core/services/search.py: rowid = pk * 8 + kind code
+KIND_SLOTS = 8
+SOURCES = [
+    # (code, app, model, title field, detail field or fixed detail)
+    (1, 'expenses', 'Expense', 'title', 'category'),
+    (2, 'core', 'Document', 'title', 'Document'),
+    (3, 'core', 'Loan', 'name', 'Loan'),
+    (4, 'core', 'Investment', 'name', 'category'),
+    (5, 'core', 'Saving', 'name', 'Saving'),
+    (6, 'core', 'Policy', 'name', 'type'),
+]
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5("
+            "title, detail, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+        )
+        for code, app, name, title, detail in SOURCES:
+            model = apps.get_model(app, name)
+            choices = {}
+            if detail in [field.name for field in model._meta.get_fields()]:
+                choices = dict(model._meta.get_field(detail).choices)
+            rows = [
+                (
+                    obj.pk * KIND_SLOTS + code,
+                    getattr(obj, title),
+                    choices.get(getattr(obj, detail), getattr(obj, detail)) if choices else detail,
+                )
+                for obj in model.objects.order_by().iterator()
+            ]
+            cursor.executemany("INSERT INTO search_index (rowid, title, detail) VALUES (%s, %s, %s)", rows)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("DROP TABLE IF EXISTS search_index")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0019_digestrun'),
+        ('expenses', '0004_expense_external_id'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
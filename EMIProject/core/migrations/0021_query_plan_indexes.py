@@ -0,0 +1,33 @@
+# Generated by Django 6.0.1 on 2026-10-18 02:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0020_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(fields=['uploaded_at'], name='document_uploaded_at'),
+        ),
+        migrations.AddIndex(
+            model_name='investment',
+            index=models.Index(fields=['date'], name='investment_date'),
+        ),
+        migrations.AddIndex(
+            model_name='loan',
+            index=models.Index(fields=['start_date'], name='loan_start_date'),
+        ),
+        migrations.AddIndex(
+            model_name='recurringwealth',
+            index=models.Index(condition=models.Q(('active', True)), fields=['start_date'], name='recurring_wealth_due'),
+        ),
+        migrations.AddIndex(
+            model_name='saving',
+            index=models.Index(fields=['date'], name='saving_date'),
+        ),
+    ]
@@ -1,6 +1,9 @@
 from django.db import models
+from django.utils import timezone
 from datetime import date
 from decimal import Decimal
+from dateutil.relativedelta import relativedelta
+from core.utils import amortization
 
 class Loan(models.Model):
     BENCHMARK_CHOICES = [
@@ -19,17 +22,9 @@ class Loan(models.Model):
 
 
     def calculate_emi(self):
-        # EMI = [P x R x (1+R)^N]/[(1+R)^N-1]
-        # R is monthly rate (annual / 12 / 100)
-        p = self.principal
-        r = (self.rate / 12) / 100
-        n = self.tenure_months
-        
-        if r == 0:
-            return p / n
-            
-        emi = (p * r * ((1 + r) ** n)) / (((1 + r) ** n) - 1)
-        return round(emi, 2)
+        # EMI = [P x R x (1+R)^N]/[(1+R)^N-1], R = monthly rate (annual / 12 / 100)
+        emi = amortization.emis([self.principal], [self.rate], [self.tenure_months])[0]
+        return amortization.to_decimal(emi)
 
     def total_payable(self):
         return self.calculate_emi() * self.tenure_months
@@ -37,22 +32,72 @@ class Loan(models.Model):
     def total_interest(self):
         return self.total_payable() - self.principal
 
+    def payments_made(self, as_of=None):
+        """Number of EMIs paid by as_of (first EMI falls one month after start_date)."""
+        as_of = as_of or date.today()
+        start = self.start_date
+        months = (as_of.year - start.year) * 12 + (as_of.month - start.month)
+        if as_of.day < start.day:
+            months -= 1
+        return max(0, min(months, self.tenure_months))
+
+    def outstanding_balance(self, as_of=None):
+        """Principal still owed on as_of, per the standard amortization schedule."""
+        as_of = as_of or date.today()
+        if as_of < self.start_date:
+            return Decimal('0')
+        balance = amortization.balances(
+            [self.principal], [self.rate], [self.tenure_months], [self.payments_made(as_of)]
+        )[0]
+        return amortization.to_decimal(balance)
+
+    def schedule(self):
+        """Month-by-month instalments: due date, payment, interest/principal split and balance."""
+        table = amortization.schedules([self.principal], [self.rate], [self.tenure_months])
+        return [
+            {
+                'number': month + 1,
+                'due_date': self.start_date + relativedelta(months=month + 1),
+                'payment': amortization.to_decimal(table['payment'][0, month]),
+                'interest': amortization.to_decimal(table['interest'][0, month]),
+                'principal': amortization.to_decimal(table['principal'][0, month]),
+                'balance': amortization.to_decimal(table['balance'][0, month]),
+            }
+            for month in range(max(self.tenure_months, 1))
+        ]
+
     def __str__(self):
         return self.name
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['start_date'], name='loan_start_date'),
+        ]
+
     @classmethod
     def get_total_emi(cls):
-        loans = cls.objects.all()
-        return sum(loan.calculate_emi() for loan in loans)
+        loans = cls.objects.only('principal', 'rate', 'tenure_months')
+        return amortization.to_decimal(amortization.emis(*amortization.loan_arrays(loans)).sum())
+
+    @classmethod
+    def get_total_outstanding(cls, as_of=None):
+        loans = amortization.annotate(list(cls.objects.only('principal', 'rate', 'tenure_months', 'start_date')), as_of)
+        return sum((loan.balance for loan in loans), Decimal('0'))
 
 class Saving(models.Model):
     name = models.CharField(max_length=100)
     amount = models.DecimalField(max_digits=12, decimal_places=2)
     date = models.DateField()
+    external_id = models.CharField(max_length=50, blank=True, null=True, unique=True, help_text="Idempotency key for generated entries (e.g. recurring savings)")
 
     def __str__(self):
         return f"{self.name} - {self.amount}"
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['date'], name='saving_date'),
+        ]
+
 class Investment(models.Model):
     CATEGORY_CHOICES = [
         ('STK', 'Stocks'),
@@ -63,6 +108,11 @@ class Investment(models.Model):
         ('CRY', 'Crypto'),
         ('OTH', 'Other'),
     ]
+    SOURCE_CHOICES = [
+        ('MANUAL', 'Manual'),
+        ('BROKER', 'Broker Sync'),
+        ('RECURRING', 'Recurring SIP'),
+    ]
     name = models.CharField(max_length=100)
     amount = models.DecimalField(max_digits=12, decimal_places=2, help_text="Invested Amount")
     current_value = models.DecimalField(max_digits=12, decimal_places=2, default=0, help_text="Current Market Value")
@@ -70,10 +120,17 @@ class Investment(models.Model):
     category = models.CharField(max_length=3, choices=CATEGORY_CHOICES, default='OTH')
     date = models.DateField()
     external_id = models.CharField(max_length=50, blank=True, null=True, unique=True, help_text="ID from external broker")
+    source = models.CharField(max_length=10, choices=SOURCE_CHOICES, default='MANUAL')
+    user_edited = models.BooleanField(default=False, help_text="Edited by hand; broker syncs keep the user's values")
 
     def __str__(self):
         return f"{self.name} ({self.get_category_display()})"
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['date'], name='investment_date'),
+        ]
+
     @classmethod
     def get_total_invested(cls):
         from django.db.models import Sum
@@ -106,6 +163,11 @@ class RecurringWealth(models.Model):
     def __str__(self):
         return f"{self.name} ({self.get_frequency_display()})"
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['start_date'], name='recurring_wealth_due', condition=models.Q(active=True)),
+        ]
+
 class Document(models.Model):
     title = models.CharField(max_length=100)
     file = models.FileField(upload_to='documents/')
@@ -115,6 +177,11 @@ class Document(models.Model):
     def __str__(self):
         return self.title
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['uploaded_at'], name='document_uploaded_at'),
+        ]
+
     @property
     def filename(self):
         return self.file.name.split('/')[-1]
@@ -173,3 +240,124 @@ def create_user_profile(sender, instance, created, **kwargs):
 @receiver(post_save, sender=User)
 def save_user_profile(sender, instance, **kwargs):
     instance.userprofile.save()
+
+
+class SyncStatus(models.Model):
+    SOURCE_CHOICES = [
+        ('EXPERIAN', 'Experian Credit Report'),
+        ('BROKER', 'Broker Portfolio'),
+    ]
+    source = models.CharField(max_length=10, choices=SOURCE_CHOICES, unique=True)
+    last_attempt_at = models.DateTimeField(null=True, blank=True)
+    last_success_at = models.DateTimeField(null=True, blank=True, help_text="Last time the sync completed without errors")
+    last_error = models.TextField(blank=True, default='')
+    items_synced = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.get_source_display()} (last synced {self.last_success_at or 'never'})"
+
+    @classmethod
+    def for_all_sources(cls):
+        """One status per source, in SOURCE_CHOICES order; unsaved for a source never synced."""
+        stored = {status.source: status for status in cls.objects.all()}
+        return [stored.get(source) or cls(source=source) for source, _ in cls.SOURCE_CHOICES]
+
+
+class MonthlyRollup(models.Model):
+    """
+    Pre-aggregated ledger totals per (month, kind, category), kept up to date
+    by signals in core/signals.py. Rebuild with `manage.py rebuild_rollups`.
+    """
+    KIND_CHOICES = [
+        ('EXP', 'Expense'),
+        ('SAV', 'Saving'),
+        ('INV', 'Investment'),
+    ]
+    month = models.DateField(help_text="First day of the month")
+    kind = models.CharField(max_length=3, choices=KIND_CHOICES)
+    category = models.CharField(max_length=3, blank=True, default='')
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['month', 'kind', 'category'], name='unique_monthly_rollup'),
+        ]
+
+    def __str__(self):
+        return f"{self.month:%b %Y} {self.get_kind_display()} {self.category}: {self.total}"
+
+
+class NetWorthSnapshot(models.Model):
+    """
+    End-of-day net worth of a completed day, appended by
+    `manage.py snapshot_net_worth` (today's point is computed live).
+    net_worth = savings + investments - loans_outstanding (policy cover is
+    recorded for reference but is not an asset).
+    """
+    date = models.DateField(unique=True)
+    savings = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    investments = models.DecimalField(max_digits=14, decimal_places=2, default=0, help_text="Holdings at current value")
+    loans_outstanding = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    policies = models.DecimalField(max_digits=14, decimal_places=2, default=0, help_text="Total sum assured")
+    net_worth = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    def __str__(self):
+        return f"{self.date}: {self.net_worth}"
+
+
+class NotificationOutbox(models.Model):
+    """
+    Notifications waiting to be sent. Written by signals in the same
+    transaction as the change that caused them and sent in the background by
+    `manage.py dispatch_notifications` (see core/services/outbox.py).
+    """
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('SENDING', 'Sending'),
+        ('SENT', 'Sent'),
+        ('COALESCED', 'Sent with others'),
+        ('FAILED', 'Failed'),
+    ]
+    CHANNEL_CHOICES = [
+        ('WHATSAPP', 'WhatsApp'),
+    ]
+    channel = models.CharField(max_length=10, choices=CHANNEL_CHOICES, default='WHATSAPP')
+    kind = models.CharField(max_length=30, help_text="Message type, e.g. HIGH_VALUE_EXPENSE")
+    recipient = models.CharField(max_length=20)
+    payload = models.JSONField(default=dict)
+    dedupe_key = models.CharField(max_length=100, unique=True, help_text="One notification per event")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PENDING')
+    attempts = models.IntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now, help_text="Due time; while SENDING, the end of the dispatcher's lease")
+    claim = models.CharField(max_length=32, blank=True, default='', help_text="Dispatcher run that holds the row")
+    last_error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_due'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} to {self.recipient} ({self.get_status_display()})"
+
+
+class DigestRun(models.Model):
+    """One run of `manage.py send_digest`, with its timings."""
+    day = models.DateField()
+    channel = models.CharField(max_length=20)
+    started_at = models.DateTimeField(auto_now_add=True)
+    subscribers = models.IntegerField(default=0)
+    delivered = models.IntegerField(default=0)
+    query_ms = models.FloatField(default=0, help_text="Shared ledger figures and subscriber list")
+    render_ms = models.FloatField(default=0)
+    send_ms = models.FloatField(default=0)
+    total_ms = models.FloatField(default=0)
+
+    class Meta:
+        ordering = ['-started_at']
+
+    def __str__(self):
+        return f"Digest {self.day} via {self.channel}: {self.delivered}/{self.subscribers} in {self.total_ms:.0f} ms"
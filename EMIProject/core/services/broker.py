@@ -1,19 +1,181 @@
 import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, time as dtime
+from zoneinfo import ZoneInfo
+
 import requests
-from datetime import date
+from requests.adapters import HTTPAdapter
+from django.core.cache import cache
+
+# AMFI publishes each business day's NAVs by 11 PM IST, so a NAV fetched
+# today stays valid until the next publish time.
+NAV_TIMEZONE = ZoneInfo('Asia/Kolkata')
+NAV_PUBLISH_TIME = dtime(23, 0)
+NAV_STALE_LIMIT = timedelta(days=3) # serve an expired NAV this long while it is refreshed
+MAX_WORKERS = 8
+
+_session = None
+_session_lock = threading.Lock()
+_refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='nav-refresh')
+
+
+def get_session():
+    """Process-wide requests.Session with a connection pool sized for concurrent NAV lookups."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=MAX_WORKERS)
+            _session.mount('https://', adapter)
+            _session.mount('http://', adapter)
+        return _session
+
+
+def next_nav_publish(after):
+    """First NAV publish time strictly after `after` (an aware datetime)."""
+    local = after.astimezone(NAV_TIMEZONE)
+    publish = datetime.combine(local.date(), NAV_PUBLISH_TIME, tzinfo=NAV_TIMEZONE)
+    if local >= publish:
+        publish += timedelta(days=1)
+    return publish
+
+
+class NavCache:
+    """
+    Per-scheme NAV cache that expires at the next daily publish.
+
+    Entries are fresh until the next publish time, then stale (still served,
+    while a background refresh runs) until NAV_STALE_LIMIT has passed.
+    Hit/stale/miss counters are kept in the cache like SnapshotCache's.
+    """
+
+    def __init__(self, namespace='nav'):
+        self.namespace = namespace
+
+    def _key(self, scheme_code):
+        return f'{self.namespace}:{scheme_code}'
+
+    def _stat_key(self, name):
+        return f'{self.namespace}:stats:{name}'
+
+    def get(self, scheme_code, now=None):
+        """Returns (nav, state) with state 'fresh', 'stale' or 'miss'."""
+        now = now or datetime.now(NAV_TIMEZONE)
+        entry = cache.get(self._key(scheme_code))
+        if entry is None:
+            self._count('misses')
+            return None, 'miss'
+        if now < entry['fresh_until']:
+            self._count('hits')
+            return entry['nav'], 'fresh'
+        self._count('stale')
+        return entry['nav'], 'stale'
+
+    def set(self, scheme_code, nav, now=None):
+        now = now or datetime.now(NAV_TIMEZONE)
+        fresh_until = next_nav_publish(now)
+        timeout = (fresh_until + NAV_STALE_LIMIT - now).total_seconds()
+        cache.set(self._key(scheme_code), {'nav': nav, 'fresh_until': fresh_until}, timeout)
+
+    def _count(self, name):
+        key = self._stat_key(name)
+        cache.add(key, 0, timeout=None)
+        try:
+            cache.incr(key)
+        except ValueError:
+            pass
+
+    def stats(self):
+        names = ('hits', 'stale', 'misses')
+        found = cache.get_many([self._stat_key(name) for name in names])
+        counts = {name: found.get(self._stat_key(name), 0) for name in names}
+        total = sum(counts.values())
+        served = counts['hits'] + counts['stale']
+        counts['hit_rate'] = round(served / total, 4) if total else 0.0
+        return counts
+
+
+nav_cache = NavCache()
+
 
 class BrokerService:
     """
     Service to fetch investment data from open sources (e.g., MFAPI.in).
+
+    NAV lookups share a pooled HTTP session, run concurrently and go through
+    nav_cache, so a sync costs about one request's latency and none once warm.
     """
-    
+
+    # Schemes with a background refresh in flight (shared by all instances)
+    _refreshing = set()
+    _refreshing_lock = threading.Lock()
+
+    def __init__(self, session=None, cache=None, refresh_executor=None):
+        self.session = session or get_session()
+        self.nav_cache = cache or nav_cache
+        self.refresh_executor = refresh_executor or _refresh_executor
+        self.timeout = 10 # seconds
+
     def fetch_mf_nav(self, scheme_code):
+        """
+        Returns the latest NAV for a mutual fund scheme, from the cache when possible.
+        Stale entries are returned immediately and refreshed in the background.
+        """
+        nav, state = self.nav_cache.get(scheme_code)
+        if state == 'fresh':
+            return nav
+        if state == 'stale':
+            self._refresh_in_background(scheme_code)
+            return nav
+        return self._fetch_and_store(scheme_code)
+
+    def fetch_mf_navs(self, scheme_codes):
+        """{scheme_code: NAV or None}; cache misses are fetched concurrently."""
+        results = {}
+        missing = []
+        for code in scheme_codes:
+            nav, state = self.nav_cache.get(code)
+            if state == 'miss':
+                missing.append(code)
+                continue
+            if state == 'stale':
+                self._refresh_in_background(code)
+            results[code] = nav
+
+        if missing:
+            with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(missing))) as pool:
+                results.update(zip(missing, pool.map(self._fetch_and_store, missing)))
+        return {code: results.get(code) for code in scheme_codes}
+
+    def _fetch_and_store(self, scheme_code):
+        nav = self._fetch_remote_nav(scheme_code)
+        if nav is not None:
+            self.nav_cache.set(scheme_code, nav)
+        return nav
+
+    def _refresh_in_background(self, scheme_code):
+        with self._refreshing_lock:
+            if scheme_code in self._refreshing:
+                return
+            self._refreshing.add(scheme_code)
+
+        def refresh():
+            try:
+                self._fetch_and_store(scheme_code) # on failure the stale entry is kept
+            finally:
+                with self._refreshing_lock:
+                    self._refreshing.discard(scheme_code)
+
+        self.refresh_executor.submit(refresh)
+
+    def _fetch_remote_nav(self, scheme_code):
         """
         Fetches the latest NAV for a mutual fund scheme from MFAPI.in.
         """
         try:
             url = f"https://api.mfapi.in/mf/{scheme_code}"
-            response = requests.get(url, timeout=10)
+            response = self.session.get(url, timeout=self.timeout)
             response.raise_for_status()
             data = response.json()
             if data and data.get('data'):
@@ -40,9 +202,8 @@ class BrokerService:
         
         holdings = []
         
-        # 1. Fetch Real Mutual Fund Data
-        for code in mf_schemes:
-            mf_data = self.fetch_mf_nav(code)
+        # 1. Fetch Real Mutual Fund Data (concurrently, via the NAV cache)
+        for code, mf_data in self.fetch_mf_navs(mf_schemes).items():
             if mf_data:
                 holdings.append({
                     'symbol': code,
@@ -0,0 +1,112 @@
+"""
+Delivery channels for generated messages (daily digests, alerts).
+
+A channel sends (recipient, body, key) messages and reports per-message
+success; `key` identifies the message for channels that deduplicate.
+Pick one with get_channel(name), or the DIGEST_CHANNEL setting:
+
+- 'outbox' (default): queued in NotificationOutbox and delivered over
+  WhatsApp by `manage.py dispatch_notifications`.
+- 'whatsapp': sent right away through WhatsAppService (one browser round
+  trip per message, so only for a handful of recipients).
+- 'console' / 'file': local stand-ins that print or append the messages,
+  for development and dry runs (file path: DIGEST_FILE_PATH).
+"""
+import sys
+
+from django.conf import settings
+
+from core.models import NotificationOutbox
+from core.services.whatsapp import WhatsAppService
+
+OUTBOX_BATCH = 500
+
+
+class Channel:
+    name = ''
+
+    def send(self, recipient, body, key=None):
+        """Returns (ok, info)."""
+        raise NotImplementedError
+
+    def send_many(self, messages):
+        """Sends [(recipient, body, key), ...]; returns the number delivered."""
+        return sum(1 for recipient, body, key in messages if self.send(recipient, body, key)[0])
+
+
+class WhatsAppChannel(Channel):
+    name = 'whatsapp'
+
+    def send(self, recipient, body, key=None):
+        return WhatsAppService().send_message(recipient, body)
+
+
+class OutboxChannel(Channel):
+    name = 'outbox'
+
+    def __init__(self, kind='DAILY_DIGEST', channel='WHATSAPP'):
+        self.kind = kind
+        self.channel = channel
+
+    def _row(self, recipient, body, key):
+        return NotificationOutbox(
+            channel=self.channel, kind=self.kind, recipient=recipient, payload={'text': body}, dedupe_key=key,
+        )
+
+    def send(self, recipient, body, key=None):
+        return self.send_many([(recipient, body, key)]) == 1, 'queued'
+
+    def send_many(self, messages):
+        # Rows whose key is already queued are skipped, so a rerun queues nothing twice
+        rows = [self._row(*message) for message in messages]
+        keys = [row.dedupe_key for row in rows]
+        existing = set()
+        for start in range(0, len(keys), OUTBOX_BATCH):
+            existing.update(NotificationOutbox.objects.filter(
+                dedupe_key__in=keys[start:start + OUTBOX_BATCH],
+            ).values_list('dedupe_key', flat=True))
+        new = [row for row in rows if row.dedupe_key not in existing]
+        NotificationOutbox.objects.bulk_create(new, batch_size=OUTBOX_BATCH, ignore_conflicts=True)
+        return len(new)
+
+
+class ConsoleChannel(Channel):
+    name = 'console'
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def send(self, recipient, body, key=None):
+        self.stream.write(f"--- To {recipient} ---\n{body}\n\n")
+        return True, 'printed'
+
+
+class FileChannel(Channel):
+    name = 'file'
+
+    def __init__(self, path=None):
+        self.path = path or getattr(settings, 'DIGEST_FILE_PATH', 'digests.txt')
+
+    def send(self, recipient, body, key=None):
+        return self.send_many([(recipient, body, key)]) == 1, self.path
+
+    def send_many(self, messages):
+        count = 0
+        with open(self.path, 'a', encoding='utf-8') as out:
+            for recipient, body, key in messages:
+                out.write(f"--- To {recipient} ---\n{body}\n\n")
+                count += 1
+        return count
+
+
+CHANNELS = {
+    channel.name: channel for channel in (WhatsAppChannel, OutboxChannel, ConsoleChannel, FileChannel)
+}
+
+
+def get_channel(name=None):
+    name = name or getattr(settings, 'DIGEST_CHANNEL', 'outbox')
+    try:
+        return CHANNELS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown channel '{name}'. Choose from: {', '.join(CHANNELS)}.")
@@ -0,0 +1,331 @@
+from datetime import date, timedelta
+from functools import cached_property
+
+from dateutil.relativedelta import relativedelta
+
+from expenses.models import Expense, RecurringExpense
+from core.models import Loan, Saving, Investment, Document, UserProfile
+from core.utils import amortization
+from core.utils.budget_calculator import (
+    calculate_ideal_budget,
+    get_budget_alerts,
+    calculate_budget_percentages
+)
+from .market_rates import MarketRatesService
+from .net_worth import NetWorthService
+from . import rollups
+
+# 50-30-20 categorization of Expense.CATEGORY_CHOICES
+NEEDS_CATEGORIES = ['BIL', 'TRA', 'EMI', 'FOO']
+WANTS_CATEGORIES = ['ENT', 'OTH']
+
+
+class DashboardService:
+    """
+    Aggregation layer for the home dashboard.
+
+    Every figure on the page is derived from two MonthlyRollup queries (the
+    trend window and all-time totals) that are run once and shared by the
+    summary, budget, chart, radar and trend sections, so the number of queries
+    stays fixed and no raw ledger table is scanned.
+    """
+
+    TREND_MONTHS = 6
+
+    def __init__(self, user, today=None):
+        self.user = user
+        self.today = today or date.today()
+        self.first_day = self.today.replace(day=1)
+
+    # --- Shared aggregates (one query each, memoized) ---
+
+    @cached_property
+    def month_windows(self):
+        """(first_day, last_day) for the last TREND_MONTHS months, oldest first."""
+        windows = []
+        for i in range(self.TREND_MONTHS - 1, -1, -1):
+            first = self.first_day - relativedelta(months=i)
+            last = first + relativedelta(months=1) - timedelta(days=1)
+            windows.append((first, last))
+        return windows
+
+    @cached_property
+    def profile(self):
+        profile, _ = UserProfile.objects.get_or_create(user=self.user)
+        return profile
+
+    @cached_property
+    def month_table(self):
+        """Rollup rows for every trend month, in one query."""
+        return rollups.month_table(self.month_windows[0][0], self.month_windows[-1][0])
+
+    @cached_property
+    def all_time_totals(self):
+        """All-time {(kind, category): (total, count)} from the rollups, in one query."""
+        return rollups.kind_totals()
+
+    def kind_total(self, kind):
+        return sum(total for (row_kind, _), (total, _) in self.all_time_totals.items() if row_kind == kind)
+
+    def month_total(self, month, kind, categories=None):
+        return rollups.month_sum(self.month_table, month, kind, categories)[0]
+
+    @cached_property
+    def category_totals(self):
+        """All-time expense totals per category, largest first."""
+        stats = [
+            {'category': category, 'total': total}
+            for (kind, category), (total, _) in self.all_time_totals.items()
+            if kind == 'EXP'
+        ]
+        stats.sort(key=lambda stat: stat['total'], reverse=True)
+        return stats
+
+    @cached_property
+    def loans(self):
+        return amortization.annotate(list(Loan.objects.all()), as_of=self.today)
+
+    @cached_property
+    def loan_emis(self):
+        return [(loan, loan.emi) for loan in self.loans]
+
+    @cached_property
+    def total_monthly_emi(self):
+        return sum(emi for _, emi in self.loan_emis)
+
+    @cached_property
+    def recurring_expenses(self):
+        return list(RecurringExpense.objects.filter(is_active=True).order_by('start_date'))
+
+    # --- Dashboard sections ---
+
+    def get_context_data(self):
+        """Build the full HomeView context from the shared aggregates."""
+        profile = self.profile
+        total_income = profile.monthly_income
+        monthly_income = float(total_income)
+
+        total_expenses = self.kind_total('EXP')
+        total_savings = self.kind_total('SAV')
+        total_investments = self.kind_total('INV')
+
+        # Calculate Ideal Coverage benchmark (Open Source actuarial data)
+        rates_service = MarketRatesService()
+        market_insurance = rates_service.get_insurance_benchmarks()
+        if total_income > 0:
+            benchmark = market_insurance['term_insurance']
+            ideal_coverage = monthly_income * 12 * benchmark['ideal_coverage_multiplier']
+        else:
+            ideal_coverage = 10000000 # 1 Cr default
+
+        # Auto-benchmark Policies if no manual override is provided
+        manual_policies = profile.manual_policy_total
+        display_policies = manual_policies if manual_policies > 0 else ideal_coverage
+
+        recent_expenses = list(Expense.objects.order_by('-date')[:5])
+        recent_savings = list(Saving.objects.order_by('-date')[:3])
+        recent_investments = list(Investment.objects.order_by('-date')[:3])
+
+        chart_labels, chart_data = self._category_chart()
+
+        context = {
+            'total_income': total_income,
+            'total_expenses': total_expenses,
+            'total_savings': total_savings,
+            'total_investments': total_investments,
+            'total_policies': display_policies,
+            'total_monthly_emi': self.total_monthly_emi,
+            'active_loans': len(self.loans),
+
+            # Raw data for forms/charts
+            'raw_total_income': monthly_income,
+            'raw_manual_investments': float(profile.manual_investment_total),
+            'raw_manual_policies': float(manual_policies),
+            'raw_manual_emi': float(profile.manual_emi_total),
+            'ideal_insurance_coverage': ideal_coverage,
+            'raw_total_expenses': total_expenses,
+            'raw_total_emi': float(self.total_monthly_emi),
+            'raw_total_savings': total_savings,
+            'raw_total_investments': total_investments,
+
+            # --- Market Insights (Open Source Data) ---
+            'market_loans': rates_service.get_loan_benchmarks(),
+            'market_insurance': market_insurance,
+
+            'recent_expenses': recent_expenses,
+            'recent_savings': recent_savings,
+            'recent_investments': recent_investments,
+            'recurring_expenses': self.recurring_expenses,
+
+            'chart_labels': chart_labels,
+            'chart_data': chart_data,
+            'portfolio_labels': ['Savings', 'Investments'],
+            'portfolio_data': [total_savings, total_investments],
+            'budget_alerts': self._legacy_budget_alerts(monthly_income),
+
+            # JSON versions for lists
+            'recent_savings_json': [
+                {'name': s.name, 'amount': str(s.amount)}
+                for s in recent_savings
+            ],
+            'recent_investments_json': [
+                {'name': i.name, 'amount': str(i.amount), 'category_display': i.get_category_display()}
+                for i in recent_investments
+            ],
+            'recent_expenses_json': [
+                {'title': e.title, 'amount': str(e.amount), 'category_display': e.get_category_display(), 'date': e.date.isoformat()}
+                for e in recent_expenses
+            ],
+
+            'budget_analysis': self.get_budget_analysis(monthly_income),
+            'budget_trends': self.get_monthly_trends(monthly_income),
+            'net_worth_trend': self.get_net_worth_trend(),
+            'radar_chart': self.get_expense_radar(),
+            'upcoming_reminders': self.get_upcoming_reminders(),
+            'recent_documents': list(Document.objects.order_by('-uploaded_at')[:3]),
+        }
+        return context
+
+    def _category_chart(self):
+        category_dict = dict(Expense.CATEGORY_CHOICES)
+        labels = [category_dict.get(stat['category'], stat['category']) for stat in self.category_totals]
+        data = [float(stat['total']) for stat in self.category_totals]
+        return labels, data
+
+    def _legacy_budget_alerts(self, income_float):
+        """Needs/Wants threshold alerts shown in the notification center."""
+        budget_alerts = []
+        needs_total = 0
+        wants_total = 0
+
+        NEEDS = ['RENT', 'EMI', 'BILLS', 'GROCERIES', 'FUEL', 'INSURANCE', 'HEALTH', 'EDUCATION']
+        WANTS = ['FOOD', 'SHOPPING', 'TRAVEL', 'ENTERTAINMENT', 'SUBSCRIPTION', 'GIFT']
+
+        for stat in self.category_totals:
+            amt = float(stat['total'])
+            if stat['category'] in NEEDS:
+                needs_total += amt
+            elif stat['category'] in WANTS:
+                wants_total += amt
+
+        needs_limit = income_float * 0.50
+        wants_limit = income_float * 0.30
+
+        if income_float > 0:
+            if needs_total > needs_limit:
+                excess = needs_total - needs_limit
+                budget_alerts.append({
+                    'type': 'critical',
+                    'title': 'Needs Budget Exceeded',
+                    'message': f'You have spent ₹{needs_total:,.0f} on Needs, exceeding the 50% limit (₹{needs_limit:,.0f}) by ₹{excess:,.0f}.'
+                })
+
+            if wants_total > wants_limit:
+                excess = wants_total - wants_limit
+                budget_alerts.append({
+                    'type': 'warning',
+                    'title': 'Wants Budget Exceeded',
+                    'message': f'You have spent ₹{wants_total:,.0f} on Wants, exceeding the 30% limit (₹{wants_limit:,.0f}) by ₹{excess:,.0f}.'
+                })
+
+        return budget_alerts
+
+    def get_actual_spending(self):
+        """Current month's needs/wants/savings, same shape as calculate_actual_spending."""
+        return {
+            'needs': self.month_total(self.first_day, 'EXP', NEEDS_CATEGORIES),
+            'wants': self.month_total(self.first_day, 'EXP', WANTS_CATEGORIES),
+            'savings': self.month_total(self.first_day, 'SAV') + self.month_total(self.first_day, 'INV'),
+        }
+
+    def get_budget_analysis(self, monthly_income):
+        """50-30-20 rule analysis for the current month."""
+        ideal = calculate_ideal_budget(monthly_income)
+        actual = self.get_actual_spending()
+        return {
+            'income': monthly_income,
+            'needs': actual['needs'],
+            'wants': actual['wants'],
+            'savings': actual['savings'],
+            'ideal': ideal,
+            'percentages': calculate_budget_percentages(actual, monthly_income),
+            'alerts': get_budget_alerts(actual, ideal) if monthly_income > 0 else []
+        }
+
+    def get_monthly_trends(self, monthly_income):
+        """Budget performance for the last TREND_MONTHS months."""
+        ideal = calculate_ideal_budget(monthly_income)
+        trends = {
+            'months': [],
+            'needs': [],
+            'wants': [],
+            'savings': [],
+            'ideal_needs': [],
+            'ideal_wants': [],
+            'ideal_savings': []
+        }
+
+        for first, _ in self.month_windows:
+            trends['months'].append(first.strftime('%b %Y'))
+            trends['needs'].append(self.month_total(first, 'EXP', NEEDS_CATEGORIES))
+            trends['wants'].append(self.month_total(first, 'EXP', WANTS_CATEGORIES))
+            trends['savings'].append(self.month_total(first, 'SAV') + self.month_total(first, 'INV'))
+            trends['ideal_needs'].append(ideal['needs'])
+            trends['ideal_wants'].append(ideal['wants'])
+            trends['ideal_savings'].append(ideal['savings'])
+
+        return trends
+
+    def get_net_worth_trend(self, range_key='6m'):
+        """Stored daily net worth history (see NetWorthService)."""
+        return NetWorthService().get_trend(range_key, today=self.today)
+
+    def get_expense_radar(self):
+        """Top 5 categories for the Polar Area chart (Spending Radar)."""
+        category_dict = dict(Expense.CATEGORY_CHOICES)
+        top = self.category_totals[:5]
+        return {
+            'labels': [category_dict.get(stat['category']) for stat in top],
+            'data': [float(stat['total']) for stat in top]
+        }
+
+    def get_upcoming_reminders(self):
+        """
+        Upcoming payments from Loans and Recurring Expenses.
+        Returns a sorted list of dicts: {title, amount, date, type, days_left}
+        """
+        reminders = []
+        today = self.today
+
+        # Loans: EMI assumed due on the 5th of next month
+        next_month = today.replace(day=1) + timedelta(days=32)
+        due_date = next_month.replace(day=5)
+        days_left = (due_date - today).days
+        if 0 <= days_left <= 30:
+            for loan, emi in self.loan_emis:
+                reminders.append({
+                    'title': f"{loan.name} EMI",
+                    'amount': emi,
+                    'date': due_date,
+                    'type': 'loan',
+                    'days_left': days_left
+                })
+
+        for item in self.recurring_expenses:
+            last_date = item.last_processed_date or item.start_date
+            delta = timedelta(days=30) if item.frequency == 'MON' else timedelta(days=7)
+            next_due = max(last_date + delta, today)
+
+            days_left = (next_due - today).days
+            if days_left <= 30:
+                reminders.append({
+                    'title': item.title,
+                    'amount': item.amount,
+                    'date': next_due,
+                    'type': 'expense',
+                    'days_left': days_left
+                })
+
+        # Sort by nearest date
+        reminders.sort(key=lambda x: x['days_left'])
+        return reminders[:5]
@@ -0,0 +1,95 @@
+"""
+Daily WhatsApp digest for every subscribed user (accounts.UserProfile with
+daily_digest on and a phone number).
+
+The ledger is shared, so the report figures (net worth, this month's
+expenses, recent transactions) are computed once per run with a few
+aggregate queries; only the budget status depends on the user's income.
+Subscribers are read in one query, messages are rendered with
+WhatsAppService.generate_report_message and handed to a channel
+(core/services/channels.py) in one batch. Each run is recorded as a
+DigestRun with its timings.
+"""
+import time
+from datetime import date
+from decimal import Decimal
+
+from django.db.models import Sum
+
+from accounts.models import UserProfile
+from expenses.models import Expense
+from core.models import DigestRun, Investment, Saving
+from core.services import rollups
+from core.services.channels import get_channel
+from core.services.whatsapp import WhatsAppService
+
+BUDGET_WARNING = Decimal('0.8') # share of monthly income spent before the report warns
+
+
+class DigestService:
+    def __init__(self, channel=None, today=None):
+        # A Channel instance, or a channel name (default: the DIGEST_CHANNEL setting)
+        if channel is None or isinstance(channel, str):
+            channel = get_channel(channel)
+        self.channel = channel
+        self.today = today or date.today()
+
+    def shared_context(self):
+        """Report figures that are the same for every user."""
+        total_invested = Investment.get_total_current_value()
+        total_savings = Saving.objects.aggregate(Sum('amount'))['amount__sum'] or Decimal('0')
+        first_day = self.today.replace(day=1)
+        current_month_expenses = Decimal(str(
+            rollups.month_sum(rollups.month_table(first_day, first_day, kinds=['EXP']), first_day, 'EXP')[0]
+        ))
+        return {
+            'net_worth': total_invested + total_savings,
+            'expenses': current_month_expenses,
+            'recent': list(Expense.objects.order_by('-date')[:5]),
+        }
+
+    @staticmethod
+    def user_context(shared, income):
+        """The shared figures plus the user's budget status (80% of income spent -> DANGER)."""
+        budget_status = 'SAFE'
+        if income > 0 and shared['expenses'] > (income * BUDGET_WARNING):
+            budget_status = 'DANGER'
+        return {**shared, 'budget_status': budget_status}
+
+    def subscribers(self):
+        return (
+            UserProfile.objects.filter(daily_digest=True, user__is_active=True)
+            .exclude(phone_number__isnull=True).exclude(phone_number='')
+            .select_related('user')
+        )
+
+    def run(self):
+        started = time.perf_counter()
+        shared = self.shared_context()
+        profiles = list(self.subscribers())
+        queried = time.perf_counter()
+
+        service = WhatsAppService()
+        messages = [
+            (
+                profile.phone_number,
+                service.generate_report_message(profile.user, self.user_context(shared, profile.monthly_income)),
+                f'DAILY_DIGEST-{profile.user_id}-{self.today.isoformat()}',
+            )
+            for profile in profiles
+        ]
+        rendered = time.perf_counter()
+
+        delivered = self.channel.send_many(messages)
+        finished = time.perf_counter()
+
+        return DigestRun.objects.create(
+            day=self.today,
+            channel=self.channel.name,
+            subscribers=len(profiles),
+            delivered=delivered,
+            query_ms=round((queried - started) * 1000, 2),
+            render_ms=round((rendered - queried) * 1000, 2),
+            send_ms=round((finished - rendered) * 1000, 2),
+            total_ms=round((finished - started) * 1000, 2),
+        )
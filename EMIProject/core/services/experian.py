@@ -8,6 +8,7 @@ class ExperianService:
         self.api_key = os.environ.get('EXPERIAN_API_KEY', 'mock-key')
         self.base_url = os.environ.get('EXPERIAN_BASE_URL', 'https://api.experian.com/v1')
         self.is_mock = self.api_key == 'mock-key'
+        self.timeout = 10 # seconds
 
     def fetch_user_trades(self, user_data=None):
         """
@@ -28,7 +29,8 @@ class ExperianService:
             response = requests.post(
                 f"{self.base_url}/credit-report",
                 json=payload,
-                headers=headers
+                headers=headers,
+                timeout=self.timeout
             )
             response.raise_for_status()
             return response.json()
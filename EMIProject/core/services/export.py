@@ -0,0 +1,125 @@
+"""
+Ledger export as CSV or NDJSON, streamed.
+
+Rows are read with values_list() and QuerySet.iterator(chunk_size=...), so
+the database hands them over a chunk at a time and no model instances are
+built; each chunk is encoded and yielded before the next one is fetched.
+Memory stays flat whatever the ledger size, and the header (CSV) goes out
+before the query has run. Reads go through read_replica() so a long export
+does not hold up writers.
+
+Amounts are written as decimal strings (exact in both formats), dates as
+ISO 8601, empty values as '' (CSV) or null (NDJSON). In CSV, text that a
+spreadsheet would run as a formula (titles come from users and bank
+narrations) is prefixed with an apostrophe.
+"""
+import csv
+import json
+from io import StringIO
+
+from django.db import router
+
+from expenses.models import Expense
+from core.db_routers import read_replica
+from core.models import Investment, Loan, Saving
+
+CHUNK_SIZE = 2000 # rows fetched from the database at a time
+ROWS_PER_WRITE = 500 # rows encoded into each chunk of the response
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+# ledger -> (model, exported fields, date field, category field or None)
+LEDGERS = {
+    'expenses': (Expense, ('id', 'date', 'title', 'category', 'amount', 'external_id'), 'date', 'category'),
+    'savings': (Saving, ('id', 'date', 'name', 'amount', 'external_id'), 'date', None),
+    'investments': (
+        Investment,
+        ('id', 'date', 'name', 'category', 'source', 'quantity', 'amount', 'current_value', 'external_id'),
+        'date', 'category',
+    ),
+    'loans': (
+        Loan,
+        ('id', 'start_date', 'name', 'principal', 'rate', 'tenure_months', 'benchmark_type', 'external_id'),
+        'start_date', None,
+    ),
+}
+
+FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+def category_choices(ledger):
+    """Valid category codes for the ledger, or None if it has no categories."""
+    model, _, _, category_field = LEDGERS[ledger]
+    if category_field is None:
+        return None
+    return [code for code, _ in model._meta.get_field(category_field).flatchoices]
+
+
+def rows(ledger, start=None, end=None, category=None):
+    """
+    The ledger's rows, oldest first, as tuples of its exported fields.
+
+    Args:
+        start, end: Inclusive date range (either may be None)
+        category: Category code; only for ledgers that have one
+    """
+    model, fields, date_field, category_field = LEDGERS[ledger]
+    queryset = model.objects.all()
+    if start:
+        queryset = queryset.filter(**{f'{date_field}__gte': start})
+    if end:
+        queryset = queryset.filter(**{f'{date_field}__lte': end})
+    if category:
+        queryset = queryset.filter(**{category_field: category})
+    with read_replica():
+        alias = router.db_for_read(model)
+    # Ordered along the date index, so no sort is buffered before the first row
+    return queryset.using(alias).order_by(date_field, 'pk').values_list(*fields).iterator(chunk_size=CHUNK_SIZE)
+
+
+def _chunks(records):
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) == ROWS_PER_WRITE:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _csv_cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def stream_csv(fields, records):
+    """Header line, then the records as CSV, ROWS_PER_WRITE lines per chunk."""
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    yield buffer.getvalue()
+    for chunk in _chunks(records):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([_csv_cell(value) for value in record] for record in chunk)
+        yield buffer.getvalue()
+
+
+def stream_ndjson(fields, records):
+    """One JSON object per line, ROWS_PER_WRITE lines per chunk."""
+    encode = json.JSONEncoder(default=str).encode
+    for chunk in _chunks(records):
+        yield ''.join(encode(dict(zip(fields, record))) + '\n' for record in chunk)
+
+
+def export(ledger, fmt, start=None, end=None, category=None):
+    """The export of one ledger as a generator of text chunks, in 'csv' or 'ndjson'."""
+    fields = LEDGERS[ledger][1]
+    stream = stream_csv if fmt == 'csv' else stream_ndjson
+    return stream(fields, rows(ledger, start, end, category))
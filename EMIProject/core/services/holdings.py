@@ -0,0 +1,123 @@
+import copy
+import logging
+from datetime import date
+from decimal import Decimal
+
+from django.db import transaction
+
+from core.models import Investment
+from core.signals import deletes_reported_in_bulk, ledger_bulk_changed
+
+logger = logging.getLogger(__name__)
+
+CENTS = Decimal('0.01')
+DELETE_BATCH = 500
+KEY_LOOKUP_CHUNK = 500 # keeps `external_id IN (...)` under SQLite's variable limit
+
+
+class HoldingsReconciler:
+    """
+    Reconciles a broker holdings feed against the stored BROKER investments.
+
+    Existing rows are loaded in one query and diffed by external_id into
+    inserts, updates and stale rows, which are applied with bulk statements
+    (stale rows are deleted in batches and reported through
+    ledger_bulk_changed, not by the per-row delete receivers), so the query count does not grow with the number
+    of holdings.
+    Rows flagged user_edited keep the user's values: only their market value
+    is refreshed, and they are never removed as stale. A holding whose ID is
+    already used by a manual or recurring entry is skipped, not merged into it.
+    """
+
+    SYNCED_FIELDS = ['name', 'amount', 'current_value', 'quantity', 'category', 'date']
+
+    def reconcile(self, holdings):
+        """Applies the feed. Returns {'created': n, 'updated': n, 'removed': n, 'skipped': n}."""
+        incoming = {}
+        for holding in holdings:
+            # Use ISIN or Symbol as external ID
+            external_id = holding.get('isin') or holding.get('symbol')
+            if external_id:
+                incoming[external_id] = holding
+
+        existing = {inv.external_id: inv for inv in Investment.objects.filter(source='BROKER')}
+        clashes = self._taken_ids([external_id for external_id in incoming if external_id not in existing])
+        if clashes:
+            logger.warning("Skipped broker holdings whose ID belongs to another investment: %s", ', '.join(sorted(clashes)))
+            for external_id in clashes:
+                del incoming[external_id]
+
+        to_create, to_update, previous = [], [], []
+        for external_id, holding in incoming.items():
+            stored = existing.get(external_id)
+            if stored is None:
+                to_create.append(self._build(external_id, holding))
+                continue
+
+            before = copy.copy(stored)
+            if stored.user_edited:
+                # Keep the user's quantity/amount, revalue at today's price
+                stored.current_value = self._money(stored.quantity * self._price(holding))
+            else:
+                self._apply(stored, holding)
+            if any(getattr(stored, field) != getattr(before, field) for field in self.SYNCED_FIELDS):
+                to_update.append(stored)
+                previous.append(before)
+
+        stale = [
+            inv for external_id, inv in existing.items()
+            if external_id not in incoming and not inv.user_edited
+        ]
+
+        with transaction.atomic():
+            created = Investment.objects.bulk_create(
+                to_create,
+                batch_size=500,
+                update_conflicts=True,
+                unique_fields=['external_id'],
+                update_fields=self.SYNCED_FIELDS + ['source'],
+            )
+            Investment.objects.bulk_update(to_update, self.SYNCED_FIELDS, batch_size=500)
+            with deletes_reported_in_bulk():
+                for start in range(0, len(stale), DELETE_BATCH):
+                    Investment.objects.filter(pk__in=[inv.pk for inv in stale[start:start + DELETE_BATCH]]).delete()
+            ledger_bulk_changed.send(sender=Investment, created=created, updated=to_update, previous=previous, deleted=stale)
+
+        return {'created': len(created), 'updated': len(to_update), 'removed': len(stale), 'skipped': len(clashes)}
+
+    @staticmethod
+    def _taken_ids(external_ids):
+        """The IDs already used by non-broker investments (broker rows are all loaded)."""
+        taken = set()
+        for start in range(0, len(external_ids), KEY_LOOKUP_CHUNK):
+            taken.update(
+                Investment.objects.filter(external_id__in=external_ids[start:start + KEY_LOOKUP_CHUNK])
+                .values_list('external_id', flat=True)
+            )
+        return taken
+
+    @staticmethod
+    def _money(value):
+        return Decimal(str(value)).quantize(CENTS)
+
+    @staticmethod
+    def _price(holding):
+        return Decimal(str(holding.get('current_price', 0)))
+
+    def _build(self, external_id, holding):
+        investment = Investment(external_id=external_id, source='BROKER', date=date.today())
+        self._apply(investment, holding)
+        if investment.amount is None:
+            investment.amount = investment.current_value # Initial value same as invested
+        return investment
+
+    def _apply(self, investment, holding):
+        quantity = Decimal(str(holding.get('quantity', 1)))
+        investment.name = holding.get('name')
+        investment.quantity = quantity
+        investment.current_value = self._money(quantity * self._price(holding))
+        investment.category = holding.get('type') or 'OTH'
+        if holding.get('invested_amount') is not None:
+            investment.amount = self._money(holding.get('invested_amount'))
+        if holding.get('purchase_date'):
+            investment.date = Investment._meta.get_field('date').to_python(holding.get('purchase_date'))
@@ -0,0 +1,160 @@
+from datetime import date, timedelta
+from decimal import Decimal
+import math
+
+import numpy as np
+from dateutil.relativedelta import relativedelta
+
+from django.db.models import Sum, Min, Max, F, Case, When
+
+from core.models import Saving, Investment, Loan, Policy, NetWorthSnapshot
+from core.utils import amortization
+from .snapshots import bump_data_version
+
+
+class NetWorthService:
+    """
+    Builds and reads the daily NetWorthSnapshot history.
+
+    Only completed days are stored. fill_snapshots() appends the days missing
+    since the last stored snapshot, up to yesterday, and is meant to run on a
+    schedule (`manage.py snapshot_net_worth`); the trend endpoint also runs it,
+    so the chart is filled before the first scheduled run. get_trend() reads a
+    range of stored points and adds today's, computed live.
+
+    Saving, adding or deleting a back-dated ledger row drops the snapshots from
+    its date on (invalidate_from(), called by signals), and the next fill
+    rebuilds them. Revaluations are not back-dated: a stored day keeps the
+    holding values it was built with.
+    """
+
+    RANGES = {
+        '1m': relativedelta(months=1),
+        '3m': relativedelta(months=3),
+        '6m': relativedelta(months=6),
+        '1y': relativedelta(years=1),
+        '3y': relativedelta(years=3),
+        '5y': relativedelta(years=5),
+        '10y': relativedelta(years=10),
+    }
+    MAX_POINTS = 120 # chart points per range; longer ranges are downsampled
+    MAX_HISTORY = relativedelta(years=10)
+    DAY_CHUNK = 366 # days of loan balances computed per NumPy pass, to bound memory
+
+    # model -> fields a stored snapshot depends on; the first is the row's date
+    HISTORY_FIELDS = {
+        Saving: ('date', 'amount'),
+        Investment: ('date', 'amount'),
+        Loan: ('start_date', 'principal', 'rate', 'tenure_months'),
+    }
+
+    # Holdings are valued at current_value; manual entries that were never
+    # revalued (current_value = 0) fall back to the invested amount.
+    INVESTMENT_VALUE = Case(When(current_value__gt=0, then=F('current_value')), default=F('amount'))
+
+    def fill_snapshots(self, until=None):
+        """Appends a snapshot for every missing day up to `until` (default: yesterday). Returns rows created."""
+        until = until or date.today() - timedelta(days=1)
+        last = NetWorthSnapshot.objects.aggregate(Max('date'))['date__max']
+        start = last + timedelta(days=1) if last else self._first_ledger_date(until)
+        if start > until:
+            return 0
+
+        savings = Saving.objects.filter(date__lt=start).aggregate(total=Sum('amount'))['total'] or Decimal('0')
+        investments = Investment.objects.filter(date__lt=start).aggregate(total=Sum(self.INVESTMENT_VALUE))['total'] or Decimal('0')
+        saving_days = self._daily_totals(Saving.objects, 'amount', start, until)
+        investment_days = self._daily_totals(Investment.objects, self.INVESTMENT_VALUE, start, until)
+        policies = Policy.objects.aggregate(total=Sum('sum_assured'))['total'] or Decimal('0')
+        outstanding = self._loans_outstanding(list(Loan.objects.all()), start, until)
+
+        rows = []
+        day = start
+        for total in outstanding:
+            savings += saving_days.get(day, 0)
+            investments += investment_days.get(day, 0)
+            loans_outstanding = amortization.to_decimal(total)
+            rows.append(NetWorthSnapshot(
+                date=day,
+                savings=savings,
+                investments=investments,
+                loans_outstanding=loans_outstanding,
+                policies=policies,
+                net_worth=savings + investments - loans_outstanding,
+            ))
+            day += timedelta(days=1)
+
+        NetWorthSnapshot.objects.bulk_create(rows, batch_size=500, ignore_conflicts=True)
+        bump_data_version()
+        return len(rows)
+
+    def get_trend(self, range_key='6m', today=None):
+        """Net worth points for the range ending today (inclusive), oldest first; today's is live."""
+        today = today or date.today()
+        start = today - self.RANGES[range_key]
+        points = list(
+            NetWorthSnapshot.objects.filter(date__gt=start, date__lt=today)
+            .order_by('date').values_list('date', 'net_worth')
+        )
+        points.append((today, self.current_net_worth(today)))
+
+        step = max(1, math.ceil(len(points) / self.MAX_POINTS))
+        sampled = points[::step]
+        if points and sampled[-1] != points[-1]:
+            sampled.append(points[-1])
+
+        label_format = '%d %b' if range_key in ('1m', '3m') else '%b %Y'
+        return {
+            'range': range_key,
+            'labels': [day.strftime(label_format) for day, _ in sampled],
+            'data': [float(value) for _, value in sampled],
+        }
+
+    def current_net_worth(self, today=None):
+        """Net worth from the ledger as it stands, counting entries dated up to today."""
+        today = today or date.today()
+        savings = Saving.objects.filter(date__lte=today).aggregate(total=Sum('amount'))['total'] or Decimal('0')
+        investments = Investment.objects.filter(date__lte=today).aggregate(total=Sum(self.INVESTMENT_VALUE))['total'] or Decimal('0')
+        loans = self._loans_outstanding(list(Loan.objects.filter(start_date__lte=today)), today, today)
+        return savings + investments - amortization.to_decimal(loans[0])
+
+    @classmethod
+    def history_values(cls, model, instance):
+        """The instance's values that stored snapshots depend on, date first."""
+        return tuple(model._meta.get_field(field).to_python(getattr(instance, field)) for field in cls.HISTORY_FIELDS[model])
+
+    @staticmethod
+    def invalidate_from(day):
+        """Drops the snapshots from `day` on, so the next fill rebuilds them."""
+        if day is not None:
+            NetWorthSnapshot.objects.filter(date__gte=day).delete()
+
+    def _loans_outstanding(self, loans, start, until):
+        """Total outstanding loan principal on each day from start to until, as a float array."""
+        days = np.arange(start, until + timedelta(days=1), dtype='datetime64[D]')
+        principal, rate, tenure = (values[:, None] for values in amortization.loan_arrays(loans))
+        start_dates = np.array([loan.start_date for loan in loans], dtype='datetime64[D]')[:, None]
+        totals = np.zeros(len(days))
+        for offset in range(0, len(days), self.DAY_CHUNK):
+            chunk = days[offset:offset + self.DAY_CHUNK]
+            paid = amortization.payments_made(start_dates[:, 0], tenure[:, 0], chunk)
+            balances = amortization.balances(principal, rate, tenure, paid)
+            # Loans not taken yet owe nothing
+            totals[offset:offset + len(chunk)] = np.where(chunk[None, :] < start_dates, 0.0, balances).sum(axis=0)
+        return totals
+
+    def _first_ledger_date(self, until):
+        candidates = [
+            Saving.objects.aggregate(Min('date'))['date__min'],
+            Investment.objects.aggregate(Min('date'))['date__min'],
+            Loan.objects.aggregate(Min('start_date'))['start_date__min'],
+        ]
+        first = min((d for d in candidates if d), default=until)
+        return max(first, until - self.MAX_HISTORY)
+
+    @staticmethod
+    def _daily_totals(manager, value, start, until):
+        rows = (
+            manager.filter(date__range=(start, until))
+            .values('date').annotate(total=Sum(value)).order_by()
+        )
+        return {row['date']: row['total'] or 0 for row in rows}
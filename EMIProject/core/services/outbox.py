@@ -0,0 +1,148 @@
+"""
+Notification outbox.
+
+Signals call enqueue() inside the transaction that records the event, so a
+notification exists exactly when its event does and saving never waits on a
+channel. `manage.py dispatch_notifications` drains the outbox in the
+background:
+
+- dedupe: one row per dedupe_key; a dispatcher claims rows with a lease, so
+  two dispatchers never send the same row and a crashed one's rows come due
+  again when the lease runs out.
+- coalescing: due rows of the same kind for the same recipient go out as a
+  single message.
+- rate limiting: at most NOTIFICATION_RATE_LIMIT sends per recipient per
+  NOTIFICATION_RATE_WINDOW seconds; the rest wait for the window to free up.
+- retries: failed sends back off exponentially (NOTIFICATION_RETRY_DELAY,
+  doubled per attempt) and are marked FAILED after NOTIFICATION_MAX_ATTEMPTS.
+"""
+import logging
+import uuid
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Min
+from django.utils import timezone
+
+from core.models import NotificationOutbox
+from core.services.channels import WhatsAppChannel
+from core.services.whatsapp import WhatsAppService
+
+logger = logging.getLogger(__name__)
+
+LEASE = timedelta(minutes=5)
+
+
+def enqueue(kind, recipient, payload, dedupe_key, channel='WHATSAPP'):
+    """Adds a notification unless one with the same dedupe_key exists. Returns True if added."""
+    try:
+        with transaction.atomic():
+            NotificationOutbox.objects.create(
+                channel=channel, kind=kind, recipient=recipient, payload=payload, dedupe_key=dedupe_key,
+            )
+        return True
+    except IntegrityError:
+        return False
+
+
+def render(channel, kind, payloads):
+    """Message body for one or more coalesced notifications of a kind."""
+    if kind == 'HIGH_VALUE_EXPENSE':
+        return WhatsAppService().alerts_message([
+            (payload['title'], Decimal(payload['amount'])) for payload in payloads
+        ])
+    return "\n\n".join(payload['text'] for payload in payloads)
+
+
+SENDERS = {
+    'WHATSAPP': WhatsAppChannel().send,
+}
+
+
+class OutboxDispatcher:
+    """Sends due outbox rows; see the module docstring for the delivery rules."""
+
+    def __init__(self, now=None, senders=None):
+        self.now = now or timezone.now()
+        self.senders = senders or SENDERS
+        self.max_attempts = getattr(settings, 'NOTIFICATION_MAX_ATTEMPTS', 5)
+        self.retry_delay = timedelta(seconds=getattr(settings, 'NOTIFICATION_RETRY_DELAY', 60))
+        self.rate_limit = getattr(settings, 'NOTIFICATION_RATE_LIMIT', 5)
+        self.rate_window = timedelta(seconds=getattr(settings, 'NOTIFICATION_RATE_WINDOW', 60 * 60))
+
+    def claim(self, limit):
+        """Leases up to `limit` due rows to this run and returns them."""
+        due = NotificationOutbox.objects.filter(
+            status__in=['PENDING', 'SENDING'], next_attempt_at__lte=self.now,
+        ).order_by('created_at').values_list('pk', flat=True)[:limit]
+        token = uuid.uuid4().hex
+        # The status/due filter is repeated so a row another dispatcher has
+        # leased in the meantime is left alone
+        NotificationOutbox.objects.filter(
+            pk__in=list(due), status__in=['PENDING', 'SENDING'], next_attempt_at__lte=self.now,
+        ).update(status='SENDING', claim=token, next_attempt_at=self.now + LEASE)
+        return list(NotificationOutbox.objects.filter(claim=token, status='SENDING').order_by('created_at'))
+
+    def recent_sends(self):
+        """(channel, recipient) -> (sends in the rate window, oldest of them)."""
+        rows = NotificationOutbox.objects.filter(
+            status='SENT', sent_at__gt=self.now - self.rate_window,
+        ).values('channel', 'recipient').annotate(sends=Count('pk'), oldest=Min('sent_at'))
+        return {(row['channel'], row['recipient']): (row['sends'], row['oldest']) for row in rows}
+
+    def dispatch(self, limit=100):
+        result = {'sent': 0, 'coalesced': 0, 'deferred': 0, 'retried': 0, 'failed': 0}
+        rows = self.claim(limit)
+        if not rows:
+            return result
+
+        groups = defaultdict(list)
+        for row in rows:
+            groups[(row.channel, row.recipient, row.kind)].append(row)
+        recent = self.recent_sends()
+
+        changed = []
+        for (channel, recipient, kind), group in groups.items():
+            sends, oldest = recent.get((channel, recipient), (0, None))
+            if sends >= self.rate_limit:
+                for row in group:
+                    row.status, row.next_attempt_at = 'PENDING', oldest + self.rate_window
+                result['deferred'] += len(group)
+                changed += group
+                continue
+
+            try:
+                body = render(channel, kind, [row.payload for row in group])
+                ok, info = self.senders[channel](recipient, body)
+            except Exception as e:
+                ok, info = False, str(e)
+
+            for index, row in enumerate(group):
+                row.attempts += 1
+                if ok:
+                    row.status = 'SENT' if index == 0 else 'COALESCED'
+                    row.sent_at = self.now
+                    row.last_error = ''
+                elif row.attempts >= self.max_attempts:
+                    row.status, row.last_error = 'FAILED', info
+                else:
+                    row.status, row.last_error = 'PENDING', info
+                    row.next_attempt_at = self.now + self.retry_delay * 2 ** (row.attempts - 1)
+                changed.append(row)
+
+            if ok:
+                recent[(channel, recipient)] = (sends + 1, oldest or self.now)
+                result['sent'] += 1
+                result['coalesced'] += len(group) - 1
+            else:
+                logger.warning(f"Notification to {recipient} failed ({len(group)} rows): {info}")
+                result['failed'] += sum(1 for row in group if row.status == 'FAILED')
+                result['retried'] += sum(1 for row in group if row.status == 'PENDING')
+
+        NotificationOutbox.objects.bulk_update(
+            changed, ['status', 'attempts', 'next_attempt_at', 'sent_at', 'last_error'],
+        )
+        return result
@@ -0,0 +1,167 @@
+"""
+Recurring transaction engine.
+
+Turns active RecurringExpense and RecurringWealth definitions into ledger
+entries for every occurrence missed since their last_processed_date:
+
+- RecurringExpense, monthly: on `payment_date` of each month, clamped to the
+  month (31 -> 28/29 Feb; rows saved before validation with 0 or less -> 1st),
+  from the start month onwards.
+- RecurringExpense, weekly: every 7 days from start_date.
+- RecurringWealth: one period after start_date, then every period (monthly
+  dates are clamped to the month end without drifting).
+
+Each generated entry carries an idempotency key in external_id, so a rerun
+(or two workers racing) never books the same occurrence twice. All entries
+are written with bulk_create in one transaction.
+"""
+import calendar
+import logging
+from collections import defaultdict
+from datetime import date, timedelta
+
+from dateutil.relativedelta import relativedelta
+from django.db import IntegrityError, transaction
+
+from expenses.models import Expense, RecurringExpense
+from core.models import Saving, Investment, RecurringWealth
+from core.signals import ledger_bulk_changed
+
+logger = logging.getLogger(__name__)
+
+KEY_LOOKUP_CHUNK = 500 # keeps `external_id IN (...)` under SQLite's variable limit
+
+
+def monthly_on_day(day, start, after, until):
+    """Dates on `day` of each month (clamped to the month's days) with start <= d <= until and d > after."""
+    first = max(start, after + timedelta(days=1)) if after else start
+    month = first.replace(day=1)
+    while month <= until:
+        due = month.replace(day=min(max(day, 1), calendar.monthrange(month.year, month.month)[1]))
+        if first <= due <= until:
+            yield due
+        month += relativedelta(months=1)
+
+
+def every(start, step, after, until, first=1):
+    """start + k * step for k >= first, with after < d <= until."""
+    k = first
+    while True:
+        due = start + step * k
+        if due > until:
+            return
+        if after is None or due > after:
+            yield due
+        k += 1
+
+
+class RecurrenceEngine:
+    """Books every due recurring occurrence up to `today` with a handful of statements."""
+
+    def __init__(self, today=None):
+        self.today = today or date.today()
+
+    def expense_occurrences(self, item):
+        if item.frequency == 'WEK':
+            return every(item.start_date, timedelta(weeks=1), item.last_processed_date, self.today, first=0)
+        return monthly_on_day(item.payment_date, item.start_date, item.last_processed_date, self.today)
+
+    def wealth_occurrences(self, item):
+        step = timedelta(weeks=1) if item.frequency == 'WEK' else relativedelta(months=1)
+        return every(item.start_date, step, item.last_processed_date, self.today)
+
+    def run(self):
+        """
+        Books all missed occurrences. Returns {verbose_name_plural: rows created},
+        e.g. {'expenses': 12, 'savings': 0, 'investments': 3}.
+        """
+        pending = defaultdict(list)
+        processed = defaultdict(list)
+
+        for item in RecurringExpense.objects.filter(is_active=True):
+            dues = list(self.expense_occurrences(item))
+            if dues:
+                processed[RecurringExpense].append(item)
+            for due in dues:
+                pending[Investment if item.recurrence_type == 'SIP' else Expense].append(self._expense_entry(item, due))
+
+        for item in RecurringWealth.objects.filter(active=True):
+            dues = list(self.wealth_occurrences(item))
+            if dues:
+                processed[RecurringWealth].append(item)
+            for due in dues:
+                pending[Saving if item.type == 'SAV' else Investment].append(self._wealth_entry(item, due))
+
+        created = {model._meta.verbose_name_plural: 0 for model in (Expense, Saving, Investment)}
+        if not pending:
+            return created
+
+        try:
+            with transaction.atomic():
+                for model, entries in pending.items():
+                    new = self._insert_new(model, entries)
+                    created[model._meta.verbose_name_plural] = len(new)
+                    ledger_bulk_changed.send(sender=model, created=new, updated=[])
+
+                for model, items in processed.items():
+                    for item in items:
+                        item.last_processed_date = self.today
+                    model.objects.bulk_update(items, ['last_processed_date'], batch_size=500)
+                    ledger_bulk_changed.send(sender=model, created=[], updated=items)
+        except IntegrityError:
+            # Another worker booked the same occurrences first; its run covers these
+            logger.warning("Recurring catch-up skipped: occurrences were booked concurrently.")
+            return {name: 0 for name in created}
+
+        return created
+
+    @staticmethod
+    def _insert_new(model, entries):
+        """bulk_creates the entries whose idempotency key is not already stored."""
+        keys = [entry.external_id for entry in entries]
+        existing = set()
+        for i in range(0, len(keys), KEY_LOOKUP_CHUNK):
+            existing.update(
+                model.objects.filter(external_id__in=keys[i:i + KEY_LOOKUP_CHUNK])
+                .values_list('external_id', flat=True)
+            )
+        new = [entry for entry in entries if entry.external_id not in existing]
+        model.objects.bulk_create(new, batch_size=500)
+        return new
+
+    @staticmethod
+    def _expense_entry(item, due):
+        if item.recurrence_type == 'SIP':
+            return Investment(
+                name=f"{item.title} (Auto SIP)",
+                amount=item.amount,
+                category='OTH', # Default or map if added to model
+                date=due,
+                external_id=f"SIP-{item.id}-{due.isoformat()}",
+                source='RECURRING',
+            )
+        return Expense(
+            title=f"{item.title} (Auto)",
+            amount=item.amount,
+            category=item.category or 'OTH',
+            date=due,
+            external_id=f"BILL-{item.id}-{due.isoformat()}",
+        )
+
+    @staticmethod
+    def _wealth_entry(item, due):
+        if item.type == 'SAV':
+            return Saving(
+                name=f"{item.name} (Auto)",
+                amount=item.amount,
+                date=due,
+                external_id=f"RECUR-{item.id}-{due.isoformat()}",
+            )
+        return Investment(
+            name=f"{item.name} (Auto SIP)",
+            amount=item.amount,
+            category=item.category or 'OTH',
+            date=due,
+            external_id=f"RECUR-{item.id}-{due.isoformat()}",
+            source='RECURRING',
+        )
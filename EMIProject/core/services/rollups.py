@@ -0,0 +1,157 @@
+"""
+Month x category rollups of the ledger.
+
+MonthlyRollup holds the sum and count of Expense, Saving and Investment
+amounts per (month, kind, category). Signals keep it current on every
+save/delete; monthly charts and budget figures read it instead of scanning
+the raw ledger.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Sum, Count, F, Value, CharField
+from django.db.models.functions import TruncMonth
+
+from expenses.models import Expense
+from core.models import Saving, Investment, MonthlyRollup
+
+# model -> (rollup kind, category field or None)
+ROLLUP_SOURCES = {
+    Expense: ('EXP', 'category'),
+    Saving: ('SAV', None),
+    Investment: ('INV', 'category'),
+}
+
+
+def rollup_values(model, instance):
+    """(month, category, amount) that instance contributes to its rollup row."""
+    _, category_field = ROLLUP_SOURCES[model]
+    day = model._meta.get_field('date').to_python(instance.date)
+    category = (getattr(instance, category_field) or '') if category_field else ''
+    return day.replace(day=1), category, Decimal(str(instance.amount or 0))
+
+
+def apply_delta(kind, month, category, amount, count):
+    """Adds amount/count to one rollup row, creating it if needed."""
+    lookup = {'month': month, 'kind': kind, 'category': category}
+    updated = MonthlyRollup.objects.filter(**lookup).update(
+        total=F('total') + amount, count=F('count') + count
+    )
+    if updated:
+        return
+    try:
+        with transaction.atomic():
+            MonthlyRollup.objects.create(total=amount, count=count, **lookup)
+    except IntegrityError:
+        # Created concurrently; fall back to the update path
+        MonthlyRollup.objects.filter(**lookup).update(
+            total=F('total') + amount, count=F('count') + count
+        )
+
+
+def apply_instances(model, instances, sign=1):
+    """
+    Adds (sign=1) or removes (sign=-1) many rows at once, e.g. after bulk_create.
+    One read of the affected rollup rows, then one bulk update and one bulk insert.
+    """
+    kind, _ = ROLLUP_SOURCES[model]
+    deltas = defaultdict(lambda: [Decimal('0'), 0])
+    for instance in instances:
+        month, category, amount = rollup_values(model, instance)
+        deltas[(month, category)][0] += amount * sign
+        deltas[(month, category)][1] += sign
+    if not deltas:
+        return
+
+    existing = {
+        (row.month, row.category): row
+        for row in MonthlyRollup.objects.filter(kind=kind, month__in={month for month, _ in deltas})
+    }
+    to_update, to_create = [], []
+    for (month, category), (amount, count) in deltas.items():
+        row = existing.get((month, category))
+        if row is None:
+            to_create.append(MonthlyRollup(month=month, kind=kind, category=category, total=amount, count=count))
+        else:
+            row.total = F('total') + amount
+            row.count = F('count') + count
+            to_update.append(row)
+
+    try:
+        with transaction.atomic():
+            MonthlyRollup.objects.bulk_update(to_update, ['total', 'count'], batch_size=500)
+            MonthlyRollup.objects.bulk_create(to_create, batch_size=500)
+    except IntegrityError:
+        # A row was created concurrently; fall back to row-by-row deltas
+        for (month, category), (amount, count) in deltas.items():
+            apply_delta(kind, month, category, amount, count)
+
+
+def rebuild(models=None):
+    """Recomputes the rollup rows for the given models (all by default) from the ledger."""
+    models = models or list(ROLLUP_SOURCES)
+    with transaction.atomic():
+        for model in models:
+            kind, category_field = ROLLUP_SOURCES[model]
+            MonthlyRollup.objects.filter(kind=kind).delete()
+
+            category = F(category_field) if category_field else Value('', output_field=CharField())
+            rows = (
+                model.objects.annotate(rollup_month=TruncMonth('date'), rollup_category=category)
+                .values('rollup_month', 'rollup_category')
+                .annotate(total=Sum('amount'), count=Count('id'))
+                .order_by()
+            )
+            MonthlyRollup.objects.bulk_create([
+                MonthlyRollup(
+                    month=row['rollup_month'],
+                    kind=kind,
+                    category=row['rollup_category'] or '',
+                    total=row['total'] or 0,
+                    count=row['count'],
+                )
+                for row in rows
+            ], batch_size=500)
+
+
+# --- Read helpers ---
+
+def month_table(start_month, end_month, kinds=None):
+    """
+    {(month, kind, category): (total, count)} for start_month..end_month inclusive.
+    One indexed query over at most (months x categories) rows.
+    """
+    qs = MonthlyRollup.objects.filter(month__range=(start_month, end_month))
+    if kinds:
+        qs = qs.filter(kind__in=kinds)
+    return {
+        (row.month, row.kind, row.category): (float(row.total), row.count)
+        for row in qs
+    }
+
+
+def kind_totals(kinds=None, before=None):
+    """{(kind, category): (total, count)} over all months (or months before `before`)."""
+    qs = MonthlyRollup.objects.all()
+    if kinds:
+        qs = qs.filter(kind__in=kinds)
+    if before:
+        qs = qs.filter(month__lt=before)
+    rows = qs.values('kind', 'category').annotate(total=Sum('total'), count=Sum('count')).order_by()
+    return {
+        (row['kind'], row['category']): (float(row['total'] or 0), row['count'])
+        for row in rows
+        if row['count']
+    }
+
+
+def month_sum(table, month, kind, categories=None):
+    """Sums total/count of `kind` in `month` from a month_table result."""
+    total = 0.0
+    count = 0
+    for (row_month, row_kind, row_category), (row_total, row_count) in table.items():
+        if row_month == month and row_kind == kind and (categories is None or row_category in categories):
+            total += row_total
+            count += row_count
+    return total, count
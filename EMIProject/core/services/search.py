@@ -0,0 +1,173 @@
+"""
+Full-text search over the financial models, backed by an SQLite FTS5 table.
+
+`search_index` (created by migration 0020) holds one row per searchable
+object: its title/name and a detail line (category, type). The rowid encodes
+the object: rowid = pk * KIND_SLOTS + kind code, so an object is updated or
+removed by rowid without scanning the index. Signals in core/signals.py keep
+it current, including bulk writes (ledger_bulk_changed); `manage.py
+rebuild_search_index` refills it from scratch.
+
+Queries match every word as a prefix ("ub ri" finds "Uber ride") and are
+ranked with BM25, titles weighted above details. On databases without FTS5
+search() falls back to icontains lookups.
+"""
+import re
+from collections import defaultdict
+
+from django.db import connection, transaction
+
+from expenses.models import Expense
+from core.models import Document, Investment, Loan, Policy, Saving
+
+TABLE = 'search_index'
+KIND_SLOTS = 8
+BATCH = 400 # rows per statement, under SQLite's variable limit
+TITLE_WEIGHT, DETAIL_WEIGHT = 10.0, 1.0
+
+
+def _display(model, field):
+    # The choice label, like get_FOO_display() without its per-call overhead (bulk imports)
+    labels = dict(model._meta.get_field(field).flatchoices)
+    return lambda obj: str(labels.get(getattr(obj, field), getattr(obj, field)))
+
+# kind -> (code, model, title field, detail)
+KINDS = {
+    'expense': (1, Expense, 'title', _display(Expense, 'category')),
+    'document': (2, Document, 'title', lambda obj: 'Document'),
+    'loan': (3, Loan, 'name', lambda obj: 'Loan'),
+    'investment': (4, Investment, 'name', _display(Investment, 'category')),
+    'saving': (5, Saving, 'name', lambda obj: 'Saving'),
+    'policy': (6, Policy, 'name', _display(Policy, 'type')),
+}
+MODEL_KINDS = {model: kind for kind, (code, model, title, detail) in KINDS.items()}
+CODE_KINDS = {code: kind for kind, (code, *_) in KINDS.items()}
+
+_found = set() # databases known to have the index, so saves don't re-check
+
+
+def available():
+    if connection.vendor != 'sqlite':
+        return False
+    database = connection.settings_dict['NAME']
+    if database not in _found and TABLE in connection.introspection.table_names():
+        _found.add(database)
+    return database in _found
+
+
+def _rowid(kind, pk):
+    return pk * KIND_SLOTS + KINDS[kind][0]
+
+
+def _rows(kind, objects):
+    code, model, title, detail = KINDS[kind]
+    return [(_rowid(kind, obj.pk), getattr(obj, title), detail(obj)) for obj in objects if obj.pk is not None]
+
+
+def text_changed(model, updated, previous):
+    """The instances in `updated` whose indexed title/detail differ from their `previous` copies."""
+    kind = MODEL_KINDS.get(model)
+    if kind is None:
+        return []
+    before = {row[0]: row for row in _rows(kind, previous)}
+    return [obj for obj, row in zip(updated, _rows(kind, updated)) if before.get(row[0]) != row]
+
+
+def _delete_rowids(cursor, rowids):
+    for start in range(0, len(rowids), BATCH):
+        chunk = rowids[start:start + BATCH]
+        cursor.execute(f"DELETE FROM {TABLE} WHERE rowid IN ({', '.join(['%s'] * len(chunk))})", chunk)
+
+
+def index(model, objects):
+    """Adds or refreshes the index rows of the given instances."""
+    kind = MODEL_KINDS.get(model)
+    if kind is None or not available():
+        return
+    rows = _rows(kind, objects)
+    if not rows:
+        return
+    with transaction.atomic(), connection.cursor() as cursor:
+        _delete_rowids(cursor, [row[0] for row in rows])
+        cursor.executemany(f"INSERT INTO {TABLE} (rowid, title, detail) VALUES (%s, %s, %s)", rows)
+
+
+def remove(model, pks):
+    kind = MODEL_KINDS.get(model)
+    if kind is None or not available():
+        return
+    with connection.cursor() as cursor:
+        _delete_rowids(cursor, [_rowid(kind, pk) for pk in pks])
+
+
+def rebuild():
+    """Refills the index from every searchable model. Returns the number of rows indexed."""
+    if not available():
+        return 0
+    total = 0
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {TABLE}")
+        for kind, (code, model, title, detail) in KINDS.items():
+            batch = []
+            for obj in model.objects.order_by().iterator(chunk_size=2000):
+                batch.append(obj)
+                if len(batch) == 2000:
+                    rows = _rows(kind, batch)
+                    cursor.executemany(f"INSERT INTO {TABLE} (rowid, title, detail) VALUES (%s, %s, %s)", rows)
+                    total += len(rows)
+                    batch = []
+            rows = _rows(kind, batch)
+            cursor.executemany(f"INSERT INTO {TABLE} (rowid, title, detail) VALUES (%s, %s, %s)", rows)
+            total += len(rows)
+    return total
+
+
+def match_expression(query):
+    """FTS5 query for free text: every word must match as a prefix. None if there are no words."""
+    words = re.findall(r'\w+', query.lower())
+    if not words:
+        return None
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def search(query, limit=10):
+    """
+    Best matches per kind: {'expense': [Expense, ...], 'loan': [...], ...},
+    each list in rank order and at most `limit` long.
+    """
+    if not available():
+        return _search_like(query, limit)
+    expression = match_expression(query)
+    if expression is None:
+        return {}
+
+    # Rank within each kind, so a flood of expenses can't push out a matching loan
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT rowid FROM ("
+            f"  SELECT rowid, ROW_NUMBER() OVER (PARTITION BY rowid %% {KIND_SLOTS} ORDER BY score) AS place FROM ("
+            f"    SELECT rowid, bm25({TABLE}, %s, %s) AS score FROM {TABLE} WHERE {TABLE} MATCH %s"
+            f"  )"
+            f") WHERE place <= %s ORDER BY place",
+            [TITLE_WEIGHT, DETAIL_WEIGHT, expression, limit],
+        )
+        rowids = [row[0] for row in cursor.fetchall()]
+
+    ranked = defaultdict(list)
+    for rowid in rowids:
+        ranked[CODE_KINDS[rowid % KIND_SLOTS]].append(rowid // KIND_SLOTS)
+
+    results = {}
+    for kind, pks in ranked.items():
+        objects = KINDS[kind][1].objects.in_bulk(pks)
+        results[kind] = [objects[pk] for pk in pks if pk in objects]
+    return results
+
+
+def _search_like(query, limit):
+    results = {}
+    for kind, (code, model, title, detail) in KINDS.items():
+        found = list(model.objects.filter(**{f'{title}__icontains': query})[:limit])
+        if found:
+            results[kind] = found
+    return results
@@ -0,0 +1,166 @@
+from datetime import date
+import hashlib
+import re
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+
+DATA_VERSION_KEY = 'ledger:data_version'
+
+
+def _initial_version():
+    # Seeded from the clock so a counter recreated after eviction never
+    # repeats a version that an older snapshot was stored under.
+    return time.time_ns() // 1000
+
+
+def get_data_version(key=DATA_VERSION_KEY):
+    """
+    Current version of the financial data; changes whenever a ledger row changes.
+    Pass another key for a narrower counter (e.g. expenses only).
+    """
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _initial_version(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_data_version(key=DATA_VERSION_KEY):
+    """Invalidates every snapshot built from older data."""
+    # A fresh value instead of incr(): the file cache increments with a read
+    # and a write, so two processes bumping at once could both store v + 1
+    # and a snapshot built in between at v + 1 would survive the second write.
+    version = max((cache.get(key) or 0) + 1, _initial_version())
+    cache.set(key, version, timeout=None)
+    return version
+
+
+class SnapshotCache:
+    """
+    Per-user cache of computed view context, invalidated by the data version.
+
+    Each entry stores the data version and day it was built for, so a lookup
+    is a single ``get_many`` of the entry and the current version. Hit/miss
+    counters are kept in the cache so they are shared by all workers.
+    """
+
+    def __init__(self, namespace, timeout=None):
+        self.namespace = namespace
+        self.timeout = timeout or getattr(settings, 'DASHBOARD_CACHE_TIMEOUT', 6 * 60 * 60)
+
+    def _key(self, user):
+        return f'snapshot:{self.namespace}:{user.pk}'
+
+    def _stat_key(self, name):
+        return f'snapshot:{self.namespace}:{name}'
+
+    def get(self, user):
+        """Returns the cached data for user, or None if missing or stale."""
+        key = self._key(user)
+        found = cache.get_many([key, DATA_VERSION_KEY])
+        entry = found.get(key)
+        version = found.get(DATA_VERSION_KEY)
+
+        if entry and version is not None and entry['version'] == version and entry['day'] == date.today():
+            self._count('hits')
+            return entry['data']
+        self._count('misses')
+        return None
+
+    def set(self, user, data, version):
+        cache.set(self._key(user), {
+            'version': version,
+            'day': date.today(),
+            'data': data,
+        }, self.timeout)
+
+    def get_or_build(self, user, builder):
+        """
+        Returns cached data for user, calling builder() on a miss.
+        The version is read before building, so a write that lands while
+        building leaves the new entry stale instead of hiding the write.
+        """
+        data = self.get(user)
+        if data is None:
+            version = get_data_version()
+            data = builder()
+            self.set(user, data, version)
+        return data
+
+    def _count(self, name):
+        key = self._stat_key(name)
+        cache.add(key, 0, timeout=None)
+        try:
+            cache.incr(key)
+        except ValueError:
+            pass
+
+    def stats(self):
+        found = cache.get_many([self._stat_key('hits'), self._stat_key('misses')])
+        hits = found.get(self._stat_key('hits'), 0)
+        misses = found.get(self._stat_key('misses'), 0)
+        total = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / total, 4) if total else 0.0,
+        }
+
+
+class ChatResponseCache(SnapshotCache):
+    """
+    FinBot answers per user and normalized question, invalidated by the data
+    version like the dashboard snapshots and dropped at midnight (answers to
+    "this month" move with the date). Async, as the chat view is.
+    """
+
+    def __init__(self, namespace='chat', timeout=None):
+        super().__init__(namespace, timeout)
+
+    @staticmethod
+    def normalize(message):
+        """'What's my Net Worth??' and 'whats my net worth' share an entry."""
+        return ' '.join(re.sub(r"[^\w\s]", '', message.lower()).split())
+
+    def _key(self, subject):
+        user, message = subject
+        digest = hashlib.sha1(self.normalize(message).encode()).hexdigest()
+        return f'snapshot:{self.namespace}:{user.pk}:{digest}'
+
+    async def aget(self, user, message):
+        """Returns (answer or None, current data version) in one cache round trip."""
+        key = self._key((user, message))
+        found = await cache.aget_many([key, DATA_VERSION_KEY])
+        entry = found.get(key)
+        version = found.get(DATA_VERSION_KEY)
+        if version is None:
+            version = await sync_to_async(get_data_version)()
+
+        if entry and entry['version'] == version and entry['day'] == date.today():
+            await self._acount('hits')
+            return entry['data'], version
+        await self._acount('misses')
+        return None, version
+
+    async def aset(self, user, message, answer, version):
+        await cache.aset(self._key((user, message)), {
+            'version': version,
+            'day': date.today(),
+            'data': answer,
+        }, self.timeout)
+
+    async def _acount(self, name):
+        key = self._stat_key(name)
+        await cache.aadd(key, 0, timeout=None)
+        try:
+            await cache.aincr(key)
+        except ValueError:
+            pass
+
+
+home_snapshots = SnapshotCache('home')
+analytics_snapshots = SnapshotCache('analytics')
+chat_responses = ChatResponseCache()
@@ -0,0 +1,106 @@
+from decimal import Decimal
+from django.utils import timezone
+
+from core.models import Loan, SyncStatus
+from core.signals import ledger_bulk_changed
+from .experian import ExperianService
+from .broker import BrokerService
+from .market_rates import MarketRatesService
+from .holdings import HoldingsReconciler
+
+
+def import_trades(trades):
+    """
+    Creates a Loan for every Experian trade not imported yet and returns them.
+    Known trade IDs are loaded in one query and new loans are bulk inserted.
+    """
+    trades = [trade for trade in trades if trade.get('tradeId')]
+    known = set(
+        Loan.objects.filter(external_id__in=[trade['tradeId'] for trade in trades])
+        .values_list('external_id', flat=True)
+    )
+    new = []
+    for trade in trades:
+        external_id = trade['tradeId']
+        if external_id in known:
+            continue
+        known.add(external_id)
+        new.append(Loan(
+            name=f"{trade.get('accountType')} ({trade.get('accountNumber')[-4:]})",
+            principal=trade.get('originalAmount'),
+            rate=trade.get('interestRate'),
+            tenure_months=trade.get('tenureMonths'),
+            start_date=trade.get('openDate'),
+            external_id=external_id
+        ))
+    if new:
+        Loan.objects.bulk_create(new)
+        ledger_bulk_changed.send(sender=Loan, created=new, updated=[])
+    return new
+
+
+class ExternalSyncService:
+    """
+    Pulls loans from Experian and holdings from the broker into the local ledger.
+
+    Runs outside the request cycle (see the ``sync_external`` management command)
+    and records every attempt in SyncStatus so views only read stored data.
+    """
+
+    SOURCES = ('EXPERIAN', 'BROKER')
+
+    def __init__(self):
+        self.experian = ExperianService()
+        self.broker = BrokerService()
+        self.market_rates = MarketRatesService()
+
+    def run(self, sources=None):
+        """
+        Runs the requested syncs (all by default) and returns {source: SyncStatus}.
+        A failing source is recorded and does not stop the others.
+        """
+        handlers = {
+            'EXPERIAN': self.sync_loans,
+            'BROKER': self.sync_investments,
+        }
+        results = {}
+        for source in sources or self.SOURCES:
+            status, _ = SyncStatus.objects.get_or_create(source=source)
+            status.last_attempt_at = timezone.now()
+            try:
+                status.items_synced = handlers[source]()
+                status.last_success_at = status.last_attempt_at
+                status.last_error = ''
+            except Exception as e:
+                status.last_error = str(e)
+            status.save()
+            results[source] = status
+        return results
+
+    def sync_loans(self):
+        """Creates loans for new Experian trades and refreshes benchmark-linked rates."""
+        loan_data = self.experian.fetch_user_trades()
+        market_benchmarks = self.market_rates.get_loan_benchmarks()
+
+        count = len(import_trades(loan_data.get('trades', [])))
+
+        # Update Benchmark-linked Rates
+        benchmark_keys = {'HOME': 'home_loan', 'PERS': 'personal_loan'}
+        changed = []
+        for loan in Loan.objects.filter(benchmark_type__in=list(benchmark_keys)):
+            key = benchmark_keys[loan.benchmark_type]
+            if key in market_benchmarks:
+                loan.rate = Decimal(str(market_benchmarks[key]['rate']))
+                changed.append(loan)
+        if changed:
+            Loan.objects.bulk_update(changed, ['rate'])
+            ledger_bulk_changed.send(sender=Loan, created=[], updated=changed)
+
+        return count
+
+    def sync_investments(self):
+        """Reconciles stored broker holdings with the broker feed (see HoldingsReconciler)."""
+        inv_data = self.broker.fetch_portfolio()
+        holdings = inv_data.get('holdings', [])
+        HoldingsReconciler().reconcile(holdings)
+        return len(holdings)
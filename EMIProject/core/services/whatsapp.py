@@ -5,21 +5,21 @@ import time
 class WhatsAppService:
     def __init__(self):
         self.enabled = True
-        self.default_number = "+919130044796" 
 
     def send_message(self, to_number, body):
         """
         Sends an instant WhatsApp message using pywhatkit.
         Opens a browser window to send the message.
+        Nothing is sent without a recipient: messages carry that user's figures.
         """
         if not self.enabled:
             return False, "Service Disabled"
-            
-        import pywhatkit as pwk
 
-        # Use default number if explicit number not provided or for safety
-        # The user requested alerts to specific number, so we prioritize that or fallback
-        target = self.default_number
+        target = (to_number or '').strip()
+        if not target:
+            return False, "No recipient phone number"
+
+        import pywhatkit as pwk
             
         try:
             # sendwhatmsg_instantly(phone_no, message, wait_time=15, tab_close=False, close_time=3)
@@ -36,13 +36,26 @@ class WhatsAppService:
         """
         Sends an immediate alert for critical events
         """
-        # Ignoring user.profile.phone_number for now as per specific request to use 9130044796
-        
+        profile = getattr(user, 'profile', None)
+        return self.send_message(profile and profile.phone_number, self.alert_message(title, amount))
+
+    def alert_message(self, title, amount):
         msg = f"🚨 *High Value Transaction Alert*\n"
         msg += f"A new expense *'{title}'* of *₹{amount:,.2f}* was just recorded.\n"
         msg += f"Verify this transaction on your dashboard."
-        
-        return self.send_message(self.default_number, msg)
+        return msg
+
+    def alerts_message(self, expenses):
+        """One alert for a burst of high value expenses: [(title, amount), ...]"""
+        if len(expenses) == 1:
+            return self.alert_message(*expenses[0])
+
+        msg = f"🚨 *High Value Transaction Alert*\n"
+        msg += f"{len(expenses)} high value expenses were just recorded:\n"
+        for title, amount in expenses:
+            msg += f"• *'{title}'* - ₹{amount:,.2f}\n"
+        msg += f"Verify these transactions on your dashboard."
+        return msg
 
     def generate_report_message(self, user, context):
         """
@@ -0,0 +1,187 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import Signal
+
+from expenses.models import Expense, RecurringExpense
+from .models import Loan, Saving, Investment, Policy, RecurringWealth, Document, UserProfile, SyncStatus
+from .services.snapshots import bump_data_version
+from .services import rollups, search
+from .services.net_worth import NetWorthService
+
+# Sent after bulk_create/bulk_update, which bypass post_save, and bulk deletes,
+# which bypass post_delete. Receivers get sender=<model>, created=<list of new
+# instances>, updated=<list of changed instances> and optionally
+# previous=<copies of `updated` as they were stored> and deleted=<removed
+# instances as they were stored>.
+ledger_bulk_changed = Signal()
+
+_deleting_in_bulk = ContextVar('deleting_in_bulk', default=False)
+
+
+@contextmanager
+def deletes_reported_in_bulk():
+    """
+    QuerySet.delete() inside the block still sends post_delete for every row;
+    the caller reports the rows through ledger_bulk_changed(deleted=...)
+    instead, so the per-row receivers below skip them rather than running
+    their queries once per row.
+    """
+    token = _deleting_in_bulk.set(True)
+    try:
+        yield
+    finally:
+        _deleting_in_bulk.reset(token)
+
+# Every model whose rows feed a cached dashboard/analytics snapshot
+SNAPSHOT_MODELS = [
+    Expense, Saving, Investment, Loan, Policy,
+    RecurringExpense, RecurringWealth, Document, UserProfile, SyncStatus,
+]
+
+
+def invalidate_snapshots(sender, **kwargs):
+    if not _deleting_in_bulk.get():
+        bump_data_version()
+
+
+for model in SNAPSHOT_MODELS:
+    post_save.connect(invalidate_snapshots, sender=model, dispatch_uid=f'snapshot_save_{model.__name__}')
+    post_delete.connect(invalidate_snapshots, sender=model, dispatch_uid=f'snapshot_delete_{model.__name__}')
+ledger_bulk_changed.connect(invalidate_snapshots, dispatch_uid='snapshot_bulk')
+
+
+# --- Month x category rollups ---
+
+def capture_rollup_previous(sender, instance, raw=False, **kwargs):
+    """Remembers the row's stored values so an update can move it between rollups."""
+    instance._rollup_previous = None
+    if raw or instance.pk is None:
+        return
+    previous = sender.objects.filter(pk=instance.pk).first()
+    if previous is not None:
+        instance._rollup_previous = rollups.rollup_values(sender, previous)
+
+
+def update_rollup_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    kind, _ = rollups.ROLLUP_SOURCES[sender]
+    previous = getattr(instance, '_rollup_previous', None)
+    current = rollups.rollup_values(sender, instance)
+    if previous == current:
+        return
+    if previous is not None:
+        month, category, amount = previous
+        rollups.apply_delta(kind, month, category, -amount, -1)
+    month, category, amount = current
+    rollups.apply_delta(kind, month, category, amount, 1)
+
+
+def update_rollup_on_delete(sender, instance, **kwargs):
+    if _deleting_in_bulk.get():
+        return
+    kind, _ = rollups.ROLLUP_SOURCES[sender]
+    month, category, amount = rollups.rollup_values(sender, instance)
+    rollups.apply_delta(kind, month, category, -amount, -1)
+
+
+for model in rollups.ROLLUP_SOURCES:
+    pre_save.connect(capture_rollup_previous, sender=model, dispatch_uid=f'rollup_pre_save_{model.__name__}')
+    post_save.connect(update_rollup_on_save, sender=model, dispatch_uid=f'rollup_save_{model.__name__}')
+    post_delete.connect(update_rollup_on_delete, sender=model, dispatch_uid=f'rollup_delete_{model.__name__}')
+
+
+def update_rollup_on_bulk_change(sender, created=(), updated=(), previous=(), deleted=(), **kwargs):
+    if sender not in rollups.ROLLUP_SOURCES:
+        return
+    if created:
+        rollups.apply_instances(sender, created)
+    if deleted:
+        rollups.apply_instances(sender, deleted, sign=-1)
+    if previous:
+        # Move updated rows from their stored rollup to the new one
+        rollups.apply_instances(sender, previous, sign=-1)
+        rollups.apply_instances(sender, updated)
+
+
+ledger_bulk_changed.connect(update_rollup_on_bulk_change, dispatch_uid='rollup_bulk_change')
+
+
+# --- Full-text search index ---
+
+def index_for_search(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search.index(sender, [instance])
+
+
+def remove_from_search(sender, instance, **kwargs):
+    if not _deleting_in_bulk.get():
+        search.remove(sender, [instance.pk])
+
+
+def index_bulk_for_search(sender, created=(), updated=(), previous=(), deleted=(), **kwargs):
+    if deleted:
+        search.remove(sender, [obj.pk for obj in deleted])
+    if previous:
+        # Only rows whose indexed text changed (a broker sync mostly revalues)
+        updated = search.text_changed(sender, updated, previous)
+    search.index(sender, list(created) + list(updated))
+
+
+for model in search.MODEL_KINDS:
+    post_save.connect(index_for_search, sender=model, dispatch_uid=f'search_save_{model.__name__}')
+    post_delete.connect(remove_from_search, sender=model, dispatch_uid=f'search_delete_{model.__name__}')
+ledger_bulk_changed.connect(index_bulk_for_search, dispatch_uid='search_bulk')
+
+
+# --- Net worth history ---
+
+def capture_history_previous(sender, instance, raw=False, **kwargs):
+    """Remembers the stored values an update may move the row's history from."""
+    instance._history_previous = None
+    if raw or instance.pk is None:
+        return
+    previous = sender.objects.filter(pk=instance.pk).first()
+    if previous is not None:
+        instance._history_previous = NetWorthService.history_values(sender, previous)
+
+
+def _history_change_day(current, previous):
+    """Earliest date a change touches, or None if it does not affect stored snapshots."""
+    if previous == current:
+        return None
+    return min(values[0] for values in (current, previous) if values is not None)
+
+
+def invalidate_history_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    current = NetWorthService.history_values(sender, instance)
+    NetWorthService.invalidate_from(_history_change_day(current, getattr(instance, '_history_previous', None)))
+
+
+def invalidate_history_on_delete(sender, instance, **kwargs):
+    if not _deleting_in_bulk.get():
+        NetWorthService.invalidate_from(NetWorthService.history_values(sender, instance)[0])
+
+
+def invalidate_history_on_bulk_change(sender, created=(), updated=(), previous=(), deleted=(), **kwargs):
+    if sender not in NetWorthService.HISTORY_FIELDS:
+        return
+    def values(instance):
+        return None if instance is None else NetWorthService.history_values(sender, instance)
+
+    days = [values(instance)[0] for instance in list(created) + list(deleted)]
+    # Without the stored copies, every updated row counts as changed
+    pairs = zip(updated, previous) if previous else ((instance, None) for instance in updated)
+    days += [_history_change_day(values(new), values(old)) for new, old in pairs]
+    NetWorthService.invalidate_from(min((day for day in days if day is not None), default=None))
+
+
+for model in NetWorthService.HISTORY_FIELDS:
+    pre_save.connect(capture_history_previous, sender=model, dispatch_uid=f'history_pre_save_{model.__name__}')
+    post_save.connect(invalidate_history_on_save, sender=model, dispatch_uid=f'history_save_{model.__name__}')
+    post_delete.connect(invalidate_history_on_delete, sender=model, dispatch_uid=f'history_delete_{model.__name__}')
+ledger_bulk_changed.connect(invalidate_history_on_bulk_change, dispatch_uid='history_bulk_change')
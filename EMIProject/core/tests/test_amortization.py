@@ -0,0 +1,85 @@
+from django.test import TestCase, Client
+from django.urls import reverse
+from django.contrib.auth.models import User
+from core.models import Loan
+from core.utils import amortization
+from datetime import date
+from decimal import Decimal
+import numpy as np
+
+class AmortizationEngineTest(TestCase):
+    def test_emis_match_formula(self):
+        emis = amortization.emis([120000, 500000, 60000], [12, 8.5, 0], [12, 240, 12])
+        self.assertEqual(list(emis), [10661.85, 4339.12, 5000.0])
+
+    def test_schedule_splits_and_closes(self):
+        table = amortization.schedules([120000, 60000], [12, 0], [12, 6])
+
+        # First instalment of the 12% loan: 1% interest on the full principal
+        self.assertEqual(table['interest'][0, 0], 1200.0)
+        self.assertEqual(table['principal'][0, 0], 9461.85)
+        self.assertEqual(table['balance'][0, 0], 110538.15)
+
+        # Both loans close at exactly zero; the shorter one is padded with zeros
+        self.assertEqual(table['balance'][0, 11], 0.0)
+        self.assertEqual(table['balance'][1, 5], 0.0)
+        self.assertEqual(table['payment'][1, 6:].sum(), 0.0)
+        self.assertAlmostEqual(table['principal'][0].sum(), 120000, places=1)
+        self.assertAlmostEqual(table['principal'][1].sum(), 60000, places=1)
+
+    def test_balances_agree_with_schedule(self):
+        principal, rate, tenure = [2500000, 800000], [8.75, 10.5], [360, 84]
+        table = amortization.schedules(principal, rate, tenure)
+        balances = amortization.balances(principal, rate, tenure, [120, 40])
+        self.assertEqual(list(balances), [table['balance'][0, 119], table['balance'][1, 39]])
+
+    def test_schedules_match_scalar_reference(self):
+        # Timed as the portfolio_schedules case of manage.py bench
+        rng = np.random.default_rng(7)
+        count = 40
+        principal = rng.uniform(1e5, 1e7, count)
+        rate = np.append(rng.uniform(6, 14, count - 1), 0)
+        tenure = rng.integers(6, 361, count)
+        table = amortization.schedules(principal, rate, tenure)
+        emis = amortization.emis(principal, rate, tenure)
+
+        for i in range(count):
+            # Month by month, the way a bank statement runs
+            balance, r = principal[i], rate[i] / 12 / 100
+            for month in range(tenure[i]):
+                interest = balance * r
+                repaid = balance if month == tenure[i] - 1 else emis[i] - interest
+                balance -= repaid
+                self.assertAlmostEqual(table['interest'][i, month], interest, delta=0.01)
+                self.assertAlmostEqual(table['principal'][i, month], repaid, delta=0.01)
+                self.assertAlmostEqual(table['balance'][i, month], max(balance, 0), delta=0.01)
+            self.assertEqual(table['payment'][i, tenure[i]:].sum(), 0.0)
+
+class LoanAmortizationTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username='testuser', password='password')
+        self.client.force_login(self.user)
+        self.loan = Loan.objects.create(name='Car', principal=120000, rate=12, tenure_months=12, start_date=date(2025, 1, 10))
+
+    def test_loan_methods(self):
+        Loan.objects.create(name='Bike', principal=60000, rate=0, tenure_months=12, start_date=date(2025, 1, 10))
+        self.assertEqual(self.loan.calculate_emi(), Decimal('10661.85'))
+        self.assertEqual(Loan.get_total_emi(), Decimal('15661.85'))
+
+        schedule = self.loan.schedule()
+        self.assertEqual(len(schedule), 12)
+        self.assertEqual(schedule[0]['due_date'], date(2025, 2, 10))
+        self.assertEqual(schedule[-1]['balance'], Decimal('0'))
+
+    def test_schedule_view(self):
+        response = self.client.get(reverse('loan_schedule', args=[self.loan.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['schedule']), 12)
+        self.assertEqual(response.context['emi'], Decimal('10661.85'))
+
+    def test_loan_list_outstanding(self):
+        response = self.client.get(reverse('loan_list'))
+        loan = response.context['loans'][0]
+        self.assertEqual(loan.emi, Decimal('10661.85'))
+        self.assertEqual(response.context['total_outstanding'], loan.outstanding_balance())
@@ -0,0 +1,107 @@
+from django.test import TestCase, Client
+from django.urls import reverse
+from django.core.cache import cache
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from expenses.autocomplete import MEMO_SIZE, TitleIndex, title_index
+from expenses.models import Expense
+from core.models import Loan, Saving
+from datetime import date, timedelta
+import time
+
+TODAY = date(2026, 10, 18)
+
+class TitleIndexTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def add(self, title, count, day):
+        Expense.objects.bulk_create([Expense(title=title, amount=100, date=day) for _ in range(count)])
+
+    def test_ranked_by_frequency_and_recency(self):
+        self.add('Uber', 5, TODAY - timedelta(days=2))
+        self.add('Udemy course', 1, TODAY - timedelta(days=1))
+        self.add('Uniform', 8, TODAY - timedelta(days=700))
+        index = TitleIndex(defaults=[])
+
+        self.assertEqual(index.suggest('u', today=TODAY), ['Uber', 'Udemy course', 'Uniform'])
+        self.assertEqual(index.suggest('UD', today=TODAY), ['Udemy course'])
+        self.assertEqual(index.suggest('x', today=TODAY), [])
+
+    def test_titles_merge_case_insensitively_and_defaults_fill_in(self):
+        self.add('coffee', 2, TODAY)
+        self.add('Coffee', 1, TODAY - timedelta(days=3))
+        index = TitleIndex()
+        self.assertEqual(index.suggest('co', today=TODAY), ['coffee'])
+        self.assertEqual(index.entries['coffee'][1], 3)
+        self.assertIn('Medicine', index.suggest('me', today=TODAY))
+
+    def test_new_expenses_are_added_without_a_reload(self):
+        title_index.suggest('')
+        Expense.objects.create(title='Zomato order', amount=300, date=TODAY)
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(title_index.suggest('zom'), ['Zomato order'])
+        self.assertEqual(ctx.captured_queries, [])
+
+    def test_edits_and_deletes_reload_the_index(self):
+        expense = Expense.objects.create(title='Gym', amount=1500, date=TODAY)
+        self.assertEqual(title_index.suggest('gy'), ['Gym'])
+        expense.title = 'Yoga class'
+        expense.save()
+        self.assertEqual(title_index.suggest('gy'), [])
+        expense.delete()
+        self.assertEqual(title_index.suggest('yo'), [])
+
+    def test_other_ledger_writes_do_not_reload_the_index(self):
+        title_index.suggest('')
+        saving = Saving.objects.create(name='RD', amount=5000, date=TODAY)
+        saving.delete()
+        Loan.objects.create(name='Car Loan', principal=500000, rate=9, tenure_months=60, start_date=TODAY)
+        with CaptureQueriesContext(connection) as ctx:
+            title_index.suggest('gy')
+        self.assertEqual(ctx.captured_queries, [])
+
+    def test_memo_is_bounded_and_daily(self):
+        self.add('Uber', 1, TODAY)
+        index = TitleIndex(defaults=[])
+
+        for i in range(MEMO_SIZE + 50):
+            index.suggest(chr(0x4e00 + i), today=TODAY)
+            index.suggest(f'long prefix {i}', today=TODAY)
+        self.assertEqual(len(index.top), MEMO_SIZE)
+        self.assertTrue(all(len(prefix) <= 2 for prefix, _, _ in index.top))
+
+        # Scores decay by the day, so rankings are memoised per day
+        index.suggest('u', today=TODAY)
+        index.suggest('u', today=TODAY + timedelta(days=1))
+        self.assertIn(('u', 8, TODAY), index.top)
+        self.assertIn(('u', 8, TODAY + timedelta(days=1)), index.top)
+
+    def test_lookup_is_fast_on_a_large_history(self):
+        Expense.objects.bulk_create([
+            Expense(title=f'Merchant {i:05d}', amount=100, date=TODAY - timedelta(days=i % 365)) for i in range(20000)
+        ])
+        index = TitleIndex()
+        index.suggest('')
+
+        started = time.perf_counter()
+        for i in range(100):
+            index.suggest(f'merchant {i:03d}')
+        self.assertLess((time.perf_counter() - started) / 100, 0.001)
+
+class TitleSuggestViewTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.user = User.objects.create_user(username='testuser', password='password')
+        self.client.force_login(self.user)
+
+    def test_endpoint_and_form(self):
+        Expense.objects.create(title='Petrol', amount=2000, category='TRA', date=TODAY)
+        response = self.client.get(reverse('expense_title_suggest'), {'q': 'pe', 'limit': 3})
+        self.assertEqual(response.json(), {'suggestions': ['Petrol']})
+
+        response = self.client.get(reverse('expense_create'))
+        self.assertIn('Petrol', response.context['suggested_titles'])
+        self.assertLessEqual(len(response.context['suggested_titles']), 8)
@@ -0,0 +1,63 @@
+from django.test import SimpleTestCase, TestCase
+from django.conf import settings
+from core.benchmarks import runner
+from core.benchmarks.cases import build_cases
+from core.benchmarks.seed import seed
+from core.models import Loan, MonthlyRollup
+from core.services import search
+from expenses.models import Expense
+import os
+import requests
+import subprocess
+import sys
+
+class BenchmarkSuiteTest(TestCase):
+    def test_seed_and_run_every_case(self):
+        user = seed({'expenses': 300, 'savings': 10, 'loans': 5, 'holdings': 10, 'policies': 2, 'documents': 2})
+        self.assertEqual(Expense.objects.count(), 300)
+        self.assertEqual(Loan.objects.count(), 5)
+        self.assertTrue(MonthlyRollup.objects.exists())
+        # The search case measures a filled index
+        if search.available():
+            self.assertTrue(search.search('uber')['expense'])
+
+        report = runner.run(build_cases(user), repeat=1)
+        self.assertIn('home', report['results'])
+        self.assertEqual(report['results']['portfolio_emis']['queries'], 0)
+        self.assertEqual(report['results']['portfolio_schedules']['queries'], 0)
+        self.assertGreater(report['results']['home']['queries'], report['results']['home_cached']['queries'])
+
+    def test_upstream_calls_are_stubbed(self):
+        with runner.stub_upstream():
+            with self.assertRaises(requests.ConnectionError):
+                requests.get('https://api.mfapi.in/mf/120503', timeout=1)
+
+    def test_compare_flags_regressions(self):
+        def report(median, queries):
+            return {'results': {'home': {'wall_ms': {'median': median}, 'queries': queries}}}
+
+        self.assertEqual(runner.compare(report(20.0, 10), report(22.0, 10)), [])
+        self.assertEqual(len(runner.compare(report(20.0, 10), report(40.0, 12))), 2)
+
+class BenchmarkCommandsTest(SimpleTestCase):
+    """The commands build their own test database (with the replica mirrored onto it); run each end to end."""
+
+    def manage(self, *args):
+        result = subprocess.run(
+            [sys.executable, 'manage.py', *args], cwd=settings.BASE_DIR, env=os.environ,
+            capture_output=True, text=True, timeout=300,
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        return result
+
+    def test_bench(self):
+        result = self.manage('bench', '--expenses', '50', '--savings', '5', '--loans', '3', '--holdings', '5',
+                             '--policies', '1', '--documents', '1', '--repeat', '1', '--only', 'home')
+        self.assertIn('"home"', result.stdout)
+
+    def test_check_query_plans(self):
+        self.assertIn('no unexpected full scans', self.manage('check_query_plans', '--expenses', '50').stderr)
+
+    def test_bench_concurrency(self):
+        result = self.manage('bench_concurrency', '--expenses', '50', '--workers', '2', '--duration', '0.5', '--tuned-only')
+        self.assertIn('"tuned"', result.stdout)
@@ -0,0 +1,62 @@
+from django.test import TestCase, Client
+from django.urls import reverse
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.core.cache import cache
+from django.contrib.auth.models import User
+from core.chatbot import ChatBotService
+from core.services.snapshots import chat_responses
+from expenses.models import Expense
+from asgiref.sync import async_to_sync
+from datetime import date
+from unittest.mock import patch
+
+class ChatResponseCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='password')
+        Expense.objects.create(title='Rent', amount=15000, category='BIL', date=date(2025, 1, 1))
+
+    def ask(self, message):
+        return async_to_sync(ChatBotService().aprocess_message)(self.user, message)
+
+    def test_repeated_question_runs_no_queries(self):
+        first = self.ask('Total expenses?')
+        with CaptureQueriesContext(connection) as ctx:
+            second = self.ask('  total EXPENSES ')
+        self.assertEqual(first, second)
+        self.assertEqual(ctx.captured_queries, [])
+        self.assertEqual(chat_responses.stats(), {'hits': 1, 'misses': 1, 'hit_rate': 0.5})
+
+    def test_data_change_invalidates_answers(self):
+        self.ask('Total expenses?')
+        Expense.objects.create(title='Lunch', amount=500, category='FOO', date=date(2025, 1, 2))
+        self.assertEqual(self.ask('Total expenses?'), 'Your total recorded expenses amount to ₹15,500.00.')
+
+    def test_provider_answers_are_cached_and_fallbacks_are_not(self):
+        async def answered(bot, message, context):
+            return 'Consider a budget.'
+
+        async def missed(bot, message, context):
+            return None
+
+        with patch.object(ChatBotService, 'ask_providers', missed):
+            self.ask('Tell me about budgeting')
+        with patch.object(ChatBotService, 'ask_providers', answered) as provider:
+            self.assertEqual(self.ask('Tell me about budgeting'), 'Consider a budget.')
+        with patch.object(ChatBotService, 'ask_providers') as provider:
+            self.assertEqual(self.ask('Tell me about budgeting!'), 'Consider a budget.')
+        provider.assert_not_called()
+
+    def test_answers_are_per_user(self):
+        other = User.objects.create_user(username='other', password='password')
+        self.ask('hello')
+        reply = async_to_sync(ChatBotService().aprocess_message)(other, 'hello')
+        self.assertIn('Hello Other', reply)
+
+    def test_stats_are_exposed(self):
+        staff = User.objects.create_user(username='staff', password='password', is_staff=True)
+        client = Client()
+        client.force_login(staff)
+        self.ask('Total expenses?')
+        self.assertEqual(client.get(reverse('cache_stats')).json()['chat']['misses'], 1)
@@ -0,0 +1,117 @@
+from django.test import TestCase
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from core import chat_query
+from core.chatbot import ChatBotService
+from core.models import Investment, Saving
+from expenses.models import Expense
+from asgiref.sync import async_to_sync
+from datetime import date
+from unittest.mock import patch
+
+TODAY = date(2026, 10, 18)
+
+class ParseTest(TestCase):
+    def test_month_and_category(self):
+        query = chat_query.parse('How much did I spend on transport in March?', TODAY)
+        self.assertEqual((query.source, query.operation, query.categories), ('expenses', 'total', ('TRA',)))
+        self.assertEqual((query.period.start, query.period.end), (date(2026, 3, 1), date(2026, 4, 1)))
+
+        # A month that has not come yet this year means last year's
+        query = chat_query.parse('food spending in december', TODAY)
+        self.assertEqual(query.period.start, date(2025, 12, 1))
+
+    def test_relative_ranges(self):
+        query = chat_query.parse('top 3 categories this quarter', TODAY)
+        self.assertEqual((query.operation, query.limit), ('top', 3))
+        self.assertEqual((query.period.start, query.period.end, query.period.label), (date(2026, 10, 1), date(2027, 1, 1), 'in Q4 2026'))
+
+        query = chat_query.parse('how much did I save in the last 30 days', TODAY)
+        self.assertEqual((query.source, query.period.start, query.period.end), ('savings', date(2026, 9, 19), date(2026, 10, 19)))
+
+    def test_years_need_a_preposition(self):
+        # An amount in the 2000s is not a year
+        query = chat_query.parse('spent 2000 on cabs', TODAY)
+        self.assertEqual((query.categories, query.period), (('TRA',), None))
+
+        query = chat_query.parse('spent 2000 on cabs in 2025', TODAY)
+        self.assertEqual((query.period.start, query.period.end), (date(2025, 1, 1), date(2026, 1, 1)))
+
+    def test_comparison(self):
+        query = chat_query.parse('compare my food spending this month with last month', TODAY)
+        self.assertEqual(query.operation, 'compare')
+        self.assertEqual((query.period.start, query.previous.start), (date(2026, 10, 1), date(2026, 9, 1)))
+
+        query = chat_query.parse('spending in March vs January', TODAY)
+        self.assertEqual((query.period.start, query.previous.start), (date(2026, 3, 1), date(2026, 1, 1)))
+
+    def test_unscoped_questions_are_left_to_the_intents(self):
+        for message in ['Total expenses', 'What is my EMI?', 'What is my net worth?', 'May I ask something?']:
+            self.assertIsNone(chat_query.parse(message, TODAY), message)
+
+    def test_questions_it_cannot_scope_fall_through(self):
+        for message in [
+            'how much tax did I pay in april', # a topic with no category
+            'how much rent did I pay this month',
+            'did I spend more than 2000 on food', # an amount filter, not a comparison
+            'how much did I spend in march 0000', # not a year
+        ]:
+            self.assertIsNone(chat_query.parse(message, TODAY), message)
+
+    def test_top_returns_at_least_one(self):
+        self.assertEqual(chat_query.parse('top 0 categories this month', TODAY).limit, 1)
+
+class RunTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        for title, amount, category, day in [
+            ('Uber', 300, 'TRA', date(2026, 3, 4)), ('Metro', 200, 'TRA', date(2026, 3, 20)),
+            ('Dinner', 1200, 'FOO', date(2026, 3, 8)), ('Fuel', 900, 'TRA', date(2026, 4, 2)),
+            ('Groceries', 800, 'FOO', date(2026, 2, 11)), ('Netflix', 500, 'ENT', date(2026, 10, 2)),
+        ]:
+            Expense.objects.create(title=title, amount=amount, category=category, date=day)
+        Saving.objects.create(name='RD', amount=2500, date=date(2026, 3, 1))
+        Investment.objects.create(name='Gold ETF', amount=4000, category='GLD', date=date(2026, 3, 15))
+
+    def ask(self, message):
+        query = chat_query.parse(message, TODAY)
+        with CaptureQueriesContext(connection) as ctx:
+            result = chat_query.run(query)
+        self.assertEqual(len(ctx.captured_queries), 1, message)
+        return chat_query.describe(query, result)
+
+    def test_answers_use_one_query_each(self):
+        self.assertEqual(
+            self.ask('How much did I spend on transport in March?'),
+            'Your spending on Transport came to ₹500.00 in March 2026 (2 entries).',
+        )
+        self.assertEqual(
+            self.ask('top 2 categories in march'),
+            'Your top 2 expense categories in March 2026: Food ₹1,200.00, Transport ₹500.00.',
+        )
+        self.assertEqual(
+            self.ask('compare spending in March vs February'),
+            'Your spending came to ₹1,700.00 in March 2026, up 112% from ₹800.00 in February 2026.',
+        )
+        self.assertEqual(self.ask('how many expenses in march'), 'You recorded 3 expenses in March 2026.')
+        self.assertEqual(self.ask('how much did I invest in gold in 2026'), 'Your new investments on Gold came to ₹4,000.00 in 2026 (1 entry).')
+
+    def test_chatbot_answers_scoped_questions_locally(self):
+        user = User.objects.create_user(username='testuser', password='password')
+        with patch.object(ChatBotService, 'ask_providers') as ask:
+            reply = async_to_sync(ChatBotService().aprocess_message)(user, 'how much did I save this year?')
+        ask.assert_not_called()
+        self.assertEqual(reply, 'Your savings came to ₹2,500.00 in 2026 (1 entry).')
+
+    def test_open_ended_questions_send_only_the_result(self):
+        user = User.objects.create_user(username='testuser', password='password')
+
+        async def ask(bot, message, context):
+            self.assertEqual(context['result'], {'current': 1700.0, 'previous': 800.0})
+            return 'Dining out drove the increase.'
+
+        with patch.object(ChatBotService, 'ask_providers', ask):
+            reply = async_to_sync(ChatBotService().aprocess_message)(user, 'why was my spending in March higher than February?')
+        self.assertEqual(reply, 'Dining out drove the increase.')
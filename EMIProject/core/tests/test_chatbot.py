@@ -0,0 +1,163 @@
+from django.test import TestCase, Client, AsyncClient, override_settings
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from core.chatbot import ChatBotService
+from asgiref.sync import async_to_sync
+from unittest.mock import patch
+import asyncio
+import json
+import time
+
+def provider(answer, delay, log):
+    async def call(client, message, context):
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            log.append(f'cancelled {answer}')
+            raise
+        log.append(f'answered {answer}')
+        return answer
+    return call
+
+class HedgedBot(ChatBotService):
+    """ChatBotService with the HTTP providers replaced by timed fakes."""
+
+    def __init__(self, *providers):
+        super().__init__()
+        self.fakes = list(providers)
+
+    def providers(self):
+        return list(self.fakes)
+
+@override_settings(CHATBOT_HEDGE_DELAY=0.05, CHATBOT_DEADLINE=0.5)
+class HedgedProvidersTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='password')
+        self.log = []
+
+    def ask(self, bot, message='What are my total expenses?'):
+        return async_to_sync(bot.ask_providers)(message, {})
+
+    def test_fast_primary_wins_without_hedging(self):
+        bot = HedgedBot(provider('openai', 0.01, self.log), provider('gemini', 0.01, self.log))
+        self.assertEqual(self.ask(bot), 'openai')
+        self.assertEqual(self.log, ['answered openai'])
+
+    def test_slow_primary_is_hedged_and_cancelled(self):
+        bot = HedgedBot(provider('openai', 0.3, self.log), provider('gemini', 0.05, self.log))
+        started = time.perf_counter()
+        self.assertEqual(self.ask(bot), 'gemini')
+        self.assertLess(time.perf_counter() - started, 0.25)
+        self.assertEqual(self.log, ['answered gemini', 'cancelled openai'])
+
+    @override_settings(CHATBOT_HEDGE_DELAY=0.4)
+    def test_failed_primary_starts_the_next_provider_at_once(self):
+        bot = HedgedBot(provider(None, 0.0, self.log), provider('gemini', 0.0, self.log))
+        started = time.perf_counter()
+        self.assertEqual(self.ask(bot), 'gemini')
+        self.assertLess(time.perf_counter() - started, 0.3)
+
+    def test_deadline_falls_back_to_local_rules(self):
+        bot = HedgedBot(provider('openai', 2, self.log), provider('gemini', 2, self.log))
+        started = time.perf_counter()
+        answer = bot.process_message(self.user, 'Should I cut my expenses?')
+        self.assertLess(time.perf_counter() - started, 1.0)
+        self.assertEqual(answer, 'Your total recorded expenses amount to ₹0.00.')
+        self.assertCountEqual(self.log, ['cancelled openai', 'cancelled gemini'])
+
+@override_settings(CHATBOT_HEDGE_DELAY=0.05, CHATBOT_DEADLINE=0.2)
+class ChatBotViewTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.user = User.objects.create_user(username='testuser', password='password')
+
+    def post(self, message):
+        return self.client.post(reverse('chatbot_ask'), json.dumps({'message': message}), content_type='application/json')
+
+    def test_requires_login(self):
+        self.assertEqual(self.post('hi').status_code, 302)
+
+    def test_answers_locally_without_providers(self):
+        self.client.force_login(self.user)
+        with patch('core.chatbot.ChatBotService.providers', return_value=[]):
+            response = self.post('hello')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Hello Testuser', response.json()['response'])
+        self.assertEqual(self.post('').status_code, 400)
+
+def token_stream(tokens, delay, log, name):
+    async def stream(client, message, context):
+        try:
+            await asyncio.sleep(delay)
+            for token in tokens:
+                yield token
+                await asyncio.sleep(0)
+        except (asyncio.CancelledError, GeneratorExit):
+            log.append(f'closed {name}')
+            raise
+    return stream
+
+class StreamingBot(ChatBotService):
+    def __init__(self, *streams):
+        super().__init__()
+        self.fakes = list(streams)
+
+    def streaming_providers(self):
+        return list(self.fakes)
+
+@override_settings(CHATBOT_HEDGE_DELAY=0.05, CHATBOT_DEADLINE=0.5)
+class StreamingTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='password')
+        self.log = []
+
+    def collect(self, bot, message):
+        async def run():
+            return [token async for token in bot.astream_message(self.user, message)]
+        return async_to_sync(run)()
+
+    def test_first_provider_to_produce_a_token_is_relayed(self):
+        bot = StreamingBot(
+            token_stream(['slow'], 0.3, self.log, 'openai'),
+            token_stream(['Keep ', 'an ', 'emergency fund.'], 0.0, self.log, 'gemini'),
+        )
+        self.assertEqual(self.collect(bot, 'Tell me about budgeting'), ['Keep ', 'an ', 'emergency fund.'])
+        self.assertEqual(self.log, ['closed openai'])
+
+        # The complete answer is cached and served whole
+        self.assertEqual(self.collect(StreamingBot(), 'Tell me about budgeting'), ['Keep an emergency fund.'])
+
+    def test_local_answers_are_one_event(self):
+        bot = StreamingBot(token_stream(['never'], 0.0, self.log, 'openai'))
+        self.assertEqual(self.collect(bot, 'total expenses'), ['Your total recorded expenses amount to ₹0.00.'])
+
+    def test_no_token_before_deadline_falls_back(self):
+        bot = StreamingBot(token_stream(['late'], 2, self.log, 'openai'))
+        with self.settings(CHATBOT_DEADLINE=0.1):
+            tokens = self.collect(bot, 'Should I cut my expenses?')
+        self.assertEqual(tokens, ['Your total recorded expenses amount to ₹0.00.'])
+
+class ChatStreamViewTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='password')
+
+    async def test_streams_server_sent_events(self):
+        client = AsyncClient()
+        await client.aforce_login(self.user)
+        response = await client.post(reverse('chatbot_stream'), json.dumps({'message': 'total expenses'}), content_type='application/json')
+
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        body = b''.join([chunk async for chunk in response.streaming_content]).decode()
+        self.assertEqual(body, (
+            'event: token\ndata: {"text": "Your total recorded expenses amount to \\u20b90.00."}\n\n'
+            'event: done\ndata: {}\n\n'
+        ))
+
+    async def test_requires_login(self):
+        response = await AsyncClient().post(reverse('chatbot_stream'), json.dumps({'message': 'hi'}), content_type='application/json')
+        self.assertEqual(response.status_code, 302)
@@ -0,0 +1,53 @@
+from django.test import TestCase
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth.models import User
+from core.models import Saving, Investment, Loan, Policy
+from core.services.dashboard import DashboardService
+from expenses.models import Expense
+from datetime import date
+from dateutil.relativedelta import relativedelta
+
+class DashboardServiceTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='password')
+        self.today = date.today()
+
+    def _seed(self, months):
+        for i in range(months):
+            day = self.today - relativedelta(months=i)
+            Expense.objects.create(title='Rent', amount=1000, category='BIL', date=day)
+            Expense.objects.create(title='Movies', amount=200, category='ENT', date=day)
+            Saving.objects.create(name='Fund', amount=500, date=day)
+            Investment.objects.create(name='Index', amount=300, category='MF', date=day)
+            Loan.objects.create(name=f'Loan {i}', principal=100000, rate=10, tenure_months=12, start_date=day)
+        Policy.objects.create(name='Term', sum_assured=1000000, premium=1000, premium_date=self.today)
+
+    def _count_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            DashboardService(self.user, today=self.today).get_context_data()
+        return len(ctx.captured_queries)
+
+    def test_query_count_is_independent_of_data_volume(self):
+        self._seed(1)
+        small = self._count_queries()
+        self._seed(24)
+        self.assertEqual(self._count_queries(), small)
+
+    def test_budget_and_trends(self):
+        self._seed(2)
+        context = DashboardService(self.user, today=self.today).get_context_data()
+
+        self.assertEqual(context['total_expenses'], 2400.0)
+        self.assertEqual(context['active_loans'], 2)
+        self.assertEqual(context['budget_analysis']['needs'], 1000.0)
+        self.assertEqual(context['budget_analysis']['wants'], 200.0)
+        self.assertEqual(context['budget_analysis']['savings'], 800.0)
+
+        trends = context['budget_trends']
+        self.assertEqual(len(trends['months']), 6)
+        self.assertEqual(trends['needs'][-2:], [1000.0, 1000.0])
+        self.assertEqual(trends['needs'][0], 0.0)
+
+        self.assertEqual(context['chart_labels'], ['Bills', 'Entertainment'])
+        self.assertEqual(context['radar_chart']['data'], [2000.0, 400.0])
@@ -0,0 +1,30 @@
+from django.test import TestCase, TransactionTestCase
+from django.db import connection, router, transaction
+from core.db_routers import read_replica
+from expenses.models import Expense
+from datetime import date
+
+class ReadReplicaRoutingTest(TransactionTestCase):
+    databases = {'default', 'replica'}
+
+    def test_reads_in_the_block_use_the_replica(self):
+        Expense.objects.create(title='Rent', amount=20000, date=date(2026, 1, 1))
+        self.assertEqual(router.db_for_read(Expense), 'default')
+        with read_replica():
+            self.assertEqual(router.db_for_read(Expense), 'replica')
+            self.assertEqual(Expense.objects.count(), 1)
+            self.assertEqual(router.db_for_write(Expense), 'default')
+
+    def test_transactions_read_their_own_writes(self):
+        with transaction.atomic(), read_replica():
+            Expense.objects.create(title='Rent', amount=20000, date=date(2026, 1, 1))
+            self.assertEqual(router.db_for_read(Expense), 'default')
+            self.assertEqual(Expense.objects.count(), 1)
+
+class ConnectionPragmasTest(TestCase):
+    def test_pragmas_are_applied(self):
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone()[0], 1) # NORMAL
+            cursor.execute('PRAGMA temp_store')
+            self.assertEqual(cursor.fetchone()[0], 2) # MEMORY
@@ -0,0 +1,92 @@
+from django.test import TestCase
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from accounts.models import UserProfile
+from core.models import DigestRun, NotificationOutbox, Saving
+from core.services.channels import ConsoleChannel, FileChannel, OutboxChannel, WhatsAppChannel
+from core.services.whatsapp import WhatsAppService
+from core.services.digest import DigestService
+from expenses.models import Expense
+from datetime import date
+from io import StringIO
+from unittest.mock import MagicMock, patch
+import os
+import tempfile
+import sys
+import time
+
+TODAY = date(2026, 10, 18)
+
+def subscribe(count, income=0):
+    users = User.objects.bulk_create([User(username=f'user{i}') for i in range(count)])
+    UserProfile.objects.bulk_create([
+        UserProfile(user=user, phone_number=f'+9190000{i:05d}', daily_digest=True, monthly_income=income)
+        for i, user in enumerate(users)
+    ])
+
+class DigestServiceTest(TestCase):
+    def setUp(self):
+        Expense.objects.create(title='Rent', amount=20000, category='BIL', date=TODAY.replace(day=2))
+        Saving.objects.create(name='RD', amount=5000, date=TODAY.replace(day=1))
+
+    def test_only_subscribers_with_a_phone_get_the_report(self):
+        subscribe(2, income=100000)
+        User.objects.create_user(username='unsubscribed', password='password')
+        no_phone = User.objects.create_user(username='nophone', password='password')
+        no_phone.profile.daily_digest = True
+        no_phone.profile.save()
+
+        out = StringIO()
+        run = DigestService(channel=ConsoleChannel(out), today=TODAY).run()
+
+        self.assertEqual((run.subscribers, run.delivered, run.channel), (2, 2, 'console'))
+        self.assertEqual(out.getvalue().count('--- To +9190000'), 2)
+        self.assertIn('*Net Worth:* ₹5,000', out.getvalue())
+        self.assertIn('*Monthly Expenses:* ₹20,000', out.getvalue())
+
+    def test_budget_status_follows_each_users_income(self):
+        shared = DigestService(channel='console', today=TODAY).shared_context()
+        self.assertEqual(DigestService.user_context(shared, 20000)['budget_status'], 'DANGER')
+        self.assertEqual(DigestService.user_context(shared, 100000)['budget_status'], 'SAFE')
+
+    def test_thousands_of_users_in_a_fixed_number_of_queries(self):
+        subscribe(3000)
+        with CaptureQueriesContext(connection) as ctx:
+            started = time.perf_counter()
+            run = DigestService(channel=OutboxChannel(), today=TODAY).run()
+            elapsed = time.perf_counter() - started
+
+        self.assertEqual(run.delivered, 3000)
+        self.assertLess(elapsed, 5)
+        # Shared figures, subscribers, then outbox lookups and inserts in
+        # batches (SQLite caps an INSERT at ~80 outbox rows): nothing per user
+        self.assertLess(len(ctx.captured_queries), 60)
+        self.assertEqual(NotificationOutbox.objects.filter(kind='DAILY_DIGEST').count(), 3000)
+
+        # A rerun for the same day queues nothing new
+        self.assertEqual(DigestService(channel=OutboxChannel(), today=TODAY).run().delivered, 0)
+        self.assertEqual(DigestRun.objects.count(), 2)
+
+    def test_whatsapp_sends_each_digest_to_its_subscriber(self):
+        subscribe(2, income=100000)
+        pywhatkit = MagicMock()
+        with patch.dict(sys.modules, {'pywhatkit': pywhatkit}):
+            run = DigestService(channel=WhatsAppChannel(), today=TODAY).run()
+            self.assertEqual(WhatsAppService().send_message('', 'Report'), (False, 'No recipient phone number'))
+
+        self.assertEqual(run.delivered, 2)
+        recipients = [call.args[0] for call in pywhatkit.sendwhatmsg_instantly.call_args_list]
+        self.assertEqual(sorted(recipients), ['+919000000000', '+919000000001'])
+
+    def test_command_writes_to_file_channel(self):
+        subscribe(1)
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'digests.txt')
+            with self.settings(DIGEST_FILE_PATH=path):
+                out = StringIO()
+                call_command('send_digest', '--channel=file', '--date=2026-10-18', stdout=out)
+            with open(path, encoding='utf-8') as f:
+                self.assertIn('FinTrack Daily Report', f.read())
+        self.assertIn('Delivered 1 of 1 digests via file', out.getvalue())
@@ -0,0 +1,96 @@
+from django.test import TestCase, Client
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.db import connection
+from django.http import StreamingHttpResponse
+from django.test.utils import CaptureQueriesContext
+from core.models import Loan, Saving
+from expenses.models import Expense
+from datetime import date, timedelta
+from decimal import Decimal
+import csv
+import json
+
+class LedgerExportTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username='testuser', password='password')
+        self.client.force_login(self.user)
+        Expense.objects.create(title='Swiggy, dinner', amount=Decimal('450.50'), category='FOO', date=date(2026, 1, 5))
+        Expense.objects.create(title='Uber', amount=Decimal('220.00'), category='TRA', date=date(2026, 1, 3))
+        Expense.objects.create(title='Rent', amount=Decimal('25000.00'), category='BIL', date=date(2026, 2, 1), external_id='rec-1')
+
+    def get(self, ledger, fmt, **params):
+        return self.client.get(reverse('ledger_export', args=[ledger, fmt]), params)
+
+    def read(self, response):
+        self.assertIsInstance(response, StreamingHttpResponse)
+        return b''.join(response.streaming_content).decode()
+
+    def test_csv(self):
+        response = self.get('expenses', 'csv')
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertIn('attachment; filename="expenses-', response['Content-Disposition'])
+        rows = list(csv.reader(self.read(response).splitlines()))
+        self.assertEqual(rows[0], ['id', 'date', 'title', 'category', 'amount', 'external_id'])
+        # Oldest first, amounts exact, quoting intact
+        self.assertEqual([row[1:] for row in rows[1:]], [
+            ['2026-01-03', 'Uber', 'TRA', '220.00', ''],
+            ['2026-01-05', 'Swiggy, dinner', 'FOO', '450.50', ''],
+            ['2026-02-01', 'Rent', 'BIL', '25000.00', 'rec-1'],
+        ])
+
+    def test_csv_does_not_carry_formulas(self):
+        Expense.objects.create(title='=HYPERLINK("http://x")', amount=Decimal('1'), category='OTH', date=date(2026, 3, 1))
+        Expense.objects.create(title='-Refund', amount=Decimal('-50.00'), category='OTH', date=date(2026, 3, 2))
+        Expense.objects.create(title='@SUM(A1)', amount=Decimal('1'), category='OTH', date=date(2026, 3, 3))
+
+        rows = list(csv.reader(self.read(self.get('expenses', 'csv', start='2026-03-01')).splitlines()))
+        self.assertEqual([(row[2], row[4]) for row in rows[1:]], [
+            ('\'=HYPERLINK("http://x")', '1.00'), ("'-Refund", '-50.00'), ("'@SUM(A1)", '1.00'),
+        ])
+        # NDJSON keeps the text as stored
+        lines = [json.loads(line) for line in self.read(self.get('expenses', 'ndjson', start='2026-03-01')).splitlines()]
+        self.assertEqual(lines[0]['title'], '=HYPERLINK("http://x")')
+
+    def test_ndjson_with_filters(self):
+        response = self.get('expenses', 'ndjson', start='2026-01-04', end='2026-02-28', category='FOO')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = [json.loads(line) for line in self.read(response).splitlines()]
+        self.assertEqual(len(lines), 1)
+        self.assertEqual((lines[0]['title'], lines[0]['amount'], lines[0]['date'], lines[0]['external_id']),
+                         ('Swiggy, dinner', '450.50', '2026-01-05', None))
+
+    def test_other_ledgers(self):
+        Saving.objects.create(name='FD', amount=5000, date=date(2026, 1, 1))
+        Loan.objects.create(name='Home Loan', principal=1000000, rate=8.5, tenure_months=240, start_date=date(2025, 6, 1))
+        self.assertIn('FD,5000.00', self.read(self.get('savings', 'csv')))
+        loans = [json.loads(line) for line in self.read(self.get('loans', 'ndjson')).splitlines()]
+        self.assertEqual((loans[0]['name'], loans[0]['start_date'], loans[0]['tenure_months']), ('Home Loan', '2025-06-01', 240))
+        self.assertEqual(self.read(self.get('investments', 'csv')).splitlines()[0],
+                         'id,date,name,category,source,quantity,amount,current_value,external_id')
+
+    def test_bad_requests(self):
+        self.assertEqual(self.get('policies', 'csv').status_code, 404)
+        self.assertEqual(self.get('expenses', 'xlsx').status_code, 404)
+        self.assertEqual(self.get('expenses', 'csv', start='yesterday').status_code, 400)
+        self.assertEqual(self.get('expenses', 'csv', start='2026-02-01', end='2026-01-01').status_code, 400)
+        self.assertEqual(self.get('expenses', 'csv', category='XYZ').status_code, 400)
+        self.assertEqual(self.get('savings', 'csv', category='FOO').status_code, 400)
+
+        self.client.logout()
+        self.assertEqual(self.get('expenses', 'csv').status_code, 302)
+
+    def test_rows_are_streamed_from_one_query(self):
+        Expense.objects.bulk_create([
+            Expense(title=f'Expense {i}', amount=10, category='OTH', date=date(2025, 1, 1) + timedelta(days=i % 365))
+            for i in range(5000)
+        ])
+        response = self.get('expenses', 'csv')
+        with CaptureQueriesContext(connection) as ctx:
+            chunks = list(response.streaming_content)
+        self.assertEqual(len(ctx.captured_queries), 1)
+        # The header goes out on its own, then the rows in several chunks
+        self.assertEqual(chunks[0], b'id,date,title,category,amount,external_id\r\n')
+        self.assertGreater(len(chunks), 5)
+        self.assertEqual(sum(chunk.count(b'\n') for chunk in chunks), 5004)
@@ -0,0 +1,122 @@
+from django.test import TestCase, Client
+from django.urls import reverse
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth.models import User
+from core.models import Investment, MonthlyRollup
+from core.services import search
+from core.services.holdings import HoldingsReconciler
+from datetime import date
+from decimal import Decimal
+from unittest.mock import patch
+
+def holding(isin, name='Fund', quantity=10, price=150.0, invested=1000.0, kind='MF'):
+    return {
+        'isin': isin, 'name': name, 'type': kind, 'quantity': quantity,
+        'current_price': price, 'invested_amount': invested, 'purchase_date': '2024-01-15',
+    }
+
+class HoldingsReconcilerTest(TestCase):
+    def test_inserts_updates_and_removes_stale(self):
+        HoldingsReconciler().reconcile([holding('A'), holding('B'), holding('C')])
+        self.assertEqual(Investment.objects.filter(source='BROKER').count(), 3)
+
+        result = HoldingsReconciler().reconcile([holding('A', price=200.0), holding('B'), holding('D')])
+        self.assertEqual(result, {'created': 1, 'updated': 1, 'removed': 1, 'skipped': 0})
+        self.assertEqual(Investment.objects.get(external_id='A').current_value, Decimal('2000'))
+        self.assertFalse(Investment.objects.filter(external_id='C').exists())
+
+        # Unchanged feed: nothing to write
+        result = HoldingsReconciler().reconcile([holding('A', price=200.0), holding('B'), holding('D')])
+        self.assertEqual(result, {'created': 0, 'updated': 0, 'removed': 0, 'skipped': 0})
+
+    def test_user_edits_survive_sync(self):
+        HoldingsReconciler().reconcile([holding('A'), holding('B')])
+        edited = Investment.objects.get(external_id='A')
+        edited.name = 'My Fund'
+        edited.quantity = 12
+        edited.user_edited = True
+        edited.save()
+        Investment.objects.filter(external_id='B').update(user_edited=True)
+        manual = Investment.objects.create(name='FD', amount=5000, category='FD', date=date(2024, 1, 1))
+
+        HoldingsReconciler().reconcile([holding('A', name='Broker Name', quantity=10, price=200.0)])
+
+        edited.refresh_from_db()
+        self.assertEqual(edited.name, 'My Fund')
+        # Revalued with the user's quantity at the new price
+        self.assertEqual(edited.current_value, Decimal('2400'))
+        # Edited rows missing from the feed and manual rows are kept
+        self.assertTrue(Investment.objects.filter(external_id='B').exists())
+        self.assertTrue(Investment.objects.filter(pk=manual.pk).exists())
+
+    def test_other_sources_ids_are_not_overwritten(self):
+        manual = Investment.objects.create(name='My SIP', amount=2000, category='MF', date=date(2024, 3, 1), external_id='A', source='RECURRING')
+
+        result = HoldingsReconciler().reconcile([holding('A', invested=9999.0), holding('B', invested=500.0)])
+
+        self.assertEqual(result, {'created': 1, 'updated': 0, 'removed': 0, 'skipped': 1})
+        manual.refresh_from_db()
+        self.assertEqual((manual.name, manual.amount, manual.source), ('My SIP', Decimal('2000'), 'RECURRING'))
+        row = MonthlyRollup.objects.get(month=date(2024, 1, 1), kind='INV', category='MF')
+        self.assertEqual((row.total, row.count), (Decimal('500'), 1))
+
+    def test_rollups_follow_bulk_changes(self):
+        HoldingsReconciler().reconcile([holding('A', invested=1000.0), holding('B', invested=500.0)])
+        HoldingsReconciler().reconcile([holding('A', invested=1500.0), holding('B', invested=500.0)])
+
+        row = MonthlyRollup.objects.get(month=date(2024, 1, 1), kind='INV', category='MF')
+        self.assertEqual((row.total, row.count), (Decimal('2000'), 2))
+
+    def test_large_portfolio_query_count(self):
+        feed = [holding(f'ISIN{i:05d}', invested=1000.0 + i) for i in range(5000)]
+        HoldingsReconciler().reconcile(feed)
+
+        feed = [holding(f'ISIN{i:05d}', price=175.0, invested=1000.0 + i) for i in range(5000)]
+        with CaptureQueriesContext(connection) as ctx:
+            result = HoldingsReconciler().reconcile(feed)
+
+        self.assertEqual(result['updated'], 5000)
+        # One read, then bulk statements in SQLite-sized batches: no per-holding queries
+        self.assertLess(len(ctx.captured_queries), 60)
+
+    def test_stale_rows_are_removed_in_bulk(self):
+        HoldingsReconciler().reconcile([holding(f'ISIN{i:05d}', name=f'Fund {i}', invested=100.0) for i in range(2000)])
+
+        # One read; four batches of 500 through the deletion collector (a read,
+        # then DELETEs of 100 rows each); one rollup read and update, five
+        # search-index DELETE batches, one net worth history DELETE, and the
+        # savepoints: nothing per row
+        with self.assertNumQueries(37):
+            result = HoldingsReconciler().reconcile([holding('ISIN00000', name='Fund 0', invested=100.0)])
+
+        self.assertEqual(result['removed'], 1999)
+        self.assertEqual(Investment.objects.count(), 1)
+        row = MonthlyRollup.objects.get(month=date(2024, 1, 1), kind='INV', category='MF')
+        self.assertEqual((row.total, row.count), (Decimal('100'), 1))
+        if search.available():
+            self.assertEqual([inv.name for inv in search.search('fund')['investment']], ['Fund 0'])
+
+class InvestmentViewsTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username='testuser', password='password')
+        self.client.force_login(self.user)
+
+    def test_sync_view_keeps_manual_investments(self):
+        manual = Investment.objects.create(name='FD', amount=5000, category='FD', date=date(2024, 1, 1))
+        with patch('core.services.broker.BrokerService.fetch_portfolio', return_value={'holdings': [holding('A')]}):
+            response = self.client.get(reverse('broker_sync'))
+
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(Investment.objects.filter(pk=manual.pk).exists())
+        self.assertTrue(Investment.objects.filter(external_id='A', source='BROKER').exists())
+
+    def test_edit_marks_row_as_user_edited(self):
+        HoldingsReconciler().reconcile([holding('A')])
+        investment = Investment.objects.get(external_id='A')
+        self.client.post(reverse('update_investment', args=[investment.pk]), {
+            'name': 'Renamed', 'amount': 1200, 'category': 'MF', 'quantity': 10, 'date': '2024-01-15',
+        })
+        investment.refresh_from_db()
+        self.assertTrue(investment.user_edited)
@@ -0,0 +1,141 @@
+from django.test import TestCase, Client
+from django.urls import reverse
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from core.models import MonthlyRollup
+from core.services import search
+from expenses.importers import StatementError, clean_title, import_statement, parse_amount
+from expenses.models import Expense
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+import os
+import tempfile
+
+HDFC_CSV = """Account Number : 50100012345678
+Statement From : 01/01/26 To : 31/01/26
+
+Date,Narration,Chq./Ref.No.,Withdrawal Amt.,Deposit Amt.,Closing Balance
+02/01/26,UPI/DR/600212345678/SWIGGY LIMITED/YESB/swiggy,0000600212345678,"1,245.50",,98754.50
+03/01/26,NEFT/N003261234/ACME CORP SALARY,N003261234,,"85,000.00",183754.50
+05/01/26,ACH/HDFC HOME LOAN EMI/123456,000000123456,"32,000.00",,151754.50
+06/01/26,CAFE COFFEE DAY,,250.00,,151504.50
+06/01/26,CAFE COFFEE DAY,,250.00,,151254.50
+not a date,BROKEN ROW,,10.00,,0
+"""
+
+OFX = (
+    "OFXHEADER:100\nDATA:OFXSGML\n\n<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>"
+    "<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20260110120000[-5:EST]<TRNAMT>-649.00<FITID>F1<NAME>NETFLIX.COM<MEMO>Subscription</STMTTRN>"
+    "<STMTTRN><TRNTYPE>CREDIT<DTPOSTED>20260111<TRNAMT>1200.00<FITID>F2<NAME>REFUND</STMTTRN>"
+    "<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20260112<TRNAMT>-310.25<FITID>F3<NAME>Uber &amp; Co</STMTTRN>"
+    "<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20260112<TRNAMT>-310.25<FITID>F3<NAME>Uber &amp; Co</STMTTRN>"
+    "</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>"
+)
+
+class StatementImportTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_csv_statement(self):
+        result = import_statement(StringIO(HDFC_CSV))
+        self.assertEqual((result.read, result.imported, result.credits, result.invalid), (6, 4, 1, 1))
+        self.assertIn("Line 10: unrecognised date 'not a date'", result.errors)
+
+        swiggy = Expense.objects.get(title='SWIGGY LIMITED')
+        self.assertEqual((swiggy.amount, swiggy.category, swiggy.date), (Decimal('1245.50'), 'FOO', date(2026, 1, 2)))
+        self.assertEqual(Expense.objects.get(amount=32000).category, 'EMI')
+        # Two identical lines are two expenses
+        self.assertEqual(Expense.objects.filter(title='CAFE COFFEE DAY').count(), 2)
+
+        # Ledger side effects of the bulk insert
+        self.assertEqual(MonthlyRollup.objects.get(month=date(2026, 1, 1), kind='EXP', category='FOO').count, 3)
+        if search.available():
+            self.assertEqual([e.title for e in search.search('swiggy')['expense']], ['SWIGGY LIMITED'])
+
+    def test_reimport_adds_nothing(self):
+        import_statement(StringIO(HDFC_CSV))
+        result = import_statement(StringIO(HDFC_CSV))
+        self.assertEqual((result.imported, result.duplicates), (0, 4))
+        self.assertEqual(Expense.objects.count(), 4)
+
+    def test_ofx_statement(self):
+        result = import_statement(StringIO(OFX))
+        self.assertEqual((result.read, result.imported, result.credits, result.duplicates), (4, 2, 1, 1))
+        netflix = Expense.objects.get(amount=Decimal('649.00'))
+        self.assertEqual((netflix.title, netflix.category, netflix.date), ('NETFLIX.COM', 'ENT', date(2026, 1, 10)))
+        self.assertEqual(Expense.objects.get(amount=Decimal('310.25')).title, 'Uber & Co')
+
+    def test_signed_amounts_and_learned_categories(self):
+        Expense.objects.create(title='Ramesh Kirana', amount=300, category='FOO', date=date(2025, 12, 1))
+        csv = "Date,Description,Amount\n2026-01-05,Ramesh Kirana,-420.00\n2026-01-06,Interest,15.00\n"
+        result = import_statement(StringIO(csv))
+        self.assertEqual((result.imported, result.credits), (1, 1))
+        self.assertEqual(Expense.objects.get(amount=420).category, 'FOO')
+
+    def test_non_finite_amounts_are_invalid(self):
+        csv = "Date,Description,Amount\n2026-01-05,Odd,NaN\n2026-01-06,Odder,-Infinity\n2026-01-07,Fine,-10.00\n"
+        result = import_statement(StringIO(csv))
+        self.assertEqual((result.imported, result.invalid), (1, 2))
+        self.assertIn("Line 2: unrecognised amount 'NaN'", result.errors)
+
+    def test_unreadable_file(self):
+        with self.assertRaises(StatementError):
+            import_statement(StringIO("just,some,columns\n1,2,3\n"))
+
+    def test_large_statement_is_written_in_batches(self):
+        rows = ''.join(f"2026-01-{1 + i % 28:02d},UPI/DR/{10**11 + i}/MERCHANT {i % 500},-{10 + i % 90}.00\n" for i in range(10000))
+        with CaptureQueriesContext(connection) as ctx:
+            result = import_statement(StringIO("Date,Description,Amount\n" + rows), batch_size=2000)
+        self.assertEqual(result.imported, 10000)
+        self.assertLess(len(ctx.captured_queries), 500)
+
+    def test_helpers(self):
+        self.assertEqual(parse_amount('(1,200.00)'), Decimal('-1200.00'))
+        self.assertEqual(parse_amount('250.00 Dr'), Decimal('-250.00'))
+        self.assertIsNone(parse_amount(' '))
+        self.assertEqual(clean_title('UPI/DR/412345678901/RAMESH KIRANA/SBIN'), 'RAMESH KIRANA')
+        self.assertEqual(clean_title('POS 4321 BIGBASKET'), 'POS 4321 BIGBASKET')
+
+class StatementImportEntryPointsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.user = User.objects.create_user(username='testuser', password='password')
+        self.client.force_login(self.user)
+
+    def test_upload_view(self):
+        upload = SimpleUploadedFile('jan.csv', HDFC_CSV.encode('utf-8-sig'), content_type='text/csv')
+        response = self.client.post(reverse('expense_import'), {'statement': upload}, follow=True)
+        self.assertRedirects(response, reverse('expense_list'))
+        self.assertEqual(Expense.objects.count(), 4)
+        self.assertIn('Imported 4 expenses from 6 lines', [str(m) for m in response.context['messages']][0])
+
+        upload = SimpleUploadedFile('notes.csv', b'hello,world\n', content_type='text/csv')
+        response = self.client.post(reverse('expense_import'), {'statement': upload})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Could not read this statement', response.context['form'].errors['statement'][0])
+
+    def test_upload_reports_rows_imported_before_a_decoding_error(self):
+        rows = ''.join(f"2026-01-{1 + i % 28:02d},Shop {i},-{10 + i}.00\n" for i in range(3000))
+        body = ("Date,Description,Amount\n" + rows).encode() + b"2026-01-01,Caf\xe9,-5.00\n"
+        upload = SimpleUploadedFile('jan.csv', body, content_type='text/csv')
+        response = self.client.post(reverse('expense_import'), {'statement': upload})
+        self.assertEqual(response.status_code, 200)
+        error = response.context['form'].errors['statement'][0]
+        self.assertIn('not valid text', error)
+        self.assertIn('2000 expenses from the lines before it were imported', error)
+        self.assertEqual(Expense.objects.count(), 2000)
+
+    def test_command(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'jan.ofx')
+            with open(path, 'w') as f:
+                f.write(OFX)
+            out = StringIO()
+            call_command('import_statement', path, stdout=out, stderr=StringIO())
+        self.assertIn('Imported 2 expenses from 4 lines', out.getvalue())
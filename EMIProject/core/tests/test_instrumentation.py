@@ -0,0 +1,124 @@
+from django.test import TestCase, Client, RequestFactory, override_settings
+from django.urls import reverse
+from django.http import HttpResponse, StreamingHttpResponse
+from django.contrib.auth.models import User
+from core.benchmarks.seed import seed
+from core.middleware import QueryInstrumentationMiddleware, QueryBudgetExceeded, QueryRecorder
+from core.models import Loan
+from expenses.models import Expense
+from datetime import date
+from unittest.mock import patch
+from asgiref.sync import async_to_sync
+
+class QueryInstrumentationTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username='testuser', password='password')
+        self.client.force_login(self.user)
+
+    def test_server_timing_and_stats(self):
+        response = self.client.get(reverse('analytics'))
+        self.assertIn('db;dur=', response['Server-Timing'])
+        self.assertIn('view;dur=', response['Server-Timing'])
+        self.assertEqual(response.query_stats['budget'], 12)
+        self.assertGreater(response.query_stats['queries'], 0)
+
+    def test_repeated_queries_are_reported(self):
+        def n_plus_one(request):
+            for title in ['a', 'b', 'c']:
+                Expense.objects.filter(title=title).exists()
+            Expense.objects.filter(title='a').exists()
+            return HttpResponse()
+
+        with self.assertLogs('core.perf', level='INFO') as logs:
+            response = QueryInstrumentationMiddleware(n_plus_one)(RequestFactory().get('/probe/'))
+
+        self.assertEqual(response.query_stats['queries'], 4)
+        self.assertEqual(response.query_stats['duplicates'], 1)
+        self.assertEqual(response.query_stats['similar'], 2)
+        self.assertIn('path=/probe/ view=- status=200 queries=4', logs.output[0])
+
+    async def test_async_stack_is_instrumented(self):
+        async def view(request):
+            for title in ['a', 'b']:
+                await Expense.objects.filter(title=title).aexists()
+            return HttpResponse()
+
+        response = await QueryInstrumentationMiddleware(view)(RequestFactory().get('/probe/'))
+        self.assertEqual((response.query_stats['queries'], response.query_stats['similar']), (2, 1))
+
+        # A sync view behind the ASGI handler
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse('analytics'))
+        self.assertIn('db;dur=', response['Server-Timing'])
+        self.assertGreater(response.query_stats['queries'], 0)
+        self.assertEqual(response.query_stats['budget'], 12)
+
+    def test_params_are_not_kept(self):
+        # A bulk import's values must not stay in memory for the whole request
+        recorder = QueryRecorder()
+        for _ in range(2):
+            recorder(lambda *args: None, 'INSERT INTO t VALUES (%s)', ['x' * 10000], False, {})
+        self.assertEqual(recorder.duplicates, 1)
+        self.assertTrue(all(isinstance(params, int) for _, params in recorder.statements))
+
+    def test_streaming_queries_are_counted_after_the_body(self):
+        def rows():
+            for title in ['a', 'b', 'c']:
+                yield str(Expense.objects.filter(title=title).count())
+
+        async def arows():
+            for title in ['a', 'b']:
+                yield str(await Expense.objects.filter(title=title).acount())
+
+        response = QueryInstrumentationMiddleware(lambda request: StreamingHttpResponse(rows()))(RequestFactory().get('/probe/'))
+        self.assertFalse(response.has_header('Server-Timing'))
+        self.assertFalse(hasattr(response, 'query_stats'))
+        self.assertEqual(b''.join(response.streaming_content), b'000')
+        self.assertEqual(response.query_stats['queries'], 3)
+
+        async def consume():
+            response = QueryInstrumentationMiddleware(lambda request: StreamingHttpResponse(arows()))(RequestFactory().get('/probe/'))
+            self.assertEqual(b''.join([chunk async for chunk in response.streaming_content]), b'00')
+            return response.query_stats['queries']
+        self.assertEqual(async_to_sync(consume)(), 2)
+
+    @override_settings(QUERY_BUDGET_STRICT=True)
+    def test_strict_budget_raises(self):
+        with patch('core.views.HomeView.query_budget', 1):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get(reverse('home'))
+
+    def test_experian_sync_has_no_per_trade_queries(self):
+        trades = [
+            {'tradeId': f'T{i}', 'accountType': 'Personal Loan', 'accountNumber': f'XXXX{i:04d}',
+             'originalAmount': 100000, 'interestRate': 11.5, 'tenureMonths': 24, 'openDate': '2025-01-10'}
+            for i in range(30)
+        ]
+        with patch('core.services.experian.ExperianService.fetch_user_trades', return_value={'trades': trades}):
+            response = self.client.post(reverse('experian_sync'))
+            self.assertEqual(Loan.objects.count(), 30)
+            self.assertEqual(response.query_stats['similar'], 0)
+            self.assertLessEqual(response.query_stats['queries'], response.query_stats['budget'])
+
+            # Rerun: everything is known, nothing is created
+            self.client.post(reverse('experian_sync'))
+            self.assertEqual(Loan.objects.count(), 30)
+
+@override_settings(QUERY_BUDGET_STRICT=True)
+class QueryBudgetTest(TestCase):
+    """Every budgeted view stays within its query_budget on a seeded database."""
+
+    def test_hot_views_within_budget(self):
+        user = seed({'expenses': 2000, 'savings': 50, 'loans': 20, 'holdings': 50, 'policies': 5, 'documents': 5})
+        client = Client()
+        client.force_login(user)
+
+        for name, params in [
+            ('home', {}), ('analytics', {}), ('expense_list', {}), ('search', {'q': 'uber'}),
+            ('loan_list', {}), ('saving_list', {}), ('investment_list', {}), ('policy_list', {}),
+            ('net_worth_trend', {'range': '1y'}),
+        ]:
+            response = client.get(reverse(name), params)
+            self.assertEqual(response.status_code, 200, name)
+            self.assertLessEqual(response.query_stats['queries'], response.query_stats['budget'], name)
@@ -0,0 +1,68 @@
+from django.test import TestCase
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from core import intents
+from core.chatbot import ChatBotService
+from core.models import Saving, Loan
+from expenses.models import Expense
+from asgiref.sync import async_to_sync
+from datetime import date
+from unittest.mock import patch
+
+class ClassifyTest(TestCase):
+    def test_financial_lookups_are_confident(self):
+        for message, intent in [
+            ('Total expenses', 'expenses'),
+            ('How much have I spent?', 'expenses'),
+            ('How much have I saved?', 'savings'),
+            ('What is my EMI?', 'loans'),
+            ('What is my net worth?', 'net_worth'),
+            ('Show my investments', 'investments'),
+            ('hi, what are my expenses?', 'expenses'),
+            ('hello', 'greeting'),
+        ]:
+            match = intents.classify(message)
+            self.assertEqual(match.intent, intent, message)
+            self.assertTrue(match.confident, message)
+
+    def test_typos_are_matched_fuzzily(self):
+        match = intents.classify('show my expnses')
+        self.assertEqual(match.intent, 'expenses')
+        self.assertTrue(match.confident)
+
+    def test_open_ended_and_mixed_questions_go_to_providers(self):
+        for message in [
+            'Should I prepay my loan?',
+            'Compare my savings and investments',
+            'Why is my spending so high?',
+        ]:
+            self.assertFalse(intents.classify(message).confident, message)
+        self.assertIsNone(intents.classify('Tell me a joke'))
+
+class LocalAnswerTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='password')
+        Expense.objects.create(title='Rent', amount=15000, category='Housing', date=date(2025, 1, 1))
+        Saving.objects.create(name='RD', amount=2500, date=date(2025, 1, 1))
+        Loan.objects.create(name='Car', principal=500000, rate=9, tenure_months=60, start_date=date(2024, 1, 1))
+
+    def test_answer_runs_only_the_queries_it_needs(self):
+        with CaptureQueriesContext(connection) as ctx:
+            reply = intents.answer(intents.classify('total expenses'), self.user)
+        self.assertEqual(reply, 'Your total recorded expenses amount to ₹15,000.00.')
+        self.assertEqual(len(ctx.captured_queries), 1)
+
+    def test_confident_intent_skips_the_providers(self):
+        with patch.object(ChatBotService, 'ask_providers') as ask:
+            reply = async_to_sync(ChatBotService().aprocess_message)(self.user, 'what is my emi')
+        ask.assert_not_called()
+        self.assertEqual(reply, 'You have 1 active loans. Your total monthly EMI obligation is ₹10,379.18.')
+
+    def test_context_matches_the_facts(self):
+        context = ChatBotService().get_context_data()
+        self.assertEqual(context['net_worth'], 2500.0)
+        self.assertEqual(context['total_debt_principal'], 500000.0)
+        self.assertEqual(context['currency'], 'INR')
@@ -0,0 +1,90 @@
+from django.test import TestCase
+from django.core.cache import cache
+from core.services.broker import BrokerService, NavCache, next_nav_publish, NAV_TIMEZONE
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import threading
+import time
+
+class FakeResponse:
+    def __init__(self, code, nav):
+        self.payload = {
+            'meta': {'scheme_name': f'Scheme {code}'},
+            'data': [{'nav': str(nav), 'date': '17-10-2026'}],
+        }
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+class FakeSession:
+    """Stands in for the pooled requests.Session with a fixed per-call latency."""
+
+    def __init__(self, latency=0.0, nav=100.0):
+        self.latency = latency
+        self.nav = nav
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def get(self, url, timeout=None):
+        with self.lock:
+            self.calls += 1
+        time.sleep(self.latency)
+        return FakeResponse(url.rsplit('/', 1)[-1], self.nav)
+
+class NavCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.cache = NavCache('test-nav')
+
+    def test_fresh_until_next_publish(self):
+        morning = datetime(2026, 10, 16, 9, 0, tzinfo=NAV_TIMEZONE)
+        night = datetime(2026, 10, 16, 23, 30, tzinfo=NAV_TIMEZONE)
+        self.assertEqual(next_nav_publish(morning), datetime(2026, 10, 16, 23, 0, tzinfo=NAV_TIMEZONE))
+        self.assertEqual(next_nav_publish(night), datetime(2026, 10, 17, 23, 0, tzinfo=NAV_TIMEZONE))
+
+        self.cache.set('120503', {'nav': 50.0}, now=morning)
+        self.assertEqual(self.cache.get('120503', now=morning + timedelta(hours=13))[1], 'fresh')
+        self.assertEqual(self.cache.get('120503', now=morning + timedelta(hours=15))[1], 'stale')
+        self.assertEqual(self.cache.get('118989', now=morning)[1], 'miss')
+        self.assertEqual(self.cache.stats(), {'hits': 1, 'stale': 1, 'misses': 1, 'hit_rate': 0.6667})
+
+class BrokerNavFetchTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.cache = NavCache('test-nav')
+
+    def test_lookups_run_concurrently(self):
+        session = FakeSession(latency=0.2)
+        service = BrokerService(session=session, cache=self.cache)
+        codes = [str(code) for code in range(100000, 100006)]
+
+        started = time.perf_counter()
+        navs = service.fetch_mf_navs(codes)
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(len(navs), 6)
+        self.assertEqual(navs['100000']['nav'], 100.0)
+        # Six 200 ms lookups in about the time of one
+        self.assertLess(elapsed, 0.6)
+
+        # Second sync is served entirely from the cache
+        service.fetch_mf_navs(codes)
+        self.assertEqual(session.calls, 6)
+        self.assertEqual(self.cache.stats()['hits'], 6)
+
+    def test_stale_entry_is_served_and_revalidated(self):
+        yesterday = datetime.now(NAV_TIMEZONE) - timedelta(days=1, hours=1)
+        self.cache.set('120503', {'nav': 50.0}, now=yesterday)
+
+        session = FakeSession(nav=55.0)
+        refresher = ThreadPoolExecutor(max_workers=1)
+        service = BrokerService(session=session, cache=self.cache, refresh_executor=refresher)
+
+        self.assertEqual(service.fetch_mf_nav('120503')['nav'], 50.0)
+        refresher.shutdown(wait=True)
+
+        self.assertEqual(session.calls, 1)
+        self.assertEqual(self.cache.get('120503'), ({'name': 'Scheme 120503', 'nav': 55.0, 'date': '17-10-2026'}, 'fresh'))
@@ -0,0 +1,132 @@
+from django.test import TestCase, Client
+from django.urls import reverse
+from django.core.management import call_command
+from django.contrib.auth.models import User
+from core.models import Saving, Investment, Loan, NetWorthSnapshot
+from core.services.net_worth import NetWorthService
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+
+class OutstandingBalanceTest(TestCase):
+    def test_balance_follows_amortization(self):
+        loan = Loan(name='Car', principal=Decimal('120000'), rate=Decimal('12'), tenure_months=12, start_date=date(2025, 1, 10))
+
+        self.assertEqual(loan.outstanding_balance(date(2024, 12, 31)), 0) # not taken yet
+        self.assertEqual(loan.outstanding_balance(date(2025, 2, 9)), Decimal('120000'))
+        # After the first EMI (10,661.85) the balance drops by EMI - 1% interest
+        self.assertEqual(loan.outstanding_balance(date(2025, 2, 10)), Decimal('110538.15'))
+        self.assertEqual(loan.outstanding_balance(date(2026, 1, 10)), 0) # fully repaid
+
+class NetWorthSnapshotTest(TestCase):
+    def setUp(self):
+        self.today = date(2025, 6, 30)
+
+    def test_fill_appends_only_missing_days(self):
+        Saving.objects.create(name='Fund', amount=1000, date=date(2025, 6, 1))
+        Investment.objects.create(name='SGB', amount=4500, current_value=6200, category='GLD', date=date(2025, 6, 10))
+        Investment.objects.create(name='Manual', amount=300, category='OTH', date=date(2025, 6, 10))
+
+        created = NetWorthService().fill_snapshots(until=date(2025, 6, 20))
+        self.assertEqual(created, 20)
+        self.assertEqual(NetWorthService().fill_snapshots(until=date(2025, 6, 20)), 0)
+        self.assertEqual(NetWorthService().fill_snapshots(until=self.today), 10)
+
+        first = NetWorthSnapshot.objects.get(date=date(2025, 6, 1))
+        self.assertEqual(first.net_worth, Decimal('1000'))
+        # Valued at current_value, or amount when never revalued
+        self.assertEqual(NetWorthSnapshot.objects.get(date=date(2025, 6, 10)).investments, Decimal('6500'))
+
+    def test_loans_reduce_net_worth_by_outstanding_balance(self):
+        Saving.objects.create(name='Fund', amount=200000, date=date(2025, 1, 1))
+        loan = Loan.objects.create(name='Car', principal=120000, rate=12, tenure_months=12, start_date=date(2025, 1, 10))
+
+        call_command('snapshot_net_worth', '--until=2025-03-15', stdout=StringIO())
+        loan.refresh_from_db()
+
+        snapshot = NetWorthSnapshot.objects.get(date=date(2025, 3, 15))
+        self.assertEqual(snapshot.loans_outstanding, loan.outstanding_balance(date(2025, 3, 15)))
+        self.assertLess(snapshot.loans_outstanding, Decimal('120000'))
+
+    def test_loan_balances_match_each_loans_own(self):
+        # Start days past 28 exercise short months; the last loan starts mid-range
+        loans = [
+            Loan.objects.create(name='Home', principal=2500000, rate=8.5, tenure_months=240, start_date=date(2024, 1, 31)),
+            Loan.objects.create(name='Car', principal=600000, rate=9, tenure_months=12, start_date=date(2024, 8, 29)),
+            Loan.objects.create(name='Friend', principal=50000, rate=0, tenure_months=10, start_date=date(2025, 2, 15)),
+        ]
+        NetWorthService().fill_snapshots(until=self.today)
+
+        for snapshot in NetWorthSnapshot.objects.order_by('date'):
+            expected = sum(loan.outstanding_balance(snapshot.date) for loan in loans)
+            self.assertEqual(snapshot.loans_outstanding, expected, snapshot.date)
+
+    def test_back_dated_changes_rebuild_history(self):
+        saving = Saving.objects.create(name='Fund', amount=1000, date=date(2025, 6, 1))
+        holding = Investment.objects.create(name='SGB', amount=4500, current_value=5000, category='GLD', date=date(2025, 6, 1))
+        service = NetWorthService()
+        service.fill_snapshots(until=date(2025, 6, 20))
+
+        # A revaluation is not back-dated: stored days keep their values
+        holding.current_value = 6000
+        holding.save()
+        self.assertEqual(NetWorthSnapshot.objects.get(date=date(2025, 6, 20)).net_worth, Decimal('6000'))
+
+        Saving.objects.create(name='Bonus', amount=500, date=date(2025, 6, 10))
+        self.assertFalse(NetWorthSnapshot.objects.filter(date__gte=date(2025, 6, 10)).exists())
+        self.assertEqual(service.fill_snapshots(until=date(2025, 6, 20)), 11)
+        self.assertEqual(NetWorthSnapshot.objects.get(date=date(2025, 6, 9)).net_worth, Decimal('6000'))
+        self.assertEqual(NetWorthSnapshot.objects.get(date=date(2025, 6, 10)).net_worth, Decimal('7500'))
+
+        # Moving a row later rebuilds from where it used to be
+        saving.date = date(2025, 6, 15)
+        saving.save()
+        service.fill_snapshots(until=date(2025, 6, 20))
+        self.assertEqual(NetWorthSnapshot.objects.get(date=date(2025, 6, 1)).net_worth, Decimal('6000'))
+
+        saving.delete()
+        service.fill_snapshots(until=date(2025, 6, 20))
+        self.assertEqual(NetWorthSnapshot.objects.get(date=date(2025, 6, 20)).net_worth, Decimal('6500'))
+
+    def test_todays_point_is_live(self):
+        client = Client()
+        client.force_login(User.objects.create_user(username='testuser', password='password'))
+        Saving.objects.create(name='Fund', amount=1000, date=date.today() - timedelta(days=1))
+
+        self.assertEqual(client.get(reverse('net_worth_trend'), {'range': '1m'}).json()['data'][-2:], [1000.0, 1000.0])
+        Saving.objects.create(name='Salary', amount=500, date=date.today())
+        self.assertEqual(client.get(reverse('net_worth_trend'), {'range': '1m'}).json()['data'][-2:], [1000.0, 1500.0])
+        self.assertFalse(NetWorthSnapshot.objects.filter(date=date.today()).exists())
+
+    def test_trend_ranges(self):
+        NetWorthSnapshot.objects.bulk_create([
+            NetWorthSnapshot(date=self.today - timedelta(days=i), net_worth=Decimal(10000 - i))
+            for i in range(1, 3650)
+        ])
+        Saving.objects.create(name='Fund', amount=10000, date=self.today)
+        service = NetWorthService()
+
+        month = service.get_trend('1m', today=self.today)
+        self.assertEqual(len(month['data']), 31) # 31 May - 30 Jun
+        self.assertEqual(month['data'][-2:], [9999.0, 10000.0]) # today's point is live
+
+        decade = service.get_trend('10y', today=self.today)
+        self.assertLessEqual(len(decade['data']), NetWorthService.MAX_POINTS + 1)
+        self.assertEqual(decade['data'][-1], 10000.0)
+
+    def test_trend_endpoint(self):
+        client = Client()
+        client.force_login(User.objects.create_user(username='testuser', password='password'))
+
+        self.assertEqual(client.get(reverse('net_worth_trend'), {'range': '1y'}).status_code, 200)
+        self.assertEqual(client.get(reverse('net_worth_trend'), {'range': '2w'}).status_code, 400)
+
+    def test_trend_endpoint_fills_missing_days(self):
+        # Before the scheduled run has stored anything, the first request does
+        Saving.objects.create(name='Fund', amount=1000, date=date.today() - timedelta(days=9))
+        client = Client()
+        client.force_login(User.objects.create_user(username='testuser', password='password'))
+
+        trend = client.get(reverse('net_worth_trend'), {'range': '1m'}).json()
+        self.assertEqual(trend['data'], [1000.0] * 10)
+        self.assertEqual(NetWorthSnapshot.objects.count(), 9) # completed days only
@@ -0,0 +1,123 @@
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.utils import timezone
+from core.models import NotificationOutbox
+from core.services import outbox
+from core.services.outbox import OutboxDispatcher
+from expenses.models import Expense
+from datetime import date, timedelta
+from io import StringIO
+from unittest.mock import patch
+
+class RecordingSender:
+    def __init__(self, ok=True):
+        self.ok = ok
+        self.sent = []
+
+    def __call__(self, recipient, body):
+        self.sent.append((recipient, body))
+        return (True, 'sent') if self.ok else (False, 'browser not available')
+
+class HighValueAlertTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='password')
+        self.user.profile.phone_number = '+919000000000'
+        self.user.profile.save()
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    @patch('core.services.whatsapp.WhatsAppService.send_message')
+    def test_create_view_only_queues_the_alert(self, send_message):
+        response = self.client.post(reverse('expense_create'), {
+            'title': 'Laptop', 'amount': 80000, 'category': 'OTH', 'date': '2026-10-01',
+        })
+        self.assertEqual(response.status_code, 302)
+        send_message.assert_not_called()
+
+        alert = NotificationOutbox.objects.get()
+        self.assertEqual((alert.kind, alert.recipient, alert.status), ('HIGH_VALUE_EXPENSE', '+919000000000', 'PENDING'))
+        self.assertEqual(alert.payload, {'title': 'Laptop', 'amount': '80000.00'})
+
+    def test_small_expenses_and_updates_queue_nothing(self):
+        expense = Expense.objects.create(title='Tea', amount=20, category='FOO', date=date(2026, 10, 1))
+        Expense.objects.create(title='TV', amount=45000, category='OTH', date=date(2026, 10, 1))
+        expense.amount = 9000
+        expense.save()
+        self.assertEqual(NotificationOutbox.objects.count(), 1)
+
+    def test_enqueue_is_deduplicated(self):
+        self.assertTrue(outbox.enqueue('HIGH_VALUE_EXPENSE', '+91', {'title': 'A', 'amount': '1'}, 'key-1'))
+        self.assertFalse(outbox.enqueue('HIGH_VALUE_EXPENSE', '+91', {'title': 'A', 'amount': '1'}, 'key-1'))
+        self.assertEqual(NotificationOutbox.objects.count(), 1)
+
+@override_settings(NOTIFICATION_MAX_ATTEMPTS=3, NOTIFICATION_RETRY_DELAY=60, NOTIFICATION_RATE_LIMIT=2, NOTIFICATION_RATE_WINDOW=3600)
+class OutboxDispatcherTest(TestCase):
+    def setUp(self):
+        self.now = timezone.now()
+
+    def queue(self, count, recipient='+91', start=0):
+        for i in range(start, start + count):
+            outbox.enqueue('HIGH_VALUE_EXPENSE', recipient, {'title': f'Item {i}', 'amount': '6000.00'}, f'alert-{recipient}-{i}')
+
+    def dispatch(self, sender, minutes=0):
+        return OutboxDispatcher(now=self.now + timedelta(minutes=minutes, seconds=1), senders={'WHATSAPP': sender}).dispatch()
+
+    def test_burst_is_coalesced_into_one_message(self):
+        self.queue(3)
+        sender = RecordingSender()
+        self.assertEqual(self.dispatch(sender), {'sent': 1, 'coalesced': 2, 'deferred': 0, 'retried': 0, 'failed': 0})
+        self.assertEqual(len(sender.sent), 1)
+        self.assertIn('3 high value expenses', sender.sent[0][1])
+        self.assertEqual(NotificationOutbox.objects.filter(status='SENT').count(), 1)
+        self.assertEqual(NotificationOutbox.objects.filter(status='COALESCED').count(), 2)
+
+        # Nothing is sent twice
+        self.dispatch(sender)
+        self.assertEqual(len(sender.sent), 1)
+
+    def test_failures_back_off_then_give_up(self):
+        self.queue(1)
+        failing = RecordingSender(ok=False)
+        self.assertEqual(self.dispatch(failing)['retried'], 1)
+        row = NotificationOutbox.objects.get()
+        self.assertEqual((row.status, row.attempts, row.last_error), ('PENDING', 1, 'browser not available'))
+
+        # Not due again until the backoff has passed (60s, then 120s)
+        self.dispatch(failing, minutes=0.5)
+        self.assertEqual(len(failing.sent), 1)
+        self.dispatch(failing, minutes=1)
+        self.dispatch(failing, minutes=4)
+        row.refresh_from_db()
+        self.assertEqual((row.status, row.attempts), ('FAILED', 3))
+
+    def test_sends_are_rate_limited_per_recipient(self):
+        sender = RecordingSender()
+        for minute in range(3):
+            self.queue(1, start=minute)
+            self.dispatch(sender, minutes=minute)
+        self.queue(1, recipient='+92')
+        result = self.dispatch(sender, minutes=3)
+
+        self.assertEqual(result['sent'], 1)
+        self.assertEqual(len(sender.sent), 3)
+        deferred = NotificationOutbox.objects.get(status='PENDING')
+        # Waits until the first send leaves the one-hour window
+        self.assertGreater(deferred.next_attempt_at, self.now + timedelta(minutes=59))
+
+    def test_leased_rows_are_not_sent_by_a_second_dispatcher(self):
+        self.queue(1)
+        first = OutboxDispatcher(now=self.now + timedelta(seconds=1))
+        self.assertEqual(len(first.claim(10)), 1)
+        self.assertEqual(OutboxDispatcher(now=self.now + timedelta(seconds=2)).claim(10), [])
+        # A dispatcher that died mid-send loses its lease
+        self.assertEqual(len(OutboxDispatcher(now=self.now + timedelta(minutes=6)).claim(10)), 1)
+
+    def test_command_sends_due_notifications(self):
+        self.queue(2)
+        with patch('core.services.whatsapp.WhatsAppService.send_message', return_value=(True, 'sent')) as send:
+            out = StringIO()
+            call_command('dispatch_notifications', stdout=out)
+        send.assert_called_once()
+        self.assertIn('1 sent, 1 coalesced', out.getvalue())
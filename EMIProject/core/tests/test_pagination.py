@@ -0,0 +1,85 @@
+from django.test import TestCase, Client
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from core.models import Saving, Loan
+from expenses.models import Expense
+from datetime import date, timedelta
+from decimal import Decimal
+
+class KeysetPaginationTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username='testuser', password='password')
+        self.client.force_login(self.user)
+        # Three expenses a day, so pages split inside runs of equal dates
+        Expense.objects.bulk_create([
+            Expense(title=f'Expense {i}', amount=10, date=date(2026, 1, 1) + timedelta(days=i // 3)) for i in range(120)
+        ])
+        self.newest_first = list(Expense.objects.order_by('-date', '-pk').values_list('pk', flat=True))
+
+    def page(self, **params):
+        return self.client.get(reverse('expense_list'), params)
+
+    def test_walks_every_row_once_in_order(self):
+        seen, params = [], {}
+        while True:
+            response = self.page(**params)
+            seen += [expense.pk for expense in response.context['expenses']]
+            if not response.context['next_cursor']:
+                break
+            params = {'after': response.context['next_cursor']}
+        self.assertEqual(seen, self.newest_first)
+
+    def test_previous_returns_the_page_before(self):
+        second = self.page(after=self.page().context['next_cursor'])
+        self.assertIsNotNone(second.context['previous_cursor'])
+        first = self.page(before=second.context['previous_cursor'])
+        self.assertEqual([e.pk for e in first.context['expenses']], self.newest_first[:50])
+        self.assertIsNone(first.context['previous_cursor'])
+        self.assertIsNotNone(first.context['next_cursor'])
+
+    def test_deep_pages_cost_the_same(self):
+        with CaptureQueriesContext(connection) as first:
+            self.page()
+        last = self.newest_first[99]
+        cursor = f"{Expense.objects.get(pk=last).date.isoformat()}.{last}"
+        with CaptureQueriesContext(connection) as deep:
+            response = self.page(after=cursor)
+        self.assertEqual(len(response.context['expenses']), 20)
+        self.assertEqual(len(deep.captured_queries), len(first.captured_queries))
+
+    def test_invalid_cursor_is_not_found(self):
+        self.assertEqual(self.page(after='yesterday').status_code, 404)
+
+class LedgerTotalsTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username='testuser', password='password')
+        self.client.force_login(self.user)
+
+    def test_savings_totals_cover_every_page(self):
+        Saving.objects.bulk_create([Saving(name=f'FD {i}', amount=100, date=date(2026, 1, 1) + timedelta(days=i)) for i in range(60)])
+        response = self.client.get(reverse('saving_list'))
+        self.assertEqual(len(response.context['savings']), 50)
+        self.assertEqual(response.context['total_savings'], Decimal('6000'))
+        self.assertEqual(response.context['saving_count'], 60)
+        self.assertEqual(response.context['last_saving_date'], date(2026, 3, 1))
+
+    def test_loan_totals(self):
+        Loan.objects.create(name='Car', principal=500000, rate=9, tenure_months=60, start_date=date.today() - timedelta(days=400))
+        Loan.objects.create(name='Home', principal=2500000, rate=8.5, tenure_months=240, start_date=date.today())
+        response = self.client.get(reverse('loan_list'))
+        loans = response.context['loans']
+        self.assertEqual(response.context['loan_count'], 2)
+        self.assertEqual(response.context['total_principal'], Decimal('3000000'))
+        self.assertEqual(response.context['total_outstanding'], sum(loan.balance for loan in loans))
+        self.assertEqual(response.context['total_monthly_emi'], sum(loan.emi for loan in loans))
+
+    def test_empty_ledgers(self):
+        for name in ['expense_list', 'saving_list', 'investment_list', 'loan_list']:
+            response = self.client.get(reverse(name))
+            self.assertEqual(response.status_code, 200, name)
+            self.assertIsNone(response.context['next_cursor'], name)
+        self.assertEqual(response.context['total_principal'], 0)
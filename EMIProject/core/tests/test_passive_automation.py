@@ -1,8 +1,11 @@
 from django.test import TestCase, Client
 from django.urls import reverse
 from django.contrib.auth.models import User
-from core.models import Investment, Saving, RecurringWealth, Loan
+from django.core.management import call_command
+from core.models import Investment, Saving, RecurringWealth, Loan, SyncStatus
 from datetime import date, timedelta
+from io import StringIO
+from unittest.mock import patch
 
 class PassiveAutomationTest(TestCase):
     def setUp(self):
@@ -10,17 +13,53 @@ class PassiveAutomationTest(TestCase):
         self.user = User.objects.create_user(username='testuser', password='password')
         self.client.force_login(self.user)
         
-    def test_passive_sync_on_home_visit(self):
-        # Before visit, no investments
-        self.assertEqual(Investment.objects.count(), 0)
-        
-        # Visit Home page
-        url = reverse('home')
-        response = self.client.get(url)
+    def test_home_visit_does_not_call_upstream(self):
+        with patch('core.services.broker.BrokerService.fetch_portfolio') as fetch_portfolio, \
+                patch('core.services.experian.ExperianService.fetch_user_trades') as fetch_trades:
+            response = self.client.get(reverse('home'))
+
         self.assertEqual(response.status_code, 200)
-        
-        # Passive sync should have triggered and created 4 items from Mock Broker
-        self.assertEqual(Investment.objects.count(), 4)
+        fetch_portfolio.assert_not_called()
+        fetch_trades.assert_not_called()
+        self.assertEqual(Investment.objects.count(), 0)
+        self.assertEqual([status.last_success_at for status in response.context['sync_statuses']], [None, None])
+
+    def test_background_sync_command(self):
+        portfolio = {'success': True, 'holdings': [{
+            'symbol': 'TATASTEEL', 'name': 'Tata Steel', 'type': 'STK', 'quantity': 50,
+            'current_price': 145.0, 'invested_amount': 5000.0,
+            'purchase_date': '2023-05-10', 'isin': 'INE081A01012'
+        }]}
+        with patch('core.services.broker.BrokerService.fetch_portfolio', return_value=portfolio):
+            call_command('sync_external', stdout=StringIO())
+
+        self.assertEqual(Investment.objects.count(), 1)
+        self.assertEqual(Loan.objects.count(), 2) # Mock Experian returns 2 trades
+        self.assertEqual(SyncStatus.objects.filter(last_success_at__isnull=False).count(), 2)
+
+        # Dashboard shows the stored sync time of each source
+        response = self.client.get(reverse('home'))
+        self.assertTrue(all(status.last_success_at for status in response.context['sync_statuses']))
+
+    def test_failed_sync_is_recorded(self):
+        with patch('core.services.broker.BrokerService.fetch_portfolio', side_effect=Exception('timeout')):
+            call_command('sync_external', source=['BROKER'], stdout=StringIO(), stderr=StringIO())
+
+        status = SyncStatus.objects.get(source='BROKER')
+        self.assertIsNone(status.last_success_at)
+        self.assertEqual(status.last_error, 'timeout')
+
+    def test_failing_source_shows_next_to_a_working_one(self):
+        call_command('sync_external', source=['EXPERIAN'], stdout=StringIO())
+        self.client.get(reverse('home')) # cache the dashboard snapshot
+        with patch('core.services.broker.BrokerService.fetch_portfolio', side_effect=Exception('timeout')):
+            call_command('sync_external', source=['BROKER'], stdout=StringIO(), stderr=StringIO())
+
+        response = self.client.get(reverse('home'))
+        experian, broker = response.context['sync_statuses']
+        self.assertIsNotNone(experian.last_success_at)
+        self.assertEqual((broker.last_success_at, broker.last_error), (None, 'timeout'))
+        self.assertContains(response, 'last sync failed: timeout')
         
     def test_recurring_processing_on_home_visit(self):
         # Setup a recurring saving that is "due" (started 31 days ago)
@@ -0,0 +1,28 @@
+from django.test import TestCase
+from django.db import connection
+from core.benchmarks import plans
+from core.benchmarks.seed import seed
+
+class QueryPlanTest(TestCase):
+    """The hot views' queries are served by indexes (see manage.py check_query_plans)."""
+
+    def setUp(self):
+        self.user = seed({'expenses': 300, 'savings': 60, 'loans': 10, 'holdings': 60, 'policies': 3, 'documents': 5})
+
+    def test_no_unexpected_full_scans(self):
+        results, problems = plans.check(self.user)
+        self.assertGreater(len(results), 50)
+        self.assertEqual(problems, [])
+
+    def test_dropped_index_is_reported(self):
+        with connection.cursor() as cursor:
+            cursor.execute('DROP INDEX expense_date')
+        _, problems = plans.check(self.user)
+        self.assertTrue(problems)
+        self.assertTrue(all('full scan of expenses_expense' in problem for problem in problems))
+
+    def test_full_scans(self):
+        self.assertEqual(plans.full_scans([
+            'SCAN expenses_expense', 'SCAN core_saving USING INDEX saving_date',
+            'SEARCH core_loan USING INTEGER PRIMARY KEY (rowid=?)', 'SCAN auth_user AS U1',
+        ]), ['expenses_expense', 'auth_user'])
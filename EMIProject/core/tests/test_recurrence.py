@@ -0,0 +1,95 @@
+from django.test import TestCase, Client
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.core.management import call_command
+from core.models import Saving, Investment, RecurringWealth, MonthlyRollup
+from core.services.recurrence import RecurrenceEngine, monthly_on_day
+from expenses.models import Expense, RecurringExpense
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+class RecurrenceEngineTest(TestCase):
+    def setUp(self):
+        self.today = date(2025, 4, 30)
+
+    def test_monthly_dates_clamp_to_month_end(self):
+        dates = list(monthly_on_day(31, date(2025, 1, 15), None, self.today))
+        self.assertEqual(dates, [date(2025, 1, 31), date(2025, 2, 28), date(2025, 3, 31), date(2025, 4, 30)])
+
+        # Occurrences already processed are skipped
+        dates = list(monthly_on_day(31, date(2025, 1, 15), date(2025, 3, 1), self.today))
+        self.assertEqual(dates, [date(2025, 3, 31), date(2025, 4, 30)])
+
+    def test_payment_day_is_validated_and_clamped(self):
+        client = Client()
+        client.force_login(User.objects.create_user(username='testuser', password='password'))
+        form = {'title': 'Rent', 'amount': 100, 'recurrence_type': 'BILL', 'category': 'BIL',
+                'frequency': 'MON', 'start_date': '2025-01-01', 'is_active': 'on'}
+        for day in (0, -3, 32):
+            response = client.post(reverse('recurring_add'), {**form, 'payment_date': day})
+            self.assertEqual(response.status_code, 200) # form redisplayed with the error
+        self.assertFalse(RecurringExpense.objects.exists())
+
+        # Rows stored before the field was validated still book on the 1st
+        RecurringExpense.objects.create(title='Old', amount=100, payment_date=0, start_date=date(2025, 3, 1))
+        self.assertEqual(RecurrenceEngine(today=self.today).run()['expenses'], 2)
+        self.assertEqual(
+            list(Expense.objects.order_by('date').values_list('date', flat=True)),
+            [date(2025, 3, 1), date(2025, 4, 1)],
+        )
+
+    def test_catches_up_every_missed_occurrence(self):
+        rent = RecurringExpense.objects.create(title='Rent', amount=20000, category='BIL', payment_date=5, start_date=date(2025, 1, 1))
+        RecurringExpense.objects.create(title='Gym', amount=500, category='ENT', frequency='WEK', start_date=date(2025, 4, 1))
+        RecurringExpense.objects.create(title='Index Fund', amount=2000, recurrence_type='SIP', payment_date=10, start_date=date(2025, 3, 1))
+        RecurringWealth.objects.create(name='RD', type='SAV', amount=1000, start_date=date(2025, 1, 31))
+
+        created = RecurrenceEngine(today=self.today).run()
+        self.assertEqual(created, {'expenses': 4 + 5, 'savings': 3, 'investments': 2})
+
+        self.assertEqual(
+            list(Expense.objects.filter(title='Rent (Auto)').order_by('date').values_list('date', flat=True)),
+            [date(2025, 1, 5), date(2025, 2, 5), date(2025, 3, 5), date(2025, 4, 5)],
+        )
+        # Monthly from 31 Jan does not drift to the 28th after February
+        self.assertEqual(
+            list(Saving.objects.order_by('date').values_list('date', flat=True)),
+            [date(2025, 2, 28), date(2025, 3, 31), date(2025, 4, 30)],
+        )
+        rent.refresh_from_db()
+        self.assertEqual(rent.last_processed_date, self.today)
+
+        # Bulk inserts still feed the rollups
+        self.assertEqual(MonthlyRollup.objects.get(month=date(2025, 4, 1), kind='EXP', category='ENT').total, Decimal('2500'))
+
+    def test_rerun_is_idempotent(self):
+        item = RecurringWealth.objects.create(name='SIP', type='INV', amount=1000, category='MF', start_date=date(2025, 1, 1))
+        RecurrenceEngine(today=self.today).run()
+        self.assertEqual(RecurrenceEngine(today=self.today).run()['investments'], 0)
+
+        # Even if the watermark is lost, idempotency keys prevent duplicates
+        RecurringWealth.objects.filter(pk=item.pk).update(last_processed_date=None)
+        self.assertEqual(RecurrenceEngine(today=self.today).run()['investments'], 0)
+        self.assertEqual(Investment.objects.count(), 3)
+
+    def test_year_of_subscriptions_is_set_based(self):
+        RecurringExpense.objects.bulk_create([
+            RecurringExpense(title=f'Sub {i}', amount=199, category='ENT', payment_date=1 + i % 28, start_date=date(2024, 5, 1))
+            for i in range(200)
+        ])
+
+        with CaptureQueriesContext(connection) as ctx:
+            created = RecurrenceEngine(today=self.today).run()
+
+        self.assertEqual(created['expenses'], 200 * 12)
+        # 2,400 entries: a few key lookups, insert batches, rollup deltas and one bulk update
+        self.assertLess(len(ctx.captured_queries), 50)
+
+    def test_command(self):
+        RecurringWealth.objects.create(name='RD', type='SAV', amount=1000, start_date=date(2025, 1, 1))
+        out = StringIO()
+        call_command('process_recurring', '--until=2025-04-30', stdout=out)
+        self.assertIn('3 savings', out.getvalue())
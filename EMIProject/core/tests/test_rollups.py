@@ -0,0 +1,93 @@
+from django.test import TestCase, Client
+from django.urls import reverse
+from django.core.management import call_command
+from django.contrib.auth.models import User
+from core.models import MonthlyRollup, Saving, Investment
+from core.signals import ledger_bulk_changed
+from expenses.models import Expense
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+class MonthlyRollupTest(TestCase):
+    def setUp(self):
+        self.month = date(2025, 3, 1)
+
+    def _row(self, kind, category='', month=None):
+        return MonthlyRollup.objects.get(month=month or self.month, kind=kind, category=category)
+
+    def _snapshot(self):
+        return sorted(
+            (r.month, r.kind, r.category, r.total, r.count)
+            for r in MonthlyRollup.objects.filter(count__gt=0)
+        )
+
+    def test_create_update_delete_keep_rollups_current(self):
+        lunch = Expense.objects.create(title='Lunch', amount=100, category='FOO', date=date(2025, 3, 5))
+        Expense.objects.create(title='Dinner', amount=250, category='FOO', date=date(2025, 3, 20))
+        row = self._row('EXP', 'FOO')
+        self.assertEqual((row.total, row.count), (Decimal('350'), 2))
+
+        # Moving an expense to another category/month moves its contribution
+        lunch.category = 'ENT'
+        lunch.date = date(2025, 4, 2)
+        lunch.save()
+        self.assertEqual(self._row('EXP', 'FOO').total, Decimal('250'))
+        self.assertEqual(self._row('EXP', 'ENT', month=date(2025, 4, 1)).total, Decimal('100'))
+
+        lunch.delete()
+        self.assertEqual(self._row('EXP', 'ENT', month=date(2025, 4, 1)).count, 0)
+
+    def test_savings_and_investments(self):
+        Saving.objects.create(name='Fund', amount=500, date=date(2025, 3, 1))
+        Investment.objects.create(name='SGB', amount=4500, category='GLD', date='2025-03-15')
+        self.assertEqual(self._row('SAV').total, Decimal('500'))
+        self.assertEqual(self._row('INV', 'GLD').total, Decimal('4500'))
+
+    def test_bulk_changes_are_applied_in_one_pass(self):
+        Expense.objects.create(title='Lunch', amount=100, category='FOO', date=date(2025, 3, 5))
+        rows = Expense.objects.bulk_create([
+            Expense(title='Dinner', amount=250, category='FOO', date=date(2025, 3, 20)),
+            Expense(title='Movie', amount=400, category='ENT', date=date(2025, 3, 21)),
+        ])
+        ledger_bulk_changed.send(sender=Expense, created=rows, updated=[])
+
+        self.assertEqual((self._row('EXP', 'FOO').total, self._row('EXP', 'FOO').count), (Decimal('350'), 2))
+        self.assertEqual(self._row('EXP', 'ENT').total, Decimal('400'))
+
+    def test_rebuild_matches_incremental(self):
+        Expense.objects.create(title='Rent', amount=20000, category='BIL', date=date(2025, 1, 1))
+        Expense.objects.create(title='Uber', amount=300, category='TRA', date=date(2025, 2, 14))
+        Saving.objects.create(name='Fund', amount=500, date=date(2025, 2, 1))
+        incremental = self._snapshot()
+
+        MonthlyRollup.objects.all().delete()
+        call_command('rebuild_rollups', stdout=StringIO())
+        self.assertEqual(self._snapshot(), incremental)
+
+class RollupReadersTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username='testuser', password='password')
+        self.client.force_login(self.user)
+
+    def test_expense_list_month_figures(self):
+        today = date.today()
+        Expense.objects.create(title='Lunch', amount=100, category='FOO', date=today)
+        Expense.objects.create(title='Fuel', amount=400, category='TRA', date=today)
+
+        response = self.client.get(reverse('expense_list'))
+        self.assertEqual(response.context['month_total'], 500.0)
+        self.assertEqual(response.context['month_count'], 2)
+
+    def test_analytics_charts(self):
+        today = date.today()
+        Expense.objects.create(title='Lunch', amount=100, category='FOO', date=today)
+        Investment.objects.create(name='Old', amount=1000, category='STK', date=date(2020, 1, 1))
+        Investment.objects.create(name='New', amount=500, category='STK', date=today)
+
+        response = self.client.get(reverse('analytics'))
+        self.assertEqual(response.context['bar_chart']['expenses'][-1], 100.0)
+        self.assertEqual(response.context['stock_chart']['data'][0], 1000.0)
+        self.assertEqual(response.context['stock_chart']['data'][-1], 1500.0)
+        self.assertEqual(response.context['pie_chart']['labels'], ['Food'])
@@ -0,0 +1,84 @@
+from django.test import TestCase, Client
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from core.models import Loan, Investment, Policy, Saving
+from core.services import search
+from core.services.recurrence import RecurrenceEngine
+from expenses.models import Expense, RecurringExpense
+from datetime import date
+from io import StringIO
+import time
+
+class SearchIndexTest(TestCase):
+    def test_signals_keep_the_index_current(self):
+        ride = Expense.objects.create(title='Uber ride', amount=250, category='TRA', date=date(2026, 1, 5))
+        Loan.objects.create(name='Home loan HDFC', principal=100000, rate=8.5, tenure_months=120, start_date=date(2024, 1, 1))
+        Investment.objects.create(name='HDFC Flexi Cap', amount=5000, category='MF', date=date(2025, 1, 1))
+
+        self.assertEqual(search.search('ub')['expense'], [ride])
+        self.assertEqual(set(search.search('hdfc')), {'loan', 'investment'})
+        # Details (category/type names) are searchable too
+        self.assertEqual(search.search('mutual funds')['investment'][0].name, 'HDFC Flexi Cap')
+
+        ride.title = 'Ola cab'
+        ride.save()
+        self.assertEqual(search.search('uber'), {})
+        self.assertEqual(search.search('ola')['expense'], [ride])
+
+        ride.delete()
+        self.assertEqual(search.search('ola'), {})
+
+    def test_titles_rank_above_details(self):
+        Expense.objects.create(title='Lunch', amount=100, category='FOO', date=date(2026, 1, 1))
+        food = Expense.objects.create(title='Food court', amount=300, category='OTH', date=date(2026, 1, 2))
+        self.assertEqual(search.search('food')['expense'][0], food)
+
+    def test_bulk_writes_are_indexed(self):
+        RecurringExpense.objects.create(title='Netflix', amount=649, category='ENT', payment_date=5, start_date=date(2026, 1, 1))
+        RecurrenceEngine(today=date(2026, 3, 10)).run()
+        self.assertEqual(len(search.search('netflix')['expense']), 3)
+
+    def test_free_text_is_escaped(self):
+        Policy.objects.create(name='Term plan', type='TERM', sum_assured=1000000, premium=12000, premium_date=date(2026, 5, 1))
+        self.assertEqual(len(search.search('term" *')['policy']), 1)
+        self.assertEqual(search.search('"()'), {})
+
+    def test_rebuild_command(self):
+        Saving.objects.create(name='Emergency fund', amount=5000, date=date(2026, 1, 1))
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM search_index")
+        self.assertEqual(search.search('emergency'), {})
+
+        out = StringIO()
+        call_command('rebuild_search_index', stdout=out)
+        self.assertIn('Indexed 1 rows.', out.getvalue())
+        self.assertEqual(len(search.search('emergency')['saving']), 1)
+
+    def test_large_ledger_stays_fast(self):
+        Expense.objects.bulk_create([
+            Expense(title=f'Grocery run {i}', amount=100, category='FOO', date=date(2026, 1, 1)) for i in range(20000)
+        ] + [Expense(title='Swiggy dinner', amount=500, category='FOO', date=date(2026, 1, 1))])
+        search.rebuild()
+
+        started = time.perf_counter()
+        results = search.search('swig')
+        self.assertLess(time.perf_counter() - started, 0.05)
+        self.assertEqual(results['expense'][0].title, 'Swiggy dinner')
+
+class SearchViewTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username='testuser', password='password')
+        self.client.force_login(self.user)
+
+    def test_results_cover_every_financial_model(self):
+        Expense.objects.create(title='Car service', amount=4000, category='TRA', date=date(2026, 1, 5))
+        Loan.objects.create(name='Car loan', principal=500000, rate=9, tenure_months=60, start_date=date(2024, 1, 1))
+
+        response = self.client.get(reverse('search'), {'q': 'car'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([e.title for e in response.context['expenses']], ['Car service'])
+        self.assertEqual([(label, [o.name for o in objects]) for label, objects in response.context['other_results']], [('Loans', ['Car loan'])])
+        self.assertContains(response, 'Matching Loans')
@@ -0,0 +1,73 @@
+from django.test import TestCase, Client
+from django.urls import reverse
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.core.cache import cache
+from django.contrib.auth.models import User
+from core.models import Saving, Loan
+from core.services.snapshots import home_snapshots, get_data_version
+from expenses.models import Expense
+from datetime import date
+import os
+import subprocess
+import sys
+from django.conf import settings
+
+class DashboardSnapshotCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.user = User.objects.create_user(username='testuser', password='password')
+        self.client.force_login(self.user)
+
+    def test_repeat_view_is_served_from_cache(self):
+        Expense.objects.create(title='Lunch', amount=100, category='FOO', date=date.today())
+        self.client.get(reverse('home'))
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('home'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['raw_total_expenses'], 100.0)
+        ledger_queries = [q['sql'] for q in ctx.captured_queries if 'expenses_expense' in q['sql']]
+        self.assertEqual(ledger_queries, [])
+        self.assertEqual(home_snapshots.stats(), {'hits': 1, 'misses': 1, 'hit_rate': 0.5})
+
+    def test_data_change_invalidates_snapshot(self):
+        self.client.get(reverse('home'))
+        version = get_data_version()
+
+        Saving.objects.create(name='Fund', amount=500, date=date.today())
+        self.assertGreater(get_data_version(), version)
+
+        response = self.client.get(reverse('home'))
+        self.assertEqual(response.context['raw_total_savings'], 500.0)
+
+        loan = Loan.objects.create(name='Car', principal=100000, rate=9, tenure_months=12, start_date=date.today())
+        response = self.client.get(reverse('home'))
+        self.assertEqual(response.context['active_loans'], 1)
+
+        loan.delete()
+        response = self.client.get(reverse('home'))
+        self.assertEqual(response.context['active_loans'], 0)
+        self.assertEqual(home_snapshots.stats()['hits'], 0)
+
+    def test_version_is_shared_with_other_processes(self):
+        # A management command bumping the version must reach the web workers
+        version = get_data_version()
+        subprocess.run(
+            [sys.executable, '-c', 'import django; django.setup(); '
+             'from core.services.snapshots import bump_data_version; bump_data_version()'],
+            cwd=settings.BASE_DIR, env=os.environ, check=True, timeout=60,
+        )
+        self.assertGreater(get_data_version(), version)
+
+    def test_cache_stats_requires_staff(self):
+        response = self.client.get(reverse('cache_stats'))
+        self.assertEqual(response.status_code, 403)
+
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.get(reverse('cache_stats'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('home', response.json())
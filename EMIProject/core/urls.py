@@ -8,7 +8,8 @@ from .views import (
     LoanListView, SavingListView, InvestmentListView, PolicyListView, DocumentListView,
     DocumentDetailView, LoanUpdateView, LoanDeleteView, SavingUpdateView, SavingDeleteView,
     InvestmentUpdateView, InvestmentDeleteView, PolicyCreateView, PolicyUpdateView, PolicyDeleteView,
-    ChatBotView, WhatsAppReportView, VaultUnlockView, VaultSetupView, WhatsAppTestView
+    ChatBotView, ChatStreamView, WhatsAppReportView, VaultUnlockView, VaultSetupView, WhatsAppTestView,
+    CacheStatsView, NetWorthTrendView, LoanScheduleView, LedgerExportView
 )
 
 urlpatterns = [
@@ -17,10 +18,14 @@ urlpatterns = [
     path('documents/unlock/', VaultUnlockView.as_view(), name='vault_unlock'),
     path('documents/setup/', VaultSetupView.as_view(), name='vault_setup'),
     path('chat/ask/', ChatBotView.as_view(), name='chatbot_ask'),
+    path('chat/stream/', ChatStreamView.as_view(), name='chatbot_stream'),
     path('', HomeView.as_view(), name='home'),
     path('update-profile-value/', UpdateProfileValueView.as_view(), name='update_profile_value'),
     path('analytics/', AnalyticsView.as_view(), name='analytics'),
+    path('cache-stats/', CacheStatsView.as_view(), name='cache_stats'),
+    path('net-worth/trend/', NetWorthTrendView.as_view(), name='net_worth_trend'),
     path('search/', SearchView.as_view(), name='search'),
+    path('export/<slug:ledger>.<slug:fmt>', LedgerExportView.as_view(), name='ledger_export'),
     path('calculator/', EMICalculatorView.as_view(), name='emi_calculator'),
     path('loan/add/', LoanCreateView.as_view(), name='add_loan'),
     path('saving/add/', SavingCreateView.as_view(), name='add_saving'),
@@ -40,6 +45,7 @@ urlpatterns = [
     path('loans/', LoanListView.as_view(), name='loan_list'),
     path('loan/edit/<int:pk>/', LoanUpdateView.as_view(), name='update_loan'),
     path('loan/delete/<int:pk>/', LoanDeleteView.as_view(), name='delete_loan'),
+    path('loan/<int:pk>/schedule/', LoanScheduleView.as_view(), name='loan_schedule'),
     
     path('savings/', SavingListView.as_view(), name='saving_list'),
     path('saving/edit/<int:pk>/', SavingUpdateView.as_view(), name='update_saving'),
@@ -0,0 +1,175 @@
+"""
+Amortization Engine
+
+Vectorized EMI, schedule and outstanding-balance calculations for many
+loans at once. Every function takes parallel arrays (principal, annual
+rate in %, tenure in months) so a whole portfolio is one NumPy pass
+instead of a Python loop of Decimal exponentiation per loan.
+"""
+from datetime import date
+from decimal import Decimal
+from typing import Dict, Iterable, Tuple
+
+import numpy as np
+
+
+def loan_arrays(loans: Iterable) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Convert Loan instances into (principal, rate, tenure) arrays.
+
+    Args:
+        loans: Iterable of objects with principal, rate and tenure_months
+
+    Returns:
+        Tuple of float arrays (principal, annual rate %, tenure months)
+    """
+    loans = list(loans)
+    principal = np.array([float(loan.principal) for loan in loans], dtype=float)
+    rate = np.array([float(loan.rate) for loan in loans], dtype=float)
+    tenure = np.array([int(loan.tenure_months) for loan in loans], dtype=int)
+    return principal, rate, tenure
+
+
+def _normalize(principal, rate, tenure):
+    principal = np.asarray(principal, dtype=float)
+    monthly_rate = np.asarray(rate, dtype=float) / 12 / 100
+    # A zero tenure is treated as repayment in a single instalment
+    tenure = np.maximum(np.asarray(tenure, dtype=int), 1)
+    return principal, monthly_rate, tenure
+
+
+def emis(principal, rate, tenure) -> np.ndarray:
+    """
+    Monthly instalments: EMI = P x R x (1+R)^N / ((1+R)^N - 1).
+
+    Args:
+        principal: Loan amounts
+        rate: Annual interest rates in %
+        tenure: Tenures in months
+
+    Returns:
+        Array of EMIs rounded to 2 decimals (P / N for interest-free loans)
+    """
+    principal, r, n = _normalize(principal, rate, tenure)
+    growth = np.power(1 + r, n)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        emi = np.where(r > 0, principal * r * growth / (growth - 1), principal / n)
+    return np.round(emi, 2)
+
+
+def balances(principal, rate, tenure, payments) -> np.ndarray:
+    """
+    Outstanding principal after a number of EMIs has been paid.
+
+    Uses the closed form B_k = P(1+R)^k - EMI((1+R)^k - 1)/R, so it costs
+    the same for the 1st or the 360th instalment.
+
+    Args:
+        principal: Loan amounts
+        rate: Annual interest rates in %
+        tenure: Tenures in months
+        payments: EMIs paid so far, per loan
+
+    Returns:
+        Array of balances rounded to 2 decimals (0 once the tenure is over)
+    """
+    principal, r, n = _normalize(principal, rate, tenure)
+    emi = emis(principal, rate, tenure)
+    k = np.clip(np.asarray(payments, dtype=int), 0, n)
+    growth = np.power(1 + r, k)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        balance = np.where(r > 0, principal * growth - emi * (growth - 1) / r, principal - emi * k)
+    balance = np.where(k >= n, 0.0, balance)
+    return np.round(np.maximum(balance, 0.0), 2)
+
+
+def payments_made(start_dates, tenure, days) -> np.ndarray:
+    """
+    EMIs paid by each day, for every loan (the first EMI falls one month
+    after the start date), as Loan.payments_made computes them one by one.
+
+    Args:
+        start_dates: Loan start dates
+        tenure: Tenures in months
+        days: Dates to count up to
+
+    Returns:
+        Integer array of shape (loans, days), 0 before the first EMI
+    """
+    start = np.asarray(start_dates, dtype='datetime64[D]')[:, None]
+    days = np.asarray(days, dtype='datetime64[D]')[None, :]
+    start_month, month = start.astype('datetime64[M]'), days.astype('datetime64[M]')
+    months = (month - start_month).astype(int)
+    # The month's EMI is only paid once its day of the month has come
+    months -= (days - month.astype('datetime64[D]')) < (start - start_month.astype('datetime64[D]'))
+    return np.clip(months, 0, np.asarray(tenure, dtype=int)[:, None])
+
+
+def schedules(principal, rate, tenure) -> Dict[str, np.ndarray]:
+    """
+    Month-by-month schedules for every loan.
+
+    Rows are loans and columns are instalments 1..max(tenure); months past
+    a loan's own tenure are zero. The last instalment absorbs the rounding
+    of the EMI so every balance closes at exactly zero.
+
+    Args:
+        principal: Loan amounts
+        rate: Annual interest rates in %
+        tenure: Tenures in months
+
+    Returns:
+        Dictionary of 2D arrays: 'payment', 'interest', 'principal', 'balance'
+    """
+    principal, r, n = _normalize(principal, rate, tenure)
+    emi = emis(principal, rate, tenure)
+    months = np.arange(1, int(n.max(initial=1)) + 1)
+
+    growth = np.power(1 + r[:, None], months[None, :])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        balance = np.where(
+            r[:, None] > 0,
+            principal[:, None] * growth - emi[:, None] * (growth - 1) / r[:, None],
+            principal[:, None] - emi[:, None] * months[None, :],
+        )
+    active = months[None, :] <= n[:, None]
+    balance = np.where(months[None, :] >= n[:, None], 0.0, np.maximum(balance, 0.0))
+
+    opening = np.column_stack([principal, balance[:, :-1]])
+    interest = np.where(active, opening * r[:, None], 0.0)
+    repaid = np.where(active, opening - balance, 0.0)
+
+    return {
+        'payment': np.round(interest + repaid, 2),
+        'interest': np.round(interest, 2),
+        'principal': np.round(repaid, 2),
+        'balance': np.round(balance, 2),
+    }
+
+
+def annotate(loans, as_of: date = None):
+    """
+    Attach emi and balance (as Decimals) to each Loan instance in one pass.
+
+    Args:
+        loans: List of Loan instances
+        as_of: Date for the outstanding balance (defaults to today)
+
+    Returns:
+        The same list, for chaining in views
+    """
+    as_of = as_of or date.today()
+    principal, rate, tenure = loan_arrays(loans)
+    paid = [loan.payments_made(as_of) for loan in loans]
+    loan_emis = emis(principal, rate, tenure)
+    loan_balances = balances(principal, rate, tenure, paid)
+
+    for loan, emi, balance in zip(loans, loan_emis, loan_balances):
+        loan.emi = to_decimal(emi)
+        loan.balance = to_decimal(balance) if as_of >= loan.start_date else Decimal('0')
+    return loans
+
+
+def to_decimal(value) -> Decimal:
+    """Round a NumPy/float amount to paise as a Decimal."""
+    return Decimal(f'{float(value):.2f}')
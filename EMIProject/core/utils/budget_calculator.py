@@ -7,7 +7,7 @@ and analyzing spending patterns.
 from decimal import Decimal
 from typing import Dict, List, Tuple
 from datetime import date
-from django.db.models import Sum
+from django.db.models import Sum, Q
 
 
 def calculate_ideal_budget(monthly_income: float) -> Dict[str, float]:
@@ -45,17 +45,13 @@ def calculate_actual_spending(expenses_qs, savings_qs, investments_qs,
     Returns:
         Dictionary with 'needs', 'wants', 'savings' actual amounts
     """
-    current_month_expenses = expenses_qs.filter(date__gte=start_date)
-    
-    actual_needs = float(
-        current_month_expenses.filter(category__in=needs_categories)
-        .aggregate(Sum('amount'))['amount__sum'] or 0
+    expense_totals = expenses_qs.filter(date__gte=start_date).aggregate(
+        needs=Sum('amount', filter=Q(category__in=needs_categories)),
+        wants=Sum('amount', filter=Q(category__in=wants_categories)),
     )
     
-    actual_wants = float(
-        current_month_expenses.filter(category__in=wants_categories)
-        .aggregate(Sum('amount'))['amount__sum'] or 0
-    )
+    actual_needs = float(expense_totals['needs'] or 0)
+    actual_wants = float(expense_totals['wants'] or 0)
     
     actual_savings = float(
         savings_qs.filter(date__gte=start_date)
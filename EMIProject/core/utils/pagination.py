@@ -0,0 +1,82 @@
+"""
+Keyset Pagination
+
+Seek-method paging for the ledger list views. A page is cut with
+WHERE (date, id) < (cursor) ORDER BY date DESC, id DESC LIMIT n, so the
+100th page costs the same as the first and nothing outside the page is
+loaded, unlike OFFSET or rendering the whole table.
+"""
+from datetime import date
+from typing import Dict, List, Tuple
+
+from django.db.models import Q
+from django.http import Http404
+
+
+class KeysetPaginationMixin:
+    """
+    ListView mixin: newest first on (keyset_field, pk), page_size rows a page.
+
+    ?after=<cursor> shows the page following that row and ?before=<cursor>
+    the page preceding it. Aggregates declared in `totals` are computed in
+    SQL over the whole (unpaged) queryset and added to the context.
+    """
+    keyset_field = 'date'
+    page_size = 50
+    totals: Dict = {}
+
+    def get_queryset(self):
+        return super().get_queryset().order_by(f'-{self.keyset_field}', '-pk')
+
+    def encode_cursor(self, obj) -> str:
+        return f'{getattr(obj, self.keyset_field).isoformat()}.{obj.pk}'
+
+    def decode_cursor(self, cursor: str) -> Tuple[date, int]:
+        try:
+            day, pk = cursor.rsplit('.', 1)
+            return date.fromisoformat(day), int(pk)
+        except ValueError:
+            raise Http404('Invalid page cursor')
+
+    def seek(self, queryset, cursor: str, lookup: str):
+        """Rows strictly before ('lt') or after ('gt') the cursor in (keyset_field, pk) order."""
+        value, pk = self.decode_cursor(cursor)
+        field = self.keyset_field
+        return queryset.filter(
+            Q(**{f'{field}__{lookup}': value}) | Q(**{field: value, f'pk__{lookup}': pk})
+        )
+
+    def paginate(self, queryset) -> Tuple[List, Dict]:
+        """
+        One page of rows plus the cursors around it.
+
+        Fetches page_size + 1 rows so the presence of a further page is
+        known without a COUNT.
+        """
+        after = self.request.GET.get('after')
+        before = self.request.GET.get('before')
+        size = self.page_size
+
+        if before:
+            rows = list(self.seek(queryset, before, 'gt').order_by(self.keyset_field, 'pk')[:size + 1])
+            has_previous, has_next = len(rows) > size, True
+            rows = rows[:size][::-1]
+        else:
+            if after:
+                queryset = self.seek(queryset, after, 'lt')
+            rows = list(queryset[:size + 1])
+            has_previous, has_next = bool(after), len(rows) > size
+            rows = rows[:size]
+
+        return rows, {
+            'next_cursor': self.encode_cursor(rows[-1]) if rows and has_next else None,
+            'previous_cursor': self.encode_cursor(rows[0]) if rows and has_previous else None,
+        }
+
+    def get_context_data(self, **kwargs):
+        rows, cursors = self.paginate(self.object_list)
+        context = super().get_context_data(object_list=rows, **kwargs)
+        context.update(cursors)
+        if self.totals:
+            context.update(self.object_list.order_by().aggregate(**self.totals))
+        return context
@@ -1,24 +1,45 @@
 from django.shortcuts import render, redirect
 from django.views.generic import TemplateView, ListView, CreateView, DetailView, UpdateView, DeleteView
-from django.contrib.auth.mixins import LoginRequiredMixin
+from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.contrib.auth.views import redirect_to_login
 from django.urls import reverse_lazy
 from django.contrib import messages
 from django.views import View
 from django import forms
 from expenses.models import Expense, RecurringExpense
-from django.db.models import Sum
+from django.db.models import Sum, Count, Max
 from .services.experian import ExperianService
-from .services.broker import BrokerService
+from .services.broker import BrokerService, nav_cache
 from .services.market_rates import MarketRatesService
+from .services.dashboard import DashboardService
+from .services.net_worth import NetWorthService
+from .services.recurrence import RecurrenceEngine
+from .services.holdings import HoldingsReconciler
+from .services.sync import import_trades
+from .services import search
+from .services import export
+from .services.snapshots import home_snapshots, analytics_snapshots, chat_responses, get_data_version
+from .utils import amortization
+from .utils.pagination import KeysetPaginationMixin
+from .db_routers import read_replica
 from datetime import date, timedelta
-from .models import Loan, Saving, Investment, RecurringWealth, Document, UserProfile, Policy
+from .models import Loan, Saving, Investment, RecurringWealth, Document, UserProfile, Policy, SyncStatus
 from decimal import Decimal
-from django.http import JsonResponse
+from django.http import Http404, JsonResponse, StreamingHttpResponse
 import json
 from .chatbot import ChatBotService
 
-class ChatBotView(LoginRequiredMixin, View):
-    def post(self, request, *args, **kwargs):
+class ChatBotView(View):
+    """
+    Async so a worker is not held while the LLM providers answer (under ASGI).
+    LoginRequiredMixin reads request.user synchronously, so the login check
+    is done here with request.auser().
+    """
+
+    async def post(self, request, *args, **kwargs):
+        user = await request.auser()
+        if not user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
         try:
             data = json.loads(request.body)
             message = data.get('message', '')
@@ -26,13 +47,46 @@ class ChatBotView(LoginRequiredMixin, View):
                 return JsonResponse({'response': 'Please say something!'}, status=400)
             
             bot = ChatBotService()
-            response_text = bot.process_message(request.user, message)
+            response_text = await bot.aprocess_message(user, message)
             
             return JsonResponse({'response': response_text})
         except Exception as e:
             return JsonResponse({'response': 'Error processing message.'}, status=500)
 
+class ChatStreamView(View):
+    """
+    The chatbot over Server-Sent Events: provider tokens are relayed as they
+    arrive ("token" events), local and cached answers come as one event, and
+    a final "done" event closes the stream. Under ASGI a client disconnect
+    cancels the stream and with it the upstream provider request.
+    """
+
+    async def post(self, request, *args, **kwargs):
+        user = await request.auser()
+        if not user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        try:
+            message = json.loads(request.body).get('message', '')
+        except ValueError:
+            message = ''
+        if not message:
+            return JsonResponse({'response': 'Please say something!'}, status=400)
+
+        response = StreamingHttpResponse(self.events(user, message), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'  # don't let nginx buffer the stream
+        return response
+
+    async def events(self, user, message):
+        try:
+            async for text in ChatBotService().astream_message(user, message):
+                yield f"event: token\ndata: {json.dumps({'text': text})}\n\n"
+        except Exception:
+            yield f"event: error\ndata: {json.dumps({'text': 'Error processing message.'})}\n\n"
+        yield "event: done\ndata: {}\n\n"
+
 from .services.whatsapp import WhatsAppService
+from .services.digest import DigestService
 from django.contrib import messages
 
 class WhatsAppReportView(LoginRequiredMixin, View):
@@ -41,36 +95,9 @@ class WhatsAppReportView(LoginRequiredMixin, View):
             messages.error(request, "Please add your phone number in Profile to receive WhatsApp reports.")
             return redirect('home')
             
-        # Aggregate Data for Report
+        # Same figures as the daily digest (core/services/digest.py)
         user = request.user
-        
-        # 1. Net Worth
-        total_invested = Investment.get_total_current_value()
-        total_savings = Saving.objects.aggregate(Sum('amount'))['amount__sum'] or Decimal('0')
-        net_worth = total_invested + total_savings
-        
-        # 2. Monthly Expenses
-        today = date.today()
-        current_month_expenses = Expense.objects.filter(
-            date__year=today.year,
-            date__month=today.month
-        ).aggregate(Sum('amount'))['amount__sum'] or Decimal('0')
-        
-        # 3. Recent Transactions
-        recents = Expense.objects.order_by('-date')[:5]
-        
-        # 4. Budget Status (Simple check)
-        income = request.user.profile.monthly_income
-        budget_status = 'SAFE'
-        if income > 0 and current_month_expenses > (income * Decimal('0.8')): # 80% warning
-            budget_status = 'DANGER'
-            
-        context = {
-            'net_worth': net_worth,
-            'expenses': current_month_expenses,
-            'recent': recents,
-            'budget_status': budget_status
-        }
+        context = DigestService.user_context(DigestService(channel='whatsapp').shared_context(), user.profile.monthly_income)
         
         # Send Message
         service = WhatsAppService()
@@ -89,8 +116,10 @@ class WhatsAppReportView(LoginRequiredMixin, View):
 class WhatsAppTestView(LoginRequiredMixin, View):
     def get(self, request):
         service = WhatsAppService()
-        # Test message to specific number as requested
-        target = "+919130044796"
+        target = getattr(request.user, 'profile', None) and request.user.profile.phone_number
+        if not target:
+            messages.error(request, "Please add your phone number in Profile to receive WhatsApp alerts.")
+            return redirect('home')
         msg = "🔔 FinTrack Test Alert: This is a test message sent via pywhatkit!"
         
         success, response = service.send_message(target, msg)
@@ -149,589 +178,118 @@ class DocumentCreateView(LoginRequiredMixin, CreateView):
 
 class SearchView(LoginRequiredMixin, TemplateView):
     template_name = 'core/search_results.html'
+    query_budget = 8
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         query = self.request.GET.get('q', '')
         
         if query:
-            from django.db.models import Q
-            # Search Expenses
-            context['expenses'] = Expense.objects.filter(
-                Q(title__icontains=query) | 
-                Q(category__icontains=query)
-            ).order_by('-date')[:10]
-            
-            # Search Documents
-            context['documents'] = Document.objects.filter(
-                Q(title__icontains=query)
-            ).order_by('-uploaded_at')[:10]
-            
+            # Ranked full-text matches (core/services/search.py)
+            results = search.search(query, limit=10)
+            context['expenses'] = results.get('expense', [])
+            context['documents'] = results.get('document', [])
+            context['other_results'] = [
+                (label, results[kind]) for kind, label in [
+                    ('loan', 'Loans'), ('investment', 'Investments'), ('saving', 'Savings'), ('policy', 'Policies'),
+                ] if results.get(kind)
+            ]
             context['query'] = query
         
         return context
 
+class CacheStatsView(LoginRequiredMixin, UserPassesTestMixin, View):
+    """Hit/miss counters for the dashboard snapshot, NAV and chat response caches (staff only)."""
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get(self, request):
+        return JsonResponse({
+            'data_version': get_data_version(),
+            'home': home_snapshots.stats(),
+            'analytics': analytics_snapshots.stats(),
+            'nav': nav_cache.stats(),
+            'chat': chat_responses.stats(),
+        })
+
+class NetWorthTrendView(LoginRequiredMixin, View):
+    """Net worth history for the dashboard chart's range selector (1m to 10y)."""
+    query_budget = 7
+
+    def get(self, request):
+        range_key = request.GET.get('range', '6m')
+        if range_key not in NetWorthService.RANGES:
+            return JsonResponse({'error': f"Unknown range '{range_key}'."}, status=400)
+        # Days the scheduled snapshot run has not stored yet (one query when there are none)
+        NetWorthService().fill_snapshots()
+        with read_replica():
+            return JsonResponse(NetWorthService().get_trend(range_key))
+
+class LedgerExportForm(forms.Form):
+    start = forms.DateField(required=False)
+    end = forms.DateField(required=False)
+    category = forms.CharField(required=False)
+
+    def __init__(self, *args, categories=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.categories = categories
+
+    def clean_category(self):
+        category = self.cleaned_data['category']
+        if category and self.categories is None:
+            raise forms.ValidationError("This ledger has no categories.")
+        if category and category not in self.categories:
+            raise forms.ValidationError(f"Unknown category '{category}'.")
+        return category
+
+    def clean(self):
+        cleaned_data = super().clean()
+        start, end = cleaned_data.get('start'), cleaned_data.get('end')
+        if start and end and start > end:
+            raise forms.ValidationError("The start date is after the end date.")
+        return cleaned_data
+
+class LedgerExportView(LoginRequiredMixin, View):
+    """
+    A whole ledger (expenses, savings, investments or loans) as CSV or NDJSON,
+    optionally limited to ?start=&end= dates and a ?category=. The file is
+    streamed as it is read (core/services/export.py).
+    """
+
+    def get(self, request, ledger, fmt):
+        if ledger not in export.LEDGERS or fmt not in export.FORMATS:
+            raise Http404('Unknown export')
+        form = LedgerExportForm(request.GET, categories=export.category_choices(ledger))
+        if not form.is_valid():
+            return JsonResponse({'errors': form.errors}, status=400)
+
+        response = StreamingHttpResponse(export.export(ledger, fmt, **form.cleaned_data), content_type=export.FORMATS[fmt])
+        response['Content-Disposition'] = f'attachment; filename="{ledger}-{date.today().isoformat()}.{fmt}"'
+        response['X-Accel-Buffering'] = 'no'  # don't let nginx buffer the stream
+        return response
+
 class HomeView(LoginRequiredMixin, TemplateView):
     template_name = 'core/home_v2.html'
+    query_budget = 25
 
 
     def get_context_data(self, **kwargs):
-        # --- Passive Automation: Sync data on load ---
-        self._passive_sync()
-        self._process_recurring_wealth()
-        self._process_recurring_expenses()
-        
         context = super().get_context_data(**kwargs)
-        # Summary Stats
-        total_expenses = Expense.objects.aggregate(Sum('amount'))['amount__sum'] or 0
-        total_savings = Saving.objects.aggregate(Sum('amount'))['amount__sum'] or 0
-        total_investments = Investment.get_total_invested()
-        total_policies = Policy.get_total_sum_assured()
-        
-        # Calculate real EMI from Loan objects
-        real_emi_total = Loan.get_total_emi()
-        
-        # Get User Profile for manual overrides (if needed, or use as fallback)
-        profile, _ = UserProfile.objects.get_or_create(user=self.request.user)
-
-        context['total_income'] = profile.monthly_income
-        context['raw_total_income'] = profile.monthly_income
-        
-        context['total_expenses'] = total_expenses
-        context['raw_total_expenses'] = total_expenses
-        
-        context['total_savings'] = total_savings
-        
-        # Investments
-        context['total_investments'] = total_investments
-        
-        # Policies
-        context['total_policies'] = total_policies
-        
-        # EMI
-        context['total_monthly_emi'] = real_emi_total
-        context['raw_total_emi'] = context['total_monthly_emi']
-        
-        # User Profile settings (Manual Overrides)
-        try:
-            user_profile = UserProfile.objects.get(user=self.request.user)
-            total_income = user_profile.monthly_income
-            manual_investments = user_profile.manual_investment_total
-            manual_policies = user_profile.manual_policy_total
-            manual_emi = user_profile.manual_emi_total
-        except UserProfile.DoesNotExist:
-            total_income = 0
-            user_profile = None # Ensure user_profile is defined even if not found
-            manual_investments = 0
-            manual_policies = 0
-            manual_emi = 0
-
-        active_loans = Loan.objects.count()
-        
-        # Calculate total EMI roughly (sum of all loan EMIs)
-        loans = Loan.objects.all()
-        total_monthly_emi = sum([loan.calculate_emi() for loan in loans])
-        
-        # Total income from profile
-        total_income = user_profile.monthly_income if user_profile else 0
-        
-        # Calculate Ideal Coverage benchmark (Open Source actuarial data)
-        rates_service = MarketRatesService()
-        market_insurance = rates_service.get_insurance_benchmarks()
-        
-        if total_income > 0:
-            benchmark = market_insurance['term_insurance']
-            ideal_coverage = float(total_income) * 12 * benchmark['ideal_coverage_multiplier']
-        else:
-            ideal_coverage = 10000000 # 1 Cr default
-            
-        # Logic: Always show actual calculated values for consistency
-        # User requested sync with respective sections
-        display_investments = total_investments
-        display_emi = total_monthly_emi
-        
-        # Auto-benchmark Policies if no manual override is provided
-        display_policies = manual_policies if manual_policies > 0 else ideal_coverage
-        
-        context['total_expenses'] = total_expenses
-        context['active_loans'] = active_loans
-        context['total_monthly_emi'] = display_emi
-        context['total_savings'] = total_savings
-        context['total_investments'] = display_investments
-        context['total_policies'] = display_policies
-        context['total_income'] = total_income
-        
-        # Raw data for forms/charts
-        context['raw_total_income'] = float(total_income)
-        context['raw_manual_investments'] = float(manual_investments)
-        context['raw_manual_policies'] = float(manual_policies)
-        context['raw_manual_emi'] = float(manual_emi)
-        context['ideal_insurance_coverage'] = ideal_coverage
-        
-        context['raw_total_expenses'] = float(total_expenses)
-        context['raw_total_emi'] = float(display_emi)
-        context['raw_total_savings'] = float(total_savings)
-        context['raw_total_investments'] = float(display_investments)
-        
-        # Recent activity
-        context['recent_expenses'] = Expense.objects.order_by('-date')[:5]
-        
-        # --- Market Insights (Open Source Data) ---
-        context['market_loans'] = rates_service.get_loan_benchmarks()
-        context['market_insurance'] = market_insurance
-        
-        context['recent_savings'] = Saving.objects.order_by('-date')[:3]
-        context['recent_investments'] = Investment.objects.order_by('-date')[:3]
-        
-        # Recurring Expenses
-        context['recurring_expenses'] = RecurringExpense.objects.filter(is_active=True).order_by('start_date')
-
-        # Chart Data: Expenses by Category
-        category_stats = Expense.objects.values('category').annotate(total=Sum('amount')).order_by('-total')
-        
-        # Helper to get display name from category code
-        category_dict = dict(Expense.CATEGORY_CHOICES)
-        
-        chart_labels = []
-        chart_data = []
-        
-        for stat in category_stats:
-            cat_code = stat['category']
-            chart_labels.append(category_dict.get(cat_code, cat_code))
-            chart_data.append(float(stat['total']))
-            
-        context['chart_labels'] = chart_labels
-        context['chart_data'] = chart_data
-        
-        # Chart Data: Portfolio (Savings vs Investments)
-        portfolio_labels = ['Savings', 'Investments']
-        portfolio_data = [float(total_savings), float(total_investments)]
-        
-        context['portfolio_labels'] = portfolio_labels
-        context['portfolio_data'] = portfolio_data
-        
-        # --- Budget Alerts Logic ---
-        budget_alerts = []
-        
-        # Calculate Category Totals for Alerts
-        needs_total = 0
-        wants_total = 0
-        
-        # Define categories mapping (Ensure these match your Expense model choices)
-        NEEDS_CATEGORIES = ['RENT', 'EMI', 'BILLS', 'GROCERIES', 'FUEL', 'INSURANCE', 'HEALTH', 'EDUCATION']
-        WANTS_CATEGORIES = ['FOOD', 'SHOPPING', 'TRAVEL', 'ENTERTAINMENT', 'SUBSCRIPTION', 'GIFT']
-        
-        for stat in category_stats:
-            cat = stat['category']
-            amt = float(stat['total'])
-            if cat in NEEDS_CATEGORIES:
-                needs_total += amt
-            elif cat in WANTS_CATEGORIES:
-                wants_total += amt
-                
-        # Thresholds
-        income_float = float(total_income)
-        needs_limit = income_float * 0.50
-        wants_limit = income_float * 0.30
-        
-        if income_float > 0:
-            if needs_total > needs_limit:
-                excess = needs_total - needs_limit
-                budget_alerts.append({
-                    'type': 'critical',
-                    'title': 'Needs Budget Exceeded',
-                    'message': f'You have spent ₹{needs_total:,.0f} on Needs, exceeding the 50% limit (₹{needs_limit:,.0f}) by ₹{excess:,.0f}.'
-                })
-            
-            if wants_total > wants_limit:
-                excess = wants_total - wants_limit
-                budget_alerts.append({
-                    'type': 'warning',
-                    'title': 'Wants Budget Exceeded',
-                    'message': f'You have spent ₹{wants_total:,.0f} on Wants, exceeding the 30% limit (₹{wants_limit:,.0f}) by ₹{excess:,.0f}.'
-                })
-                
-        context['budget_alerts'] = budget_alerts
-        
-        # JSON versions for lists
-        context['recent_savings_json'] = [
-            {'name': s.name, 'amount': str(s.amount)} 
-            for s in context['recent_savings']
-        ]
-        context['recent_investments_json'] = [
-            {'name': i.name, 'amount': str(i.amount), 'category_display': i.get_category_display()} 
-            for i in context['recent_investments']
-        ]
-        context['recent_expenses_json'] = [
-            {'title': e.title, 'amount': str(e.amount), 'category_display': e.get_category_display(), 'date': e.date.isoformat()} 
-            for e in context['recent_expenses']
-        ]
-
-        # --- 50-30-20 Rule Calculation ---
-        # --- 50-30-20 Rule Calculation ---
-        # UserProfile is already imported from core.models
-        from core.utils.budget_calculator import (
-            calculate_ideal_budget,
-            calculate_actual_spending,
-            get_budget_alerts,
-            calculate_budget_percentages
-        )
-        
-        user_profile, created = UserProfile.objects.get_or_create(user=self.request.user)
-        monthly_income = float(user_profile.monthly_income) if user_profile else 0
-        
-        # Categorization mapping
-        needs_cats = ['BIL', 'TRA', 'EMI', 'FOO']
-        wants_cats = ['ENT', 'OTH']
-        
-        # Current month's data
-        first_day = date.today().replace(day=1)
-        
-        # Calculate ideal and actual budgets
-        ideal = calculate_ideal_budget(monthly_income)
-        actual = calculate_actual_spending(
-            Expense.objects,
-            Saving.objects,
-            Investment.objects,
-            needs_cats,
-            wants_cats,
-            first_day
-        )
-        
-        # Generate alerts
-        alerts = get_budget_alerts(actual, ideal) if monthly_income > 0 else []
-        
-        # Calculate percentages
-        percentages = calculate_budget_percentages(actual, monthly_income)
-
-        context['budget_analysis'] = {
-            'income': monthly_income,
-            'needs': actual['needs'],
-            'wants': actual['wants'],
-            'savings': actual['savings'],
-            'ideal': ideal,
-            'percentages': percentages,
-            'alerts': alerts
-        }
-        
-        # --- Historical Trends (Last 6 Months) ---
-        context['budget_trends'] = self._get_monthly_trends(monthly_income, needs_cats, wants_cats)
-        
-        # Groww-style Charts
-        context['net_worth_trend'] = self._get_net_worth_trend()
-        context['radar_chart'] = self._get_expense_radar()
-        context['upcoming_reminders'] = self._get_upcoming_reminders()
-        context['recent_documents'] = Document.objects.order_by('-uploaded_at')[:3]
-        
+        context.update(home_snapshots.get_or_build(self.request.user, self._build_dashboard))
+        # Read on every visit: a failing source must show even while the snapshot is fresh
+        context['sync_statuses'] = SyncStatus.for_all_sources()
         return context
-    
-    def _get_monthly_trends(self, monthly_income: float, needs_cats: list, wants_cats: list) -> dict:
-        """Calculate budget performance for last 6 months"""
-        from dateutil.relativedelta import relativedelta
-        from core.utils.budget_calculator import calculate_actual_spending, calculate_ideal_budget
-        
-        trends = {
-            'months': [],
-            'needs': [],
-            'wants': [],
-            'savings': [],
-            'ideal_needs': [],
-            'ideal_wants': [],
-            'ideal_savings': []
-        }
-        
-        today = date.today()
-        ideal = calculate_ideal_budget(monthly_income)
-        
-        for i in range(5, -1, -1):  # Last 6 months
-            month_date = today - relativedelta(months=i)
-            first_day = month_date.replace(day=1)
-            
-            # Calculate last day of month
-            if month_date.month == 12:
-                last_day = month_date.replace(day=31)
-            else:
-                next_month = month_date.replace(day=1) + relativedelta(months=1)
-                last_day = next_month - relativedelta(days=1)
-            
-            # Get actual spending for this month
-            actual = calculate_actual_spending(
-                Expense.objects.filter(date__gte=first_day, date__lte=last_day),
-                Saving.objects.filter(date__gte=first_day, date__lte=last_day),
-                Investment.objects.filter(date__gte=first_day, date__lte=last_day),
-                needs_cats,
-                wants_cats,
-                first_day
-            )
-            
-            trends['months'].append(month_date.strftime('%b %Y'))
-            trends['needs'].append(actual['needs'])
-            trends['wants'].append(actual['wants'])
-            trends['savings'].append(actual['savings'])
-            trends['ideal_needs'].append(ideal['needs'])
-            trends['ideal_wants'].append(ideal['wants'])
-            trends['ideal_savings'].append(ideal['savings'])
-        
-        return trends
-
-    def _passive_sync(self):
-        """
-        Silently syncs data from Experian and Broker to keep the dashboard automated.
-        Also updates valuations based on live market prices.
-        """
-        mr_service = MarketRatesService()
-        
-        # 1. Sync Loans (Experian) & Update Market Benchmarks
-        try:
-            exp_service = ExperianService()
-            loan_data = exp_service.fetch_user_trades()
-            market_benchmarks = mr_service.get_loan_benchmarks()
-            
-            # Sync New Loans
-            for trade in loan_data.get('trades', []):
-                ext_id = trade.get('tradeId')
-                if not Loan.objects.filter(external_id=ext_id).exists():
-                    Loan.objects.create(
-                        name=f"{trade.get('accountType')} ({trade.get('accountNumber')[-4:]})",
-                        principal=trade.get('originalAmount'),
-                        rate=trade.get('interestRate'),
-                        tenure_months=trade.get('tenureMonths'),
-                        start_date=trade.get('openDate'),
-                        external_id=ext_id
-                    )
-            
-            # Update Benchmark-linked Rates
-            for loan in Loan.objects.exclude(benchmark_type='NONE'):
-                if loan.benchmark_type == 'HOME' and 'home_loan' in market_benchmarks:
-                    loan.rate = Decimal(str(market_benchmarks['home_loan']['rate']))
-                    loan.save()
-                elif loan.benchmark_type == 'PERS' and 'personal_loan' in market_benchmarks:
-                    loan.rate = Decimal(str(market_benchmarks['personal_loan']['rate']))
-                    loan.save()
-        except Exception:
-            pass 
 
-        # 2. Sync Investments (Broker) & Update Valuations
-        try:
-            broker_service = BrokerService()
-            inv_data = broker_service.fetch_portfolio()
-            for holding in inv_data.get('holdings', []):
-                sym = holding.get('symbol')
-                ext_id = holding.get('isin') or sym
-                
-                # Check for existing investment
-                existing = Investment.objects.filter(external_id=ext_id).first()
-                if existing:
-                    # Update valuation: current_value = Quantity * Current Price
-                    curr_price = Decimal(str(holding.get('current_price', 0)))
-                    existing.current_value = existing.quantity * curr_price
-                    existing.save()
-                else:
-                    # Create new investment
-                    # For new ones, we assume standard unit for simplicity unless broker data provides it
-                    inv_amt = Decimal(str(holding.get('invested_amount')))
-                    Investment.objects.create(
-                        name=holding.get('name'),
-                        amount=inv_amt,
-                        current_value=inv_amt, # Initial value same as invested
-                        quantity=Decimal(str(holding.get('quantity', 1))),
-                        category=holding.get('type'),
-                        date=holding.get('purchase_date'),
-                        external_id=ext_id
-                    )
-        except Exception:
-            pass
-
-    def _process_recurring_expenses(self):
-        """
-        Checks for due Recurring Expenses/SIPs and creates them automatically.
-        Uses 'payment_date' (1-31) to determine due day.
-        """
-        from expenses.models import RecurringExpense, Expense
-        recurring_items = RecurringExpense.objects.filter(is_active=True)
-        today = date.today()
-        
-        for item in recurring_items:
-            # Check if processed this month
-            if item.last_processed_date and item.last_processed_date.month == today.month and item.last_processed_date.year == today.year:
-                continue
-
-            # Check if today is the payment date (or past it if we missed it this month)
-            # We simple check if today.day >= payment_date
-            # Real logic might be more complex (handle Feb 30 etc), but simple >= implies we execute once per month
-            
-            should_run = False
-            
-            # Simple Logic: Run if we haven't run this month AND today >= payment_date
-            if today.day >= item.payment_date:
-                should_run = True
-            
-            if should_run:
-                if item.recurrence_type == 'SIP':
-                    # Create Investment
-                    Investment.objects.create(
-                        name=f"{item.title} (Auto SIP)",
-                        amount=item.amount,
-                        category='OTH', # Default or map if added to model
-                        date=today,
-                        external_id=f"SIP-{item.id}-{today.isoformat()}"
-                    )
-                else:
-                    # Create Expense
-                    Expense.objects.create(
-                        title=f"{item.title} (Auto)",
-                        amount=item.amount,
-                        category=item.category or 'OTH',
-                        date=today
-                    )
-                
-                # Update last processed
-                item.last_processed_date = today
-                item.save()
-
-    def _get_net_worth_trend(self):
-        """
-        Calculates Net Worth (Savings + Invest - Loans) for the last 6 months.
-        Note: Simplification for demo. In a real app, we'd need historical snapshots.
-        Here we simulate trend by random fluctuation around current value for demo purposes.
-        """
-        from datetime import timedelta
-        import random
-        
-        current_savings = Saving.objects.aggregate(Sum('amount'))['amount__sum'] or 0
-        current_invest = Investment.objects.aggregate(Sum('amount'))['amount__sum'] or 0
-        current_loans = Loan.objects.aggregate(Sum('principal'))['principal__sum'] or 0
-        
-        current_net_worth = float(current_savings + current_invest - current_loans)
-        
-        labels = []
-        data = []
-        today = date.today()
-        
-        for i in range(5, -1, -1):
-            month_date = today - timedelta(days=i*30)
-            labels.append(month_date.strftime('%b'))
-            
-            # Simulate historical data (creating a realistic growth curve)
-            # Factor: slightly less wealth in the past
-            factor = 1.0 - (i * 0.05) + (random.uniform(-0.02, 0.02))
-            value = max(0, current_net_worth * factor)
-            data.append(round(value, 2))
-            
-        return {'labels': labels, 'data': data}
-
-    def _get_expense_radar(self):
-        """
-        Prepares data for Polar Area chart (Spending Radar).
-        """
-        category_stats = Expense.objects.values('category').annotate(total=Sum('amount')).order_by('-total')
-        category_dict = dict(Expense.CATEGORY_CHOICES)
-        
-        labels = []
-        data = []
-        
-        # Limit to top 5 categories for Radar readability
-        for stat in category_stats[:5]:
-            labels.append(category_dict.get(stat['category']))
-            data.append(float(stat['total']))
-            
-        return {'labels': labels, 'data': data}
-
-    def _get_upcoming_reminders(self):
-        """
-        Fetches upcoming payments from Loans and Recurring Expenses.
-        Returns a sorted list of dicts: {title, amount, date, type, days_left}
-        """
-        reminders = []
-        today = date.today()
-        
-        # 1. Loans (Assume EMI due on 5th of every month for simple demo, or use a field)
-        # For this demo, let's assume EMI is due 30 days from last payment or creation.
-        # We'll just generate a dummy "Next Date" based on today for active loans to show logic.
-        active_loans = Loan.objects.all() # In real app, filter active=True
-        for loan in active_loans:
-            # Logic: Due date is assumed to be 1st of next month for simplicity
-            next_month = today.replace(day=1) + timedelta(days=32)
-            due_date = next_month.replace(day=5) # Bills usually due on 5th
-            
-            days_left = (due_date - today).days
-            if 0 <= days_left <= 30:
-                reminders.append({
-                    'title': f"{loan.name} EMI",
-                    'amount': loan.calculate_emi(),
-                    'date': due_date,
-                    'type': 'loan',
-                    'days_left': days_left
-                })
-
-        # 2. Recurring Expenses
-        from expenses.models import RecurringExpense
-        recurring = RecurringExpense.objects.filter(is_active=True)
-        for item in recurring:
-            last_date = item.last_processed_date or item.start_date
-            # Simple frequency logic
-            delta = timedelta(days=30) if item.frequency == 'MON' else timedelta(days=7)
-            next_due = last_date + delta
-            
-            # If next_due is in past (missed), move it to today or future
-            if next_due < today:
-                next_due = today 
-            
-            days_left = (next_due - today).days
-            
-            if 0 <= days_left <= 30:
-                reminders.append({
-                    'title': item.title,
-                    'amount': item.amount,
-                    'date': next_due,
-                    'type': 'expense',
-                    'days_left': days_left
-                })
-        
-        # Sort by nearest date
-        reminders.sort(key=lambda x: x['days_left'])
-        return reminders[:5] # Top 5
-
-    def _process_recurring_wealth(self):
-        """
-        Checks for due SIPs/Recurring Savings and creates items automatically.
-        """
-        recurring_items = RecurringWealth.objects.filter(active=True)
-        today = date.today()
-        
-        for item in recurring_items:
-            # Determine reference date
-            ref_date = item.last_processed_date or item.start_date
-            
-            # Simple frequency logic: Monthly (30 days) or Weekly (7 days)
-            days_diff = (today - ref_date).days
-            due = False
-            
-            if item.frequency == 'MON' and days_diff >= 30:
-                due = True
-            elif item.frequency == 'WEK' and days_diff >= 7:
-                due = True
-            
-            if due:
-                # Create the entry
-                if item.type == 'SAV':
-                    Saving.objects.create(
-                        name=f"{item.name} (Auto)",
-                        amount=item.amount,
-                        date=today
-                    )
-                else:
-                    Investment.objects.create(
-                        name=f"{item.name} (Auto SIP)",
-                        amount=item.amount,
-                        category=item.category or 'OTH',
-                        date=today,
-                        external_id=f"RECUR-{item.id}-{today.isoformat()}"
-                    )
-                
-                # Update last processed
-                item.last_processed_date = today
-                item.save()
+    def _build_dashboard(self):
+        # --- Passive Automation: Recurring items on load ---
+        # Only needed on a cache miss: any new/changed recurring item bumps the
+        # data version and the snapshot is rebuilt at least once per day.
+        # `manage.py process_recurring` books the same occurrences on a schedule.
+        # External syncs (Experian/Broker) run in the background via `manage.py sync_external`
+        RecurrenceEngine().run()
+        with read_replica():
+            return DashboardService(self.request.user).get_context_data()
 
 class EMICalculatorView(TemplateView):
     template_name = 'core/emi_calculator_v2.html'
@@ -863,6 +421,11 @@ class InvestmentUpdateView(LoginRequiredMixin, UpdateView):
     template_name = 'core/investment_form.html'
     success_url = reverse_lazy('investment_list')
 
+    def form_valid(self, form):
+        # Protect hand-edited values from being overwritten by the next broker sync
+        form.instance.user_edited = True
+        return super().form_valid(form)
+
 class InvestmentDeleteView(LoginRequiredMixin, DeleteView):
     model = Investment
     template_name = 'core/confirm_delete.html'
@@ -893,52 +456,20 @@ class InvestmentSyncView(LoginRequiredMixin, View):
         service = BrokerService()
         try:
             data = service.fetch_portfolio()
-            holdings = data.get('holdings', [])
-            
-            # CLEAR OLD DATA to ensure clean state and correct totals
-            Investment.objects.all().delete()
-            
-            count = 0
-            updated = 0
-            
-            for holding in holdings:
-                # Use ISIN or Symbol as external ID
-                external_id = holding.get('isin') or holding.get('symbol')
-                
-                # Check for existing investment
-                existing = Investment.objects.filter(external_id=external_id).first()
-                
-                if existing:
-                    # Update valuation AND invested amount (to correct old data)
-                    curr_price = Decimal(str(holding.get('current_price', 0)))
-                    existing.current_value = existing.quantity * curr_price
-                    
-                    # Update amount if provided in sync data to ensure "positive" resets
-                    if holding.get('invested_amount'):
-                        existing.amount = Decimal(str(holding.get('invested_amount')))
-                        
-                    existing.save()
-                    updated += 1
-                else:
-                    inv_amt = Decimal(str(holding.get('invested_amount')))
-                    curr_price = Decimal(str(holding.get('current_price', 0))) # Ensure we get current price
-                    quantity = Decimal(str(holding.get('quantity', 1)))
-                    
-                    Investment.objects.create(
-                        name=holding.get('name'),
-                        amount=inv_amt,
-                        current_value=quantity * curr_price, # Set initial current value
-                        quantity=quantity,
-                        category=holding.get('type'),
-                        date=holding.get('purchase_date'),
-                        external_id=external_id
-                    )
-                    count += 1
-            
-            if count > 0 or updated > 0:
-                messages.success(request, f"Synced: {count} new, {updated} updated.")
-            else:
+            result = HoldingsReconciler().reconcile(data.get('holdings', []))
+
+            if result['created'] or result['updated'] or result['removed']:
+                messages.success(
+                    request,
+                    f"Synced: {result['created']} new, {result['updated']} updated, {result['removed']} removed."
+                )
+            elif not result['skipped']:
                 messages.info(request, "Portfolio is up to date.")
+            if result['skipped']:
+                messages.warning(
+                    request,
+                    f"Skipped {result['skipped']} holdings whose ID is already used by a manual or recurring investment."
+                )
                 
         except Exception as e:
             messages.error(request, f"Failed to sync with Broker: {str(e)}")
@@ -946,28 +477,15 @@ class InvestmentSyncView(LoginRequiredMixin, View):
         return redirect('investment_list')
 
 class ExperianSyncView(LoginRequiredMixin, View):
+    query_budget = 9
+
     def post(self, request):
         service = ExperianService()
         try:
             # In a real app, you might pass user-specific data here
             data = service.fetch_user_trades()
             
-            trades = data.get('trades', [])
-            count = 0
-            
-            for trade in trades:
-                # Check if loan already exists
-                external_id = trade.get('tradeId')
-                if not Loan.objects.filter(external_id=external_id).exists():
-                    Loan.objects.create(
-                        name=f"{trade.get('accountType')} ({trade.get('accountNumber')[-4:]})",
-                        principal=trade.get('originalAmount'),
-                        rate=trade.get('interestRate'),
-                        tenure_months=trade.get('tenureMonths'),
-                        start_date=trade.get('openDate'),
-                        external_id=external_id
-                    )
-                    count += 1
+            count = len(import_trades(data.get('trades', [])))
             
             if count > 0:
                 messages.success(request, f"Successfully synced {count} loans from Experian.")
@@ -980,51 +498,45 @@ class ExperianSyncView(LoginRequiredMixin, View):
         return redirect('home')
 class AnalyticsView(LoginRequiredMixin, TemplateView):
     template_name = 'core/analytics.html'
+    query_budget = 12
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        from django.db.models import Sum
-        from datetime import date, timedelta
-        import calendar
+        with read_replica():
+            context.update(analytics_snapshots.get_or_build(self.request.user, self._build_analytics))
+        return context
+
+    def _build_analytics(self):
+        from datetime import date
         from dateutil.relativedelta import relativedelta
+        from .services import rollups
+
+        context = {}
+
+        # Last 6 months, oldest first; all monthly figures come from the rollups
+        today = date.today()
+        months = [(today - relativedelta(months=i)).replace(day=1) for i in range(5, -1, -1)]
+        month_table = rollups.month_table(months[0], months[-1], kinds=['EXP', 'INV'])
         
         # --- 1. Expense Breakdown (Pie/Doughnut) ---
-        expenses = Expense.objects.all()
-        category_data = expenses.values('category').annotate(total=Sum('amount')).order_by('-total')
+        category_data = sorted(
+            ((category, total) for (_, category), (total, _) in rollups.kind_totals(kinds=['EXP']).items()),
+            key=lambda item: item[1], reverse=True
+        )
         context['pie_chart'] = {
-            'labels': [dict(Expense.CATEGORY_CHOICES).get(item['category'], item['category']) for item in category_data],
-            'data': [float(item['total']) for item in category_data]
+            'labels': [dict(Expense.CATEGORY_CHOICES).get(category, category) for category, _ in category_data],
+            'data': [total for _, total in category_data]
         }
 
         # --- 2. Monthly Trends (Bar Chart) ---
-        # Last 6 months
-        today = date.today()
-        labels = []
-        income_data = []
-        expense_data = []
-        
         user_profile = self.request.user.userprofile
         # Fallback income if 0
         monthly_income = float(user_profile.monthly_income) if user_profile.monthly_income > 0 else 50000 
 
-        for i in range(5, -1, -1):
-            date_cursor = today - relativedelta(months=i)
-            month_start = date_cursor.replace(day=1)
-            # End of month
-            _, last_day = calendar.monthrange(month_start.year, month_start.month)
-            month_end = month_start.replace(day=last_day)
-            
-            labels.append(month_start.strftime('%b'))
-            
-            # Sum expenses for this month
-            month_exp = Expense.objects.filter(date__gte=month_start, date__lte=month_end).aggregate(Sum('amount'))['amount__sum'] or 0
-            expense_data.append(float(month_exp))
-            income_data.append(monthly_income) # Using fixed income for now
-
         context['bar_chart'] = {
-            'labels': labels,
-            'income': income_data,
-            'expenses': expense_data
+            'labels': [month.strftime('%b') for month in months],
+            'income': [monthly_income for _ in months], # Using fixed income for now
+            'expenses': [rollups.month_sum(month_table, month, 'EXP')[0] for month in months]
         }
 
         # --- 3. EMI/Loan Distribution (Doughnut) ---
@@ -1035,76 +547,81 @@ class AnalyticsView(LoginRequiredMixin, TemplateView):
         }
 
         # --- 4. Portfolio Growth (Line Chart) ---
-        # Cumulative invested amount over last 6 months
-        stock_labels = []
+        # Cumulative invested amount over last 6 months, starting from the
+        # total invested BEFORE the window
+        running_total = sum(total for total, _ in rollups.kind_totals(kinds=['INV'], before=months[0]).values())
         stock_data = []
-        
-        # Determine total invested BEFORE the 6 month window
-        start_of_window = (today - relativedelta(months=5)).replace(day=1)
-        base_invested = Investment.objects.filter(date__lt=start_of_window).aggregate(Sum('amount'))['amount__sum'] or 0
-        running_total = float(base_invested)
-
-        for i in range(5, -1, -1):
-            date_cursor = today - relativedelta(months=i)
-            month_start = date_cursor.replace(day=1)
-            _, last_day = calendar.monthrange(month_start.year, month_start.month)
-            month_end = month_start.replace(day=last_day)
-            
-            stock_labels.append(month_start.strftime('%b'))
-            
-            # Add investments made IN this month to running total
-            month_inv = Investment.objects.filter(date__gte=month_start, date__lte=month_end).aggregate(Sum('amount'))['amount__sum'] or 0
-            running_total += float(month_inv)
+        for month in months:
+            running_total += rollups.month_sum(month_table, month, 'INV')[0]
             stock_data.append(running_total)
 
         context['stock_chart'] = {
-            'labels': stock_labels,
+            'labels': [month.strftime('%b') for month in months],
             'data': stock_data, 
             'label': 'Invested Capital'
         }
 
         return context
 
-class LoanListView(LoginRequiredMixin, ListView):
+class LoanListView(LoginRequiredMixin, KeysetPaginationMixin, ListView):
     model = Loan
     template_name = 'core/loan_list.html'
     context_object_name = 'loans'
-    ordering = ['-start_date']
+    keyset_field = 'start_date'
+    totals = {'total_principal': Sum('principal', default=0), 'loan_count': Count('pk')}
+    query_budget = 8
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        loans = context['loans']
-        context['total_principal'] = sum(loan.principal for loan in loans)
+        context['loans'] = amortization.annotate(context['loans'])
+        context['total_outstanding'] = Loan.get_total_outstanding()
         context['total_monthly_emi'] = Loan.get_total_emi()
         return context
 
-class SavingListView(LoginRequiredMixin, ListView):
-    model = Saving
-    template_name = 'core/saving_list.html'
-    context_object_name = 'savings'
-    ordering = ['-date']
+class LoanScheduleView(LoginRequiredMixin, DetailView):
+    model = Loan
+    template_name = 'core/loan_schedule.html'
+    context_object_name = 'loan'
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        savings = context['savings']
-        context['total_savings'] = sum(saving.amount for saving in savings)
+        loan = self.object
+        schedule = loan.schedule()
+        paid = loan.payments_made()
+        for row in schedule:
+            row['is_paid'] = row['number'] <= paid
+
+        context['schedule'] = schedule
+        context['emi'] = loan.calculate_emi()
+        context['total_interest'] = sum((row['interest'] for row in schedule), Decimal('0'))
+        context['total_payable'] = sum((row['payment'] for row in schedule), Decimal('0'))
+        context['outstanding'] = loan.outstanding_balance()
+        context['payments_made'] = paid
         return context
 
-class InvestmentListView(LoginRequiredMixin, ListView):
+class SavingListView(LoginRequiredMixin, KeysetPaginationMixin, ListView):
+    model = Saving
+    template_name = 'core/saving_list.html'
+    context_object_name = 'savings'
+    totals = {'total_savings': Sum('amount', default=0), 'saving_count': Count('pk'), 'last_saving_date': Max('date')}
+    query_budget = 6
+
+class InvestmentListView(LoginRequiredMixin, KeysetPaginationMixin, ListView):
     model = Investment
     template_name = 'core/investment_list.html'
     context_object_name = 'investments'
-    ordering = ['-date']
+    totals = {
+        'total_invested': Sum('amount', default=0),
+        'current_value': Sum('current_value', default=0),
+        'investment_count': Count('pk'),
+    }
+    query_budget = 8
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        investments = context['investments']
-        total_invested = Investment.get_total_invested()
-        current_val = Investment.get_total_current_value()
-        
-        context['total_invested'] = total_invested
-        context['current_value'] = current_val
-        
+        total_invested = context['total_invested']
+        current_val = context['current_value']
+
         if total_invested > 0:
             context['returns_pct'] = ((current_val - total_invested) / total_invested) * 100
         else:
@@ -1115,6 +632,7 @@ class PolicyListView(LoginRequiredMixin, ListView):
     model = Policy
     template_name = 'core/policy_list.html'
     context_object_name = 'policies'
+    query_budget = 8
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -0,0 +1,118 @@
+"""
+In-memory prefix index of expense titles for the add-expense autocomplete.
+
+Titles are kept case-insensitively in a sorted array, so the titles under a
+prefix are one bisect range. Each title carries how often it was used and
+when it was last used; suggestions are ranked by frequency with a recency
+decay (RECENCY_HALF_LIFE days). The index is built lazily with one grouped
+query, new expenses are added incrementally (expenses/signals.py), and it is
+rebuilt when expenses changed some other way (edits, deletes, another
+worker's writes), detected through a shared expense-only version
+(VERSION_KEY), so writes to other ledgers leave it alone. Rankings of the
+short prefixes, which span most titles, are memoised per day in a small LRU.
+"""
+import heapq
+import threading
+from collections import OrderedDict
+from bisect import bisect_left, insort
+from datetime import date
+
+from django.db.models import Count, Max
+
+from core.services.snapshots import get_data_version
+from .models import Expense
+
+DEFAULT_TITLES = ['Lunch', 'Dinner', 'Groceries', 'Uber', 'Fuel', 'Rent', 'Electricity', 'Internet', 'Movies', 'Coffee', 'Medicine']
+RECENCY_HALF_LIFE = 90 # days
+VERSION_KEY = 'expenses:data_version' # bumped on every expense write (expenses/signals.py)
+MEMO_PREFIX_LENGTH = 2 # longer prefixes select few titles and are ranked on every call
+MEMO_SIZE = 256 # memoised rankings kept
+
+
+class TitleIndex:
+    def __init__(self, defaults=DEFAULT_TITLES):
+        self.defaults = defaults
+        self.lock = threading.Lock()
+        self.keys = None      # sorted lowercased titles
+        self.entries = {}     # key -> [title as last typed, uses, last used]
+        self.version = None   # expense version the index reflects
+        self.top = OrderedDict()  # (prefix, limit, day) -> suggestions, LRU, cleared on change
+
+    def _load(self):
+        keys, entries = [], {}
+        for title in self.defaults:
+            entries[title.lower()] = [title, 0, None]
+        rows = Expense.objects.order_by().values('title').annotate(uses=Count('pk'), last=Max('date'))
+        for row in rows:
+            key = row['title'].strip().lower()
+            if not key:
+                continue
+            entry = entries.setdefault(key, [row['title'].strip(), 0, None])
+            entry[1] += row['uses']
+            if entry[2] is None or row['last'] > entry[2]:
+                entry[0], entry[2] = row['title'].strip(), row['last']
+        keys = sorted(entries)
+        self.keys, self.entries = keys, entries
+        self.top.clear()
+
+    def _fresh(self):
+        """Builds the index on first use and after changes it did not see."""
+        version = get_data_version(VERSION_KEY)
+        if self.keys is None or version != self.version:
+            self._load()
+            self.version = version
+
+    def add(self, title, day):
+        """Records one more use of title (a new expense)."""
+        self.add_many([(title, day)])
+
+    def add_many(self, uses):
+        """Records (title, date) uses of new expenses, e.g. after a bulk insert."""
+        with self.lock:
+            if self.keys is None:
+                return # built on first use, with these expenses in it
+            for title, day in uses:
+                key = title.strip().lower()
+                if not key:
+                    continue
+                entry = self.entries.get(key)
+                if entry is None:
+                    self.entries[key] = [title.strip(), 1, day]
+                    insort(self.keys, key)
+                else:
+                    entry[1] += 1
+                    if entry[2] is None or day >= entry[2]:
+                        entry[0], entry[2] = title.strip(), day
+            self.top.clear()
+            # The signal receivers bump the version before adding
+            self.version = get_data_version(VERSION_KEY)
+
+    def _score(self, key, today):
+        title, uses, last = self.entries[key]
+        age = (today - last).days if last else 10 * RECENCY_HALF_LIFE
+        return (uses * 0.5 ** (max(age, 0) / RECENCY_HALF_LIFE), last or date.min, title)
+
+    def suggest(self, prefix, limit=8, today=None):
+        """Top `limit` titles starting with prefix (case-insensitive), best first."""
+        prefix = prefix.strip().lower()
+        today = today or date.today()
+        # Scores decay by the day, so a ranking is only reused on the day it was made
+        memo_key = (prefix, limit, today) if len(prefix) <= MEMO_PREFIX_LENGTH else None
+        with self.lock:
+            self._fresh()
+            cached = self.top.get(memo_key)
+            if cached is not None:
+                self.top.move_to_end(memo_key)
+                return cached
+            start = bisect_left(self.keys, prefix)
+            end = bisect_left(self.keys, prefix + '\uffff', start)
+            best = heapq.nlargest(limit, self.keys[start:end], key=lambda key: self._score(key, today))
+            result = [self.entries[key][0] for key in best]
+            if memo_key is not None:
+                self.top[memo_key] = result
+                if len(self.top) > MEMO_SIZE:
+                    self.top.popitem(last=False)
+            return result
+
+
+title_index = TitleIndex()
@@ -0,0 +1,386 @@
+"""
+Bank statement import (CSV and OFX).
+
+A statement is streamed through a pipeline of generators, so memory does not
+grow with the file: read (CSV rows or OFX transactions) -> normalize (date,
+title, amount; credits are skipped) -> categorize (keywords, then the
+category most often used for the same title) -> fingerprint (content hash
+stored in Expense.external_id) -> write (bulk_create batches, one
+transaction each, skipping fingerprints already in the ledger).
+
+Importing the same statement twice, or overlapping statements, adds each
+transaction once. Identical transactions within one statement (two coffees
+on the same day) are kept apart by counting their occurrences.
+"""
+import csv
+import hashlib
+import html
+import re
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Count
+
+from core.signals import ledger_bulk_changed
+from .models import Expense
+
+BATCH_SIZE = 2000
+MAX_ERRORS = 20 # invalid rows reported back; all of them are counted
+
+# Header names (lowercased) of the columns a bank CSV export may use
+COLUMNS = {
+    'date': {'date', 'transaction date', 'txn date', 'tran date', 'value date', 'posted date', 'posting date'},
+    'description': {
+        'description', 'narration', 'details', 'particulars', 'remarks', 'title', 'payee', 'memo',
+        'transaction details', 'transaction remarks',
+    },
+    'amount': {'amount', 'transaction amount', 'amount (inr)', 'amt'},
+    'debit': {'debit', 'withdrawal', 'withdrawals', 'withdrawal amt.', 'withdrawal amount', 'withdrawal amount (inr)', 'debit amount'},
+    'credit': {'credit', 'deposit', 'deposits', 'deposit amt.', 'deposit amount', 'deposit amount (inr)', 'credit amount'},
+    'type': {'type', 'dr/cr', 'cr/dr', 'transaction type'},
+    'reference': {'reference', 'ref no', 'ref no.', 'reference no', 'chq/ref number', 'chq./ref.no.', 'ref no./cheque no.', 'transaction id'},
+}
+HEADER_SCAN_ROWS = 30 # banks put account details above the header row
+
+DATE_FORMATS = ('%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y', '%d/%m/%y', '%d-%m-%y', '%d %b %Y', '%d-%b-%Y', '%d-%b-%y', '%d %B %Y', '%Y%m%d')
+
+# Narration segments that are transfer plumbing, not the payee
+NOISE = {'upi', 'dr', 'cr', 'imps', 'neft', 'rtgs', 'pos', 'ach', 'nach', 'ecs', 'mb', 'ib', 'p2m', 'p2a', 'bil', 'onl'}
+SEGMENT_SEPARATOR = re.compile(r'[/|]')
+LETTER = re.compile(r'[A-Za-z]')
+REFERENCE = re.compile(r'(?:\D*\d){4}') # four or more digits: a reference or account number
+
+# First matching keyword decides the category
+KEYWORDS = {
+    'FOO': ('swiggy', 'zomato', 'restaurant', 'cafe', 'coffee', 'bakery', 'grocer', 'bigbasket', 'blinkit', 'zepto', 'dmart', 'food', 'dining'),
+    'TRA': ('uber', 'ola', 'rapido', 'irctc', 'metro', 'petrol', 'fuel', 'hpcl', 'bpcl', 'indian oil', 'fastag', 'airline', 'indigo', 'parking'),
+    'ENT': ('netflix', 'spotify', 'hotstar', 'prime video', 'bookmyshow', 'pvr', 'inox', 'steam', 'youtube'),
+    'BIL': ('electricity', 'bescom', 'msedcl', 'broadband', 'airtel', 'jio', 'vodafone', 'recharge', 'water', 'gas', 'rent', 'insurance', 'dth'),
+    'EMI': ('emi', 'loan'),
+}
+KEYWORD_PATTERN = re.compile(
+    '|'.join(
+        f'(?P<{category}>' + '|'.join(
+            # Short names only as whole words ('ola' but not 'olive')
+            rf'\b{re.escape(word)}' + (r'\b' if len(word) <= 3 else '') for word in words
+        ) + ')'
+        for category, words in KEYWORDS.items()
+    )
+)
+
+
+class StatementError(ValueError):
+    """
+    The file is not a statement this importer can read. When reading failed
+    part way, `result` holds what was imported before the failure (those
+    batches are committed).
+    """
+
+    def __init__(self, message, result=None):
+        super().__init__(message)
+        self.result = result
+
+
+@dataclass
+class StatementLine:
+    line: int
+    date: date
+    title: str
+    amount: Decimal # money out, always positive
+    description: str = '' # as printed on the statement
+    reference: str = ''
+    category: str = 'OTH'
+    external_id: str = ''
+
+
+@dataclass
+class ImportResult:
+    read: int = 0
+    imported: int = 0
+    duplicates: int = 0
+    credits: int = 0
+    invalid: int = 0
+    errors: List[str] = field(default_factory=list)
+
+    def error(self, line, message):
+        self.invalid += 1
+        if len(self.errors) < MAX_ERRORS:
+            self.errors.append(f"Line {line}: {message}")
+
+
+# --- Readers: yield (line number, {field: raw text}) ---
+
+def _header_map(row) -> Dict[str, int]:
+    names = [' '.join(cell.lower().split()) for cell in row]
+    return {
+        column: index
+        for column, aliases in COLUMNS.items()
+        for index, name in enumerate(names)
+        if name in aliases
+    }
+
+
+def read_csv(stream) -> Iterator[Tuple[int, Dict[str, str]]]:
+    reader = csv.reader(stream)
+    header = None
+    for row in islice(reader, HEADER_SCAN_ROWS):
+        columns = _header_map(row)
+        if {'date', 'description'} <= columns.keys() and columns.keys() & {'amount', 'debit'}:
+            header = columns
+            break
+    if header is None:
+        raise StatementError("No header row with date, description and amount (or debit) columns found.")
+
+    for row in reader:
+        if not any(cell.strip() for cell in row):
+            continue
+        yield reader.line_num, {
+            column: row[index].strip() if index < len(row) else ''
+            for column, index in header.items()
+        }
+
+
+OFX_FIELDS = {'DTPOSTED': 'date', 'TRNAMT': 'amount', 'NAME': 'description', 'MEMO': 'memo', 'FITID': 'reference', 'TRNTYPE': 'type'}
+
+
+def _ofx_tags(stream, chunk_size=65536) -> Iterator[Tuple[str, str]]:
+    """(TAG, text) pairs, read in chunks: OFX files are often a single line."""
+    buffer = ''
+    while True:
+        chunk = stream.read(chunk_size)
+        buffer += chunk
+        parts = buffer.split('<')
+        buffer = parts.pop() if chunk else ''
+        for part in parts:
+            tag, _, text = part.partition('>')
+            if tag:
+                yield tag.strip().upper(), text.strip()
+        if not chunk:
+            return
+
+
+def read_ofx(stream) -> Iterator[Tuple[int, Dict[str, str]]]:
+    number, record = 0, None
+    for tag, text in _ofx_tags(stream):
+        if tag == 'STMTTRN':
+            record = {}
+        elif tag == '/STMTTRN' and record is not None:
+            number += 1
+            if not record.get('description'):
+                record['description'] = record.get('memo', '')
+            yield number, record
+            record = None
+        elif record is not None and tag in OFX_FIELDS:
+            record[OFX_FIELDS[tag]] = html.unescape(text)
+
+
+READERS = {'csv': read_csv, 'ofx': read_ofx}
+
+
+def detect_format(stream, filename='') -> str:
+    if filename.lower().endswith(('.ofx', '.qfx')):
+        return 'ofx'
+    head = stream.read(1024)
+    stream.seek(0)
+    return 'ofx' if re.search(r'OFXHEADER|<OFX>', head, re.IGNORECASE) else 'csv'
+
+
+# --- Pipeline stages ---
+
+class _DateParser:
+    """Tries DATE_FORMATS and sticks to the first that works, as a file uses one format."""
+
+    def __init__(self):
+        self.format = None
+        self.seen = {} # a statement repeats the same few hundred dates
+
+    def __call__(self, text):
+        if text not in self.seen:
+            self.seen[text] = self.parse(text)
+        return self.seen[text]
+
+    def parse(self, text):
+        text = text.strip()[:8] if text[:8].isdigit() else text.strip() # OFX: 20260131120000[-5:EST]
+        if self.format:
+            try:
+                return datetime.strptime(text, self.format).date()
+            except ValueError:
+                pass
+        for candidate in DATE_FORMATS:
+            try:
+                parsed = datetime.strptime(text, candidate).date()
+            except ValueError:
+                continue
+            self.format = candidate
+            return parsed
+        raise ValueError(f"unrecognised date '{text}'")
+
+
+def parse_amount(text) -> Optional[Decimal]:
+    """'1,234.50', '(99.00)', '-12', '250.00 Dr' -> Decimal (negative for Dr and brackets); '' -> None."""
+    text = text.replace(',', '').replace('₹', '').replace('INR', '').strip()
+    if not text:
+        return None
+    sign = 1
+    if text.startswith('(') and text.endswith(')'):
+        sign, text = -1, text[1:-1]
+    lowered = text.lower()
+    if lowered.endswith(('dr', 'cr')):
+        sign = -1 if lowered.endswith('dr') else 1
+        text = text[:-2].strip()
+    try:
+        value = Decimal(text)
+    except InvalidOperation:
+        raise ValueError(f"unrecognised amount '{text}'")
+    if not value.is_finite():
+        # 'NaN' and 'Infinity' parse, but cannot be compared or stored
+        raise ValueError(f"unrecognised amount '{text}'")
+    return sign * value
+
+
+def clean_title(description) -> str:
+    """Payee from a bank narration: 'UPI/DR/4123456789/SWIGGY LTD/YESB' -> 'SWIGGY LTD'."""
+    payee = next((
+        segment for segment in map(str.strip, SEGMENT_SEPARATOR.split(description))
+        if segment.lower() not in NOISE and LETTER.search(segment) and not REFERENCE.search(segment)
+    ), description)
+    return ' '.join(payee.split())[:100] or 'Statement entry'
+
+
+def normalize(records, result: ImportResult) -> Iterator[StatementLine]:
+    """Money-out lines as StatementLines; credits are counted and dropped, bad rows reported."""
+    parse_date = _DateParser()
+    for line, record in records:
+        result.read += 1
+        try:
+            day = parse_date(record.get('date', ''))
+            if record.get('debit') is not None or record.get('credit') is not None:
+                debit = parse_amount(record.get('debit', ''))
+                amount = abs(debit) if debit else -(parse_amount(record.get('credit', '')) or 0)
+            else:
+                amount = parse_amount(record.get('amount', ''))
+                if amount is None:
+                    raise ValueError("missing amount")
+                kind = record.get('type', '').strip().lower()
+                if kind in ('dr', 'debit', 'd'):
+                    amount = abs(amount)
+                elif kind in ('cr', 'credit', 'c'):
+                    amount = -abs(amount)
+                else:
+                    # Signed amounts: money out is negative on a statement
+                    amount = -amount
+        except ValueError as e:
+            result.error(line, str(e))
+            continue
+
+        if amount <= 0:
+            result.credits += 1
+            continue
+        description = ' '.join(record.get('description', '').split())
+        yield StatementLine(
+            line=line, date=day, title=clean_title(description), amount=amount.quantize(Decimal('0.01')),
+            description=description, reference=record.get('reference', '').strip(),
+        )
+
+
+def learned_categories() -> Dict[str, str]:
+    """Lowercased title -> the category most often used for it in the ledger (one grouped query)."""
+    best = {}
+    rows = Expense.objects.order_by().values('title', 'category').annotate(uses=Count('pk'))
+    for row in rows:
+        key = row['title'].lower()
+        if key not in best or row['uses'] > best[key][1]:
+            best[key] = (row['category'], row['uses'])
+    return {key: category for key, (category, _) in best.items()}
+
+
+def categorize(lines, history: Optional[Dict[str, str]] = None) -> Iterator[StatementLine]:
+    history = learned_categories() if history is None else history
+    for statement_line in lines:
+        match = KEYWORD_PATTERN.search(statement_line.description.lower())
+        if match:
+            statement_line.category = match.lastgroup
+        else:
+            statement_line.category = history.get(statement_line.title.lower(), 'OTH')
+        yield statement_line
+
+
+def fingerprint(lines, result: ImportResult) -> Iterator[StatementLine]:
+    """
+    Sets external_id to a hash of the bank's reference when there is one,
+    else of date, amount, narration and the occurrence number of that
+    combination in this statement.
+    """
+    seen_references, occurrences = set(), {}
+    for statement_line in lines:
+        if statement_line.reference:
+            key = f'ref|{statement_line.reference}'
+            if key in seen_references:
+                result.duplicates += 1
+                continue
+            seen_references.add(key)
+        else:
+            content = f'{statement_line.date.isoformat()}|{statement_line.amount}|{statement_line.description.lower()}'
+            digest = hashlib.sha1(content.encode()).digest()
+            occurrences[digest] = occurrences.get(digest, 0) + 1
+            key = f'{content}|{occurrences[digest]}'
+        statement_line.external_id = 'stmt-' + hashlib.sha1(key.encode()).hexdigest()
+        yield statement_line
+
+
+def _batches(items, size) -> Iterator[List]:
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def write(lines, result: ImportResult, batch_size=BATCH_SIZE, progress: Optional[Callable] = None) -> ImportResult:
+    """Bulk-inserts the lines not already in the ledger, one transaction per batch."""
+    for batch in _batches(lines, batch_size):
+        with transaction.atomic():
+            known = set(
+                Expense.objects.filter(external_id__in=[line.external_id for line in batch])
+                .values_list('external_id', flat=True)
+            )
+            new = [
+                Expense(title=line.title, amount=line.amount, category=line.category, date=line.date, external_id=line.external_id)
+                for line in batch if line.external_id not in known
+            ]
+            if new:
+                Expense.objects.bulk_create(new)
+                ledger_bulk_changed.send(sender=Expense, created=new, updated=[])
+        result.imported += len(new)
+        result.duplicates += len(batch) - len(new)
+        if progress:
+            progress(result)
+    return result
+
+
+def import_statement(stream, fmt=None, filename='', batch_size=BATCH_SIZE, progress=None) -> ImportResult:
+    """
+    Import a text-mode, seekable statement stream into the expense ledger.
+
+    Args:
+        stream: Statement file opened in text mode
+        fmt: 'csv' or 'ofx'; detected from the file name or contents if omitted
+        filename: Original file name, used for format detection
+        batch_size: Rows per bulk insert / transaction
+        progress: Called with the running ImportResult after every batch
+
+    Returns:
+        ImportResult with counts of rows read, imported, duplicate, credit and invalid
+    """
+    result = ImportResult()
+    try:
+        fmt = fmt or detect_format(stream, filename)
+        if fmt not in READERS:
+            raise StatementError(f"Unknown statement format '{fmt}'.")
+        records = READERS[fmt](stream)
+        lines = fingerprint(categorize(normalize(records, result)), result)
+        return write(lines, result, batch_size=batch_size, progress=progress)
+    except UnicodeDecodeError as e:
+        raise StatementError(f"The file is not valid text after line {result.read} ({e.reason}).", result) from e
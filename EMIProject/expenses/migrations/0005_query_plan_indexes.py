@@ -0,0 +1,25 @@
+# Generated by Django 6.0.1 on 2026-10-18 02:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expenses', '0004_expense_external_id'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['date'], name='expense_date'),
+        ),
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['category', 'date'], name='expense_category_date'),
+        ),
+        migrations.AddIndex(
+            model_name='recurringexpense',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['start_date'], name='recurring_expense_due'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 6.0.1 on 2026-10-18 03:25
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expenses', '0005_query_plan_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='recurringexpense',
+            name='payment_date',
+            field=models.IntegerField(default=1, help_text='Day of the month (1-31) when this is due', validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(31)]),
+        ),
+    ]
@@ -1,3 +1,4 @@
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 from django.utils import timezone
 from datetime import date
@@ -17,12 +18,19 @@ class Expense(models.Model):
     category = models.CharField(max_length=3, choices=CATEGORY_CHOICES, default='OTH')
     date = models.DateField(default=timezone.now)
     created_at = models.DateTimeField(auto_now_add=True)
+    external_id = models.CharField(max_length=50, blank=True, null=True, unique=True, help_text="Idempotency key for generated entries (e.g. recurring bills)")
 
     def __str__(self):
         return f"{self.title} - {self.amount}"
 
     class Meta:
         ordering = ['-date']
+        indexes = [
+            # Newest-first lists and date-range totals (keyset pages on date, id)
+            models.Index(fields=['date'], name='expense_date'),
+            # Category totals over a period (chat queries, budget splits)
+            models.Index(fields=['category', 'date'], name='expense_category_date'),
+        ]
 
 class RecurringExpense(models.Model):
     FREQUENCY_CHOICES = [
@@ -42,7 +50,10 @@ class RecurringExpense(models.Model):
     frequency = models.CharField(max_length=3, choices=FREQUENCY_CHOICES, default='MON')
     
     # New Field: Fixed Payment Date (1-31)
-    payment_date = models.IntegerField(default=1, help_text="Day of the month (1-31) when this is due")
+    payment_date = models.IntegerField(
+        default=1, validators=[MinValueValidator(1), MaxValueValidator(31)],
+        help_text="Day of the month (1-31) when this is due",
+    )
     
     start_date = models.DateField(default=date.today)
     last_processed_date = models.DateField(null=True, blank=True)
@@ -50,3 +61,9 @@ class RecurringExpense(models.Model):
 
     def __str__(self):
         return f"{self.title} ({self.get_frequency_display()})"
+
+    class Meta:
+        indexes = [
+            # Partial: SQLite filters booleans as a bare `WHERE is_active`
+            models.Index(fields=['start_date'], name='recurring_expense_due', condition=models.Q(is_active=True)),
+        ]
@@ -1,13 +1,36 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from .models import Expense
-from core.services.whatsapp import WhatsAppService
+from .autocomplete import VERSION_KEY, title_index
+from core.signals import ledger_bulk_changed
+from core.services import outbox
+from core.services.snapshots import bump_data_version
 from django.contrib.auth import get_user_model
 from django.conf import settings
 
 # Threshold for High Value Alert (Could be moved to UserProfile)
 HIGH_VALUE_THRESHOLD = 5000
 
+@receiver(post_save, sender=Expense)
+@receiver(post_delete, sender=Expense)
+def update_title_suggestions(sender, instance, created=False, raw=False, **kwargs):
+    # New expenses are added in place; edits and deletes only change the
+    # version, so the index reloads itself on next use
+    bump_data_version(VERSION_KEY)
+    if created and not raw:
+        title_index.add(instance.title, instance.date)
+
+
+def add_bulk_title_suggestions(sender, created=(), **kwargs):
+    if sender is Expense:
+        bump_data_version(VERSION_KEY)
+        if created:
+            title_index.add_many((expense.title, expense.date) for expense in created)
+
+
+ledger_bulk_changed.connect(add_bulk_title_suggestions, dispatch_uid='expense_title_bulk')
+
+
 @receiver(post_save, sender=Expense)
 def alert_high_value_expense(sender, instance, created, **kwargs):
     if created and instance.amount > HIGH_VALUE_THRESHOLD:
@@ -26,8 +49,14 @@ def alert_high_value_expense(sender, instance, created, **kwargs):
         
         User = get_user_model()
         # Find a user who has a profile with phone number
-        target_user = User.objects.filter(profile__phone_number__isnull=False).first()
+        target_user = User.objects.filter(profile__phone_number__isnull=False).exclude(profile__phone_number='').first()
         
         if target_user:
-            service = WhatsAppService()
-            service.send_alert(target_user, instance.title, instance.amount)
+            # Sent in the background by `manage.py dispatch_notifications`,
+            # so saving an expense never waits on WhatsApp
+            outbox.enqueue(
+                'HIGH_VALUE_EXPENSE',
+                target_user.profile.phone_number,
+                {'title': instance.title, 'amount': f'{instance.amount:.2f}'},
+                dedupe_key=f'HIGH_VALUE_EXPENSE-{instance.pk}',
+            )
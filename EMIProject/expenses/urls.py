@@ -1,13 +1,15 @@
 from django.urls import path
 from django.views.generic import TemplateView
 from .views import (
-    ExpenseListView, ExpenseCreateView, ExpenseUpdateView, ExpenseDeleteView,
+    ExpenseListView, ExpenseCreateView, ExpenseUpdateView, ExpenseDeleteView, ExpenseTitleSuggestView, StatementImportView,
     RecurringExpenseListView, RecurringExpenseCreateView, RecurringExpenseUpdateView, RecurringExpenseDeleteView
 )
 
 urlpatterns = [
     path('', ExpenseListView.as_view(), name='expense_list'),
     path('add/', ExpenseCreateView.as_view(), name='expense_create'),
+    path('titles/', ExpenseTitleSuggestView.as_view(), name='expense_title_suggest'),
+    path('import/', StatementImportView.as_view(), name='expense_import'),
     path('edit/<int:pk>/', ExpenseUpdateView.as_view(), name='expense_update'),
     path('delete/<int:pk>/', ExpenseDeleteView.as_view(), name='expense_delete'),
     path('scan/', TemplateView.as_view(template_name='expenses/scan.html'), name='scan_pay'),
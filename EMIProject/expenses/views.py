@@ -1,8 +1,16 @@
-from django.views.generic import ListView, CreateView, UpdateView, DeleteView
+from django.views.generic import ListView, CreateView, UpdateView, DeleteView, FormView
 from django.urls import reverse_lazy
+from django.db import transaction
 from .models import Expense
+from .autocomplete import title_index
+from .importers import StatementError, import_statement
+from django.contrib import messages
+import io
+from django.http import JsonResponse
+from django.views import View
 from django import forms
 from django.contrib.auth.mixins import LoginRequiredMixin
+from core.utils.pagination import KeysetPaginationMixin
 
 class ExpenseForm(forms.ModelForm):
     class Meta:
@@ -20,26 +28,28 @@ class ExpenseForm(forms.ModelForm):
             'date': 'Date of Expense',
         }
 
-class ExpenseListView(LoginRequiredMixin, ListView):
+class ExpenseListView(LoginRequiredMixin, KeysetPaginationMixin, ListView):
     model = Expense
     template_name = 'expenses/expense_list.html'
     context_object_name = 'expenses'
-    ordering = ['-date']
+    query_budget = 10
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        from django.db.models import Sum
         from datetime import date
         import calendar
+        from core.services import rollups
         
         today = date.today()
         first_day = today.replace(day=1)
         _, last_day = calendar.monthrange(today.year, today.month)
         
-        # Monthly Outflow
-        month_total = Expense.objects.filter(date__gte=first_day).aggregate(Sum('amount'))['amount__sum'] or 0
-        context['month_total'] = float(month_total)
-        context['month_count'] = Expense.objects.filter(date__gte=first_day).count()
+        # Monthly Outflow (from the month x category rollups)
+        month_total, month_count = rollups.month_sum(
+            rollups.month_table(first_day, first_day, kinds=['EXP']), first_day, 'EXP'
+        )
+        context['month_total'] = month_total
+        context['month_count'] = month_count
         
         # Burn Rate (Daily Average)
         context['daily_burn'] = float(month_total) / today.day if today.day > 0 else 0
@@ -57,7 +67,42 @@ class ExpenseListView(LoginRequiredMixin, ListView):
             
         return context
 
-from core.services.whatsapp import WhatsAppService
+
+class StatementImportForm(forms.Form):
+    FORMAT_CHOICES = [('', 'Detect automatically'), ('csv', 'CSV'), ('ofx', 'OFX / QFX')]
+
+    statement = forms.FileField(label='Statement File', widget=forms.ClearableFileInput(attrs={'accept': '.csv,.ofx,.qfx', 'class': 'form-control'}))
+    format = forms.ChoiceField(choices=FORMAT_CHOICES, required=False, widget=forms.Select(attrs={'class': 'form-control'}))
+
+
+class StatementImportView(LoginRequiredMixin, FormView):
+    form_class = StatementImportForm
+    template_name = 'expenses/import_form.html'
+    success_url = reverse_lazy('expense_list')
+    extra_context = {'title': 'Import Bank Statement'}
+
+    def form_valid(self, form):
+        upload = form.cleaned_data['statement']
+        # Uploads over FILE_UPLOAD_MAX_MEMORY_SIZE are already on disk; both are read as a stream
+        stream = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+        try:
+            result = import_statement(stream, fmt=form.cleaned_data['format'] or None, filename=upload.name)
+        except StatementError as e:
+            error = f"Could not read this statement: {e}"
+            if e.result and e.result.imported:
+                error += f" {e.result.imported} expenses from the lines before it were imported; importing the file again skips them."
+            form.add_error('statement', error)
+            return self.form_invalid(form)
+        finally:
+            stream.detach()
+
+        messages.success(self.request, (
+            f"Imported {result.imported} expenses from {result.read} lines "
+            f"({result.duplicates} already imported, {result.credits} credits skipped)."
+        ))
+        if result.invalid:
+            messages.warning(self.request, f"{result.invalid} lines could not be read: " + "; ".join(result.errors[:3]))
+        return super().form_valid(form)
 
 class ExpenseCreateView(LoginRequiredMixin, CreateView):
     model = Expense
@@ -66,18 +111,9 @@ class ExpenseCreateView(LoginRequiredMixin, CreateView):
     success_url = reverse_lazy('expense_list')
 
     def form_valid(self, form):
-        response = super().form_valid(form)
-        
-        # Check for High Value Expense (Alert Threshold: ₹5,000)
-        if self.object.amount >= 5000:
-            try:
-                wa = WhatsAppService()
-                # send_alert handles the message format and target
-                wa.send_alert(self.request.user, self.object.title, self.object.amount)
-            except Exception as e:
-                print(f"Failed to send alert: {e}")
-                
-        return response
+        # The expense and its high value alert in the outbox (expenses/signals.py) commit together
+        with transaction.atomic():
+            return super().form_valid(form)
 
     def get_initial(self):
         initial = super().get_initial()
@@ -93,16 +129,23 @@ class ExpenseCreateView(LoginRequiredMixin, CreateView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        # Get unique titles from past expenses
-        existing_titles = list(Expense.objects.values_list('title', flat=True).distinct())
-        # Common defaults
-        defaults = ['Lunch', 'Dinner', 'Groceries', 'Uber', 'Fuel', 'Rent', 'Electricity', 'Internet', 'Movies', 'Coffee', 'Medicine']
-        
-        context['suggested_titles'] = sorted(list(set(existing_titles + defaults)))
+        # Most used titles; the form fetches matches for what is typed from ExpenseTitleSuggestView
+        context['suggested_titles'] = title_index.suggest('')
         context['page_title'] = 'Add New Expense'
         context['button_text'] = 'Save Expense'
         return context
 
+class ExpenseTitleSuggestView(LoginRequiredMixin, View):
+    """Autocomplete for the expense title: ?q=<prefix>&limit=<k> -> {"suggestions": [...]}"""
+    query_budget = 3
+
+    def get(self, request):
+        try:
+            limit = min(max(int(request.GET.get('limit', 8)), 1), 20)
+        except ValueError:
+            limit = 8
+        return JsonResponse({'suggestions': title_index.suggest(request.GET.get('q', ''), limit)})
+
 class ExpenseUpdateView(LoginRequiredMixin, UpdateView):
     model = Expense
     form_class = ExpenseForm
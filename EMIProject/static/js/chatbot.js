@@ -16,8 +16,12 @@ document.addEventListener('DOMContentLoaded', function () {
         }
     });
 
+    // In-flight answer; aborted when the window closes so the server stops too
+    let controller = null;
+
     closeBtn.addEventListener('click', () => {
         chatWindow.classList.remove('active');
+        if (controller) controller.abort();
     });
 
     // Send Message
@@ -31,31 +35,73 @@ document.addEventListener('DOMContentLoaded', function () {
 
         // Loading State
         const loadingId = appendLoading();
+        let botMessage = null;
+        controller = new AbortController();
 
         try {
-            const response = await fetch('/chat/ask/', {
+            const response = await fetch('/chat/stream/', {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
                     'X-CSRFToken': getCookie('csrftoken')
                 },
-                body: JSON.stringify({ message: message })
+                body: JSON.stringify({ message: message }),
+                signal: controller.signal
             });
 
-            const data = await response.json();
-            removeLoading(loadingId);
+            if (!response.ok || !response.body) {
+                removeLoading(loadingId);
+                appendMessage("I'm having trouble connecting right now.", 'bot');
+                return;
+            }
+
+            // Server-Sent Events: "event: <name>\ndata: <json>\n\n"
+            const reader = response.body.getReader();
+            const decoder = new TextDecoder();
+            let buffer = '';
+            while (true) {
+                const { value, done } = await reader.read();
+                if (done) break;
+                buffer += decoder.decode(value, { stream: true });
+
+                let boundary;
+                while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                    const event = parseEvent(buffer.slice(0, boundary));
+                    buffer = buffer.slice(boundary + 2);
+                    if (event.name === 'token' || event.name === 'error') {
+                        if (!botMessage) {
+                            removeLoading(loadingId);
+                            botMessage = appendMessage('', 'bot');
+                        }
+                        botMessage.textContent += event.data.text;
+                        messagesContainer.scrollTop = messagesContainer.scrollHeight;
+                    }
+                }
+            }
 
-            if (data.response) {
-                appendMessage(data.response, 'bot');
-            } else {
+            removeLoading(loadingId);
+            if (!botMessage) {
                 appendMessage("I'm having trouble connecting right now.", 'bot');
             }
         } catch (error) {
             removeLoading(loadingId);
-            appendMessage("Sorry, something went wrong.", 'bot');
+            if (error.name !== 'AbortError') {
+                appendMessage("Sorry, something went wrong.", 'bot');
+            }
+        } finally {
+            controller = null;
         }
     }
 
+    function parseEvent(block) {
+        const event = { name: 'message', data: {} };
+        block.split('\n').forEach(line => {
+            if (line.startsWith('event:')) event.name = line.slice(6).trim();
+            if (line.startsWith('data:')) event.data = JSON.parse(line.slice(5));
+        });
+        return event;
+    }
+
     sendBtn.addEventListener('click', sendMessage);
     inputField.addEventListener('keypress', (e) => {
         if (e.key === 'Enter') sendMessage();
@@ -68,6 +114,7 @@ document.addEventListener('DOMContentLoaded', function () {
         div.textContent = text;
         messagesContainer.appendChild(div);
         messagesContainer.scrollTop = messagesContainer.scrollHeight;
+        return div;
     }
 
     function appendLoading() {